@@ -1,14 +1,16 @@
 from django.contrib import admin
-from .models import Manager, Player, Notice, Update, Resource, Review
+from .models import Manager, Player, Notice, Update, Resource, Review, JobRun, SchedulerLease
 
 @admin.register(Manager)
 class ManagerAdmin(admin.ModelAdmin):
-    list_display = ('rank', 'nickname', 'club_value', 'team_color', 'score', 'formation', 'created_at')
+    list_display = ('rank', 'nickname', 'club_value', 'team_color', 'score', 'formation', 'snapshot', 'created_at')
+    list_filter = ('snapshot',)
     ordering = ('rank',)
 
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
-    list_display = ('rank', 'nickname', 'team_color', 'position', 'player_name', 'season', 'grade', 'created_at')
+    list_display = ('rank', 'nickname', 'team_color', 'position', 'player_name', 'season', 'grade', 'snapshot', 'created_at')
+    list_filter = ('snapshot',)
     ordering = ('rank', 'position')
 
 @admin.register(Review)
@@ -20,6 +22,16 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ('spid', 'season_id', 'name', 'review')
     list_filter = ('season_id', 'score')
 
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ('job', 'status', 'scheduled_for', 'started_at', 'finished_at', 'holder', 'message')
+    list_filter = ('job', 'status')
+    ordering = ('-started_at',)
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'holder', 'acquired_at', 'expires_at')
+
 admin.site.register(Notice)
 admin.site.register(Update)
 admin.site.register(Resource)
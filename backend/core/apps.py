@@ -1,16 +1,15 @@
 from django.apps import AppConfig
 import threading
-import datetime
 import time
 from django.db.utils import OperationalError
 from django.db import connection
 from django.core.management import call_command
 
 def should_crawl():
-    from core.models import Manager
+    from core.snapshots import live_managers
     try:
-        # 데이터가 없으면 True
-        return Manager.objects.count() == 0
+        # 공개된 데이터가 없으면 True
+        return not live_managers().exists()
     except OperationalError:
         # DB가 아직 준비되지 않은 경우
         return False
@@ -21,14 +20,15 @@ def crawl_once():
 
     for attempt in range(max_retries):
         try:
+            from core.snapshots import live_snapshot_id
+            previous_id = live_snapshot_id()
             call_command('crawl_managers')
-            # 크롤링 성공 여부 확인
-            from core.models import Manager, Player
-            if Manager.objects.exists() and Player.objects.exists():
+            # 크롤링 성공 여부 확인: 이번 시도에서 새 스냅샷이 공개됐는지 (이전에 공개된 데이터는 기준이 아님)
+            if live_snapshot_id() != previous_id:
                 print(f"[크롤링] {attempt + 1}번째 시도 성공")
                 return True
             else:
-                raise Exception("데이터가 정상적으로 저장되지 않음")
+                raise Exception("새 스냅샷이 공개되지 않음")
         except Exception as e:
             print(f"[크롤링] {attempt + 1}번째 시도 실패: {e}")
             if attempt < max_retries - 1:
@@ -38,27 +38,37 @@ def crawl_once():
                 print("[크롤링] 최종 실패")
                 return False
 
-def crawl_scheduler():
-    while True:
+def crawl_scheduler(startup_job=None, scheduler=None):
+    # 매시 정해진 시각(CRAWL_SCHEDULER['CRON'])에 크롤링, 여러 프로세스 중 리더 하나만 실행
+    from core.scheduler import Scheduler
+    scheduler = scheduler or Scheduler('crawl', crawl_once, startup_job=startup_job)
+    scheduler.run_forever()
+
+def wait_for_db_and_load_meta():
+    # DB가 준비될 때까지 대기
+    max_retries = 5
+    retry_count = 0
+    while retry_count < max_retries:
         try:
-            now = datetime.datetime.now()
-            # 다음 정각+10분 계산
-            next_hour = (now + datetime.timedelta(hours=1)).replace(minute=10, second=0, microsecond=0)
-            wait_sec = (next_hour - now).total_seconds()
-            
-            if wait_sec > 0:
-                time.sleep(wait_sec)
-            
-            print(f'[크롤링] 정각+10분({next_hour.strftime("%H:%M")}) 데이터 수집 실행')
-            
-            # 크롤링 실행 및 성공할 때까지 재시도
-            while not crawl_once():
-                print("[크롤링] 5분 후 재시도...")
-                time.sleep(300)
-                
-        except Exception as e:
-            print(f"[크롤링] 스케줄러 오류: {e}")
-            time.sleep(60)  # 1분 후 재시도
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                break
+        except OperationalError:
+            retry_count += 1
+            time.sleep(1)
+
+    if retry_count == max_retries:
+        print("[DB] 데이터베이스 연결 실패")
+        return False
+
+    # 메타데이터 로드
+    try:
+        from core.tasks import load_meta
+        load_meta()
+        print('[메타데이터] 서버 시작시 메타데이터 로드 완료')
+    except Exception as e:
+        print(f'[메타데이터] 로드 실패: {e}')
+    return True
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -66,45 +76,22 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import os
+        from django.conf import settings
         if os.environ.get('RUN_MAIN') != 'true':
             return
+        # 수집은 run_worker 프로세스가 담당, 개발 편의상 runserver에서도 돌리려면 CRAWL_SCHEDULER['IN_WEB'] = True
+        if not getattr(settings, 'CRAWL_SCHEDULER', {}).get('IN_WEB', False):
+            return
 
         if not hasattr(self, '_scheduler_started'):
             self._scheduler_started = True
-            
+
             def initialize_db_and_start_scheduler():
-                # DB가 준비될 때까지 대기
-                max_retries = 5
-                retry_count = 0
-                while retry_count < max_retries:
-                    try:
-                        with connection.cursor() as cursor:
-                            cursor.execute("SELECT 1")
-                            break
-                    except OperationalError:
-                        retry_count += 1
-                        time.sleep(1)
-                
-                if retry_count == max_retries:
-                    print("[DB] 데이터베이스 연결 실패")
+                if not wait_for_db_and_load_meta():
                     return
-
-                # 메타데이터 로드
-                try:
-                    from core.tasks import load_meta, fetch_and_save_players_for_all_managers
-                    load_meta()
-                    print('[메타데이터] 서버 시작시 메타데이터 로드 완료')
-                except Exception as e:
-                    print(f'[메타데이터] 로드 실패: {e}')
-
-                # 서버 시작 시 Player 데이터 최신성 체크 후 필요할 때만 수집
-                try:
-                    fetch_and_save_players_for_all_managers()
-                except Exception as e:
-                    print(f'[DB] Player 데이터 최신성 체크 및 수집 실패: {e}')
-
-                # 크롤링 스케줄러 시작
-                crawl_scheduler()
+                from core.tasks import fetch_and_save_players_for_all_managers
+                # 크롤링 스케줄러 시작 (리더가 된 프로세스만 시작 시 Player 데이터 최신성 체크 후 필요할 때만 수집)
+                crawl_scheduler(startup_job=fetch_and_save_players_for_all_managers)
 
             t = threading.Thread(target=initialize_db_and_start_scheduler, daemon=True)
             t.start()
@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 통계 집계용 엔드포인트 이름 (경로 끝부분 기준)
+ENDPOINTS = {
+    '/fconline/v1/id': 'id',
+    '/fconline/v1/user/match': 'user/match',
+    '/fconline/v1/match-detail': 'match-detail',
+    '/datacenter/rank_inner': 'rank_inner',
+    '/datacenter/rank': 'rank',
+}
+
+
+# 엔드포인트별 지연 시간 표본 최대 개수(백분위 계산용)
+SAMPLE_SIZE = 10000
+
+
+def endpoint_of(url):
+    path = urlsplit(url).path
+    return ENDPOINTS.get(path) or path.rsplit('/', 1)[-1] or path
+
+
+class NexonClient:
+    """
+    Nexon API/홈페이지 공통 HTTP 클라이언트
+    - 하나의 세션을 모든 스레드가 공유하고, 연결 수는 동시 워커 수에 맞춰 keep-alive 유지
+    - 연결 오류/5xx는 전송 계층에서 재시도, 429는 재시도하지 않고 호출자(키 스케줄러)에 전달
+    - 엔드포인트별 요청 수, 상태 코드, 응답 크기, 지연 시간 집계
+    - STANDIN_URL이 있으면 모든 요청의 호스트를 로컬 대체 서버로 변경
+    """
+
+    def __init__(self, conf=None):
+        conf = conf if conf is not None else getattr(settings, 'NEXON_HTTP', {})
+        self.pool_size = conf.get('POOL_SIZE', 100)
+        self.timeout = conf.get('TIMEOUT', (3.05, 10))
+        self.attempts = conf.get('ATTEMPTS', 3)
+        self.attempt_delay = conf.get('ATTEMPT_DELAY', 1.0)
+        self.standin_url = (conf.get('STANDIN_URL') or '').rstrip('/')
+        retry_strategy = Retry(
+            total=conf.get('RETRIES', 3),
+            backoff_factor=conf.get('BACKOFF', 0.1),
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=['GET'],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=4,
+            pool_maxsize=self.pool_size,
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._samples = {}
+
+    def url(self, url):
+        # 대체 서버 사용 시 scheme/host만 바꾸고 경로와 쿼리는 유지
+        if not self.standin_url:
+            return url
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ''
+        return f"{self.standin_url}{parts.path}{query}"
+
+    def _record(self, endpoint, status, size, elapsed):
+        with self._lock:
+            stat = self._stats.get(endpoint)
+            if stat is None:
+                stat = {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'status': {},
+                        'first': time.time(), 'last': 0.0}
+                self._stats[endpoint] = stat
+                self._samples[endpoint] = []
+            stat['requests'] += 1
+            stat['last'] = time.time()
+            # 표본이 가득 차면 균등 추출(reservoir sampling)로 교체
+            samples = self._samples[endpoint]
+            if len(samples) < SAMPLE_SIZE:
+                samples.append(elapsed)
+            else:
+                idx = random.randrange(stat['requests'])
+                if idx < SAMPLE_SIZE:
+                    samples[idx] = elapsed
+            stat['bytes'] += size
+            stat['seconds'] += elapsed
+            stat['max_seconds'] = max(stat['max_seconds'], elapsed)
+            if status is None:
+                stat['errors'] += 1
+            else:
+                stat['status'][status] = stat['status'].get(status, 0) + 1
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        # 단일 요청(전송 계층 재시도 포함), 실패 시 requests 예외 그대로 전달
+        endpoint = endpoint_of(url)
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(self.url(url), params=params, headers=headers, timeout=timeout or self.timeout)
+        except requests.exceptions.RequestException:
+            self._record(endpoint, None, 0, time.perf_counter() - start)
+            raise
+        self._record(endpoint, resp.status_code, len(resp.content), time.perf_counter() - start)
+        return resp
+
+    def get_ok(self, url, params=None, headers=None, timeout=None, attempts=None):
+        # 2xx 응답이 올 때까지 정해진 횟수만큼 재시도 (메타데이터, 랭킹 페이지 등)
+        attempts = attempts or self.attempts
+        for attempt in range(attempts):
+            try:
+                resp = self.get(url, params=params, headers=headers, timeout=timeout)
+                resp.raise_for_status()
+                return resp
+            except requests.exceptions.RequestException:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(self.attempt_delay * (attempt + 1))
+
+    def stats(self):
+        with self._lock:
+            return {
+                endpoint: dict(stat, status=dict(stat['status']))
+                for endpoint, stat in self._stats.items()
+            }
+
+    def percentiles(self, endpoint, points=(50, 95, 99)):
+        # 지연 시간 백분위(초), 표본이 없으면 빈 dict
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, []))
+        if not samples:
+            return {}
+        return {p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in points}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+            self._samples = {}
+
+    def summary(self):
+        parts = []
+        for endpoint, stat in sorted(self.stats().items()):
+            avg_ms = stat['seconds'] / stat['requests'] * 1000 if stat['requests'] else 0
+            status = ' '.join(f"{code}:{count:,}" for code, count in sorted(stat['status'].items()))
+            parts.append(
+                f"{endpoint} {stat['requests']:,}건 {stat['bytes'] / 1024 / 1024:.1f}MB "
+                f"평균 {avg_ms:.0f}ms 최대 {stat['max_seconds'] * 1000:.0f}ms ({status}, 오류 {stat['errors']:,})"
+            )
+        return ", ".join(parts)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NexonClient()
+        return _client
+
+
+def use_standin(url):
+    # 실행 중에 대체 서버로 전환(벤치마크용), 기존 클라이언트는 새 설정으로 교체
+    global _client
+    conf = dict(getattr(settings, 'NEXON_HTTP', {}), STANDIN_URL=url)
+    with _client_lock:
+        _client = NexonClient(conf)
+        return _client
+
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class KeyBucket:
+    """API 키 하나의 토큰 버킷 상태와 사용량 카운터"""
+
+    def __init__(self, index, key, rate, burst):
+        self.index = index
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.parked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+
+    def refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, now):
+        # 다음 토큰 1개를 쓸 수 있을 때까지 남은 시간
+        if now < self.parked_until:
+            return self.parked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class KeyScheduler:
+    """
+    API 키별 토큰 버킷 스케줄러
+    - 남은 예산(토큰)이 가장 많은 키를 우선 배정
+    - 429 응답을 받은 키는 쿨다운 동안 배정 대상에서 제외(park)
+    - 키별 요청 수/429 수 집계
+    """
+
+    def __init__(self, keys, rate=None, burst=None, cooldown=None):
+        conf = getattr(settings, 'API_KEY_SCHEDULER', {})
+        rate = rate or conf.get('RATE', 100)
+        burst = burst or conf.get('BURST', rate)
+        self.cooldown = cooldown or conf.get('COOLDOWN', 2.0)
+        self.buckets = [KeyBucket(idx, key, rate, burst) for idx, key in enumerate(keys)]
+        self._by_key = {bucket.key: bucket for bucket in self.buckets}
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        # (key, 0) 또는 (None, 대기 시간) 반환
+        with self._lock:
+            now = time.monotonic()
+            best = None
+            min_wait = None
+            for bucket in self.buckets:
+                bucket.refill(now)
+                wait = bucket.wait_time(now)
+                if wait == 0:
+                    if best is None or bucket.tokens > best.tokens:
+                        best = bucket
+                elif min_wait is None or wait < min_wait:
+                    min_wait = wait
+            if best is not None:
+                best.tokens -= 1
+                best.requests += 1
+                return best.key, 0.0
+            return None, min_wait or 0.01
+
+    def acquire(self):
+        # 모든 키가 소진/쿨다운 상태일 때만 가장 빠른 키가 풀릴 때까지 대기
+        while True:
+            key, wait = self.try_acquire()
+            if key is not None:
+                return key
+            time.sleep(wait)
+
+    def report(self, key, status_code):
+        # 응답 상태 보고: 429면 해당 키를 쿨다운 동안 제외
+        # None(타임아웃/연결 오류로 응답 없음)이면 남은 토큰을 비워 다음 요청은 토큰이 다시 찰 때까지 대기
+        if status_code not in (429, None):
+            return
+        with self._lock:
+            bucket = self._by_key.get(key)
+            if bucket is None:
+                return
+            bucket.tokens = min(bucket.tokens, 0.0)
+            if status_code == 429:
+                bucket.throttled += 1
+                bucket.parked_until = time.monotonic() + self.cooldown
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    'key': f"#{bucket.index + 1}",
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled,
+                    'parked': now < bucket.parked_until,
+                }
+                for bucket in self.buckets
+            ]
+
+    def reset_stats(self):
+        with self._lock:
+            for bucket in self.buckets:
+                bucket.requests = 0
+                bucket.throttled = 0
@@ -0,0 +1,97 @@
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.management.commands.nexon_standin import add_standin_arguments, standin_options
+from core.standin import start_standin
+
+# 보고서에 표시할 단계(엔드포인트) 순서
+STAGES = [
+    ('rank_inner', "랭킹 페이지"),
+    ('id', "OUID"),
+    ('user/match', "MATCH ID"),
+    ('match-detail', "MATCH DETAIL"),
+]
+
+
+class Command(BaseCommand):
+    help = "대체 서버를 띄워 crawl_managers 전체 흐름(랭킹 크롤링 + 선수 수집)의 처리량 측정"
+    # 시스템 체크가 views를 불러오면 실제 API에서 메타데이터를 받으므로 생략
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        add_standin_arguments(parser)
+        parser.add_argument('--engine', choices=['pipeline', 'threaded'], default=None)
+        parser.add_argument('--full', action='store_true', help="증분 갱신 없이 전체 매치 디테일 조회")
+        parser.add_argument('--stream', action='store_true', help="크롤링과 선수 수집을 동시에 진행 (crawl_managers --stream)")
+        parser.add_argument('--decode', choices=['auto', 'process', 'inline'], default=None,
+                            help="매치 디테일 응답 해석 방식 (기본: MATCH_DETAIL_DECODE['MODE'])")
+        parser.add_argument('--warm', action='store_true', help="기존 매치 디테일 디스크 캐시 사용(기본: 빈 임시 캐시)")
+        parser.add_argument('--yes', action='store_true', help="기본 DB(db.sqlite3)에 그대로 실행 (매니저/선수 데이터가 교체됨)")
+
+    def handle(self, *args, **options):
+        db_name = str(connections['default'].settings_dict['NAME'])
+        if db_name == str(settings.BASE_DIR / 'db.sqlite3') and not options['yes']:
+            raise CommandError(
+                "벤치마크는 매니저/선수 데이터를 교체합니다. FC_SUPPORT_DB=/tmp/bench.sqlite3 처럼 "
+                "별도 DB를 지정하거나 --yes로 실행하세요."
+            )
+        call_command('migrate', verbosity=0)
+
+        if not options['warm']:
+            cache_dir = tempfile.mkdtemp(prefix='bench_match_detail_')
+            settings.MATCH_DETAIL_CACHE = dict(getattr(settings, 'MATCH_DETAIL_CACHE', {}), DIR=cache_dir)
+
+        if options['decode']:
+            settings.MATCH_DETAIL_DECODE = dict(getattr(settings, 'MATCH_DETAIL_DECODE', {}), MODE=options['decode'])
+
+        server = start_standin(**standin_options(options))
+        from core.http import use_standin
+        client = use_standin(server.url)
+        self.stdout.write(f"대체 서버: {server.url}, DB: {db_name}")
+
+        from core.models import IngestRun
+        from core.snapshots import live_managers, live_players
+        start_time = time.time()
+        try:
+            call_command('crawl_managers', engine=options['engine'], full=options['full'], stream=options['stream'])
+        finally:
+            elapsed = time.time() - start_time
+            server.shutdown()
+            server.server_close()
+
+        engine = 'pipeline' if options['stream'] else options['engine'] or getattr(settings, 'INGEST_ENGINE', 'pipeline')
+        managers = live_managers().count()
+        players = live_players().count()
+        stats = client.stats()
+        total_requests = sum(stat['requests'] for stat in stats.values())
+
+        self.stdout.write("")
+        from core.match_detail import get_fetcher, orjson
+        decoder = get_fetcher().decoder
+        run = IngestRun.objects.order_by('-started_at').first()
+        collect_seconds = (run.metrics or {}).get('collect_seconds', 0) if run else 0
+        self.stdout.write(f"엔진: {engine}, 전체 {elapsed:.1f}초 (선수 수집 {collect_seconds:.1f}초)")
+        self.stdout.write(
+            f"매치 디테일 해석: {decoder.mode}" + (f" (프로세스 {decoder.workers}개)" if decoder.mode == 'process' else '')
+            + f", {'orjson' if orjson is not None else 'json'}"
+        )
+        self.stdout.write(f"매니저 {managers:,}명 ({managers / elapsed:.1f}명/s), 선수 {players:,}명")
+        self.stdout.write(f"요청 {total_requests:,}건 ({total_requests / elapsed:.1f}건/s)")
+        for endpoint, label in STAGES:
+            stat = stats.get(endpoint)
+            if not stat:
+                self.stdout.write(f"  {label:<13} 요청 없음")
+                continue
+            span = max(stat['last'] - stat['first'], 1e-6)
+            p = client.percentiles(endpoint)
+            status = ' '.join(f"{code}:{count:,}" for code, count in sorted(stat['status'].items()))
+            self.stdout.write(
+                f"  {label:<13} {stat['requests']:>7,}건 {stat['requests'] / span:>8.1f}건/s  "
+                f"p50 {p[50] * 1000:>6.1f}ms  p95 {p[95] * 1000:>6.1f}ms  p99 {p[99] * 1000:>6.1f}ms  "
+                f"({status}, 오류 {stat['errors']:,})"
+            )
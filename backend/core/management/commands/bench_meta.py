@@ -0,0 +1,133 @@
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.meta import SEASON_DIVISOR, TABLES, clean_season_name, get_store, make_resolver
+
+
+def build_dicts(texts):
+    # 기존 방식: str(id) → 이름 dict, 시즌/포지션 dict
+    raw = {name: json.loads(text) for name, text in texts.items()}
+    return (
+        {str(item['id']): item['name'] for item in raw['spid']},
+        {int(item['seasonId']): item['className'] for item in raw['season']},
+        {int(item['spposition']): item['desc'] for item in raw['position']},
+    )
+
+
+def build_tables(texts):
+    return tuple(TABLES[name][1](json.loads(texts[name])) for name in ('spid', 'season', 'position'))
+
+
+def resolve_dicts(tables, players):
+    # 기존 process_player_data와 같은 변환 (선수마다 문자열 변환/슬라이스/정규식)
+    spids, seasons, positions = tables
+    out = []
+    for p in players:
+        spid = str(p['spId'])
+        season_id = int(spid[:3])
+        season = clean_season_name(seasons.get(season_id, str(season_id)))
+        out.append((spids.get(spid, spid), season, positions.get(p['spPosition'], str(p['spPosition']))))
+    return out
+
+
+def resolve_tables(tables, players):
+    # 저장 경로와 같은 변환 함수(meta.make_resolver) 사용
+    resolve = make_resolver(*tables)
+    return [resolve(p['spId'], p['spPosition']) for p in players]
+
+
+def measure_memory(build, texts):
+    # 원본 JSON을 읽어 조회표를 만든 뒤(원본 목록은 버림) 남아 있는 메모리(바이트)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tables = build(texts)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return tables, size
+
+
+class Command(BaseCommand):
+    help = "메타데이터 조회표(정렬 id 배열 + intern 이름)와 기존 dict+정규식 방식의 메모리/선수 변환 속도 비교"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['synthetic', 'store'], default='synthetic',
+                            help="메타데이터 원본: synthetic(실제 규모로 생성) 또는 store(메타데이터 저장소의 현재 버전)")
+        parser.add_argument('--spids', type=int, default=60000, help="synthetic 선수 카드(spid) 수")
+        parser.add_argument('--players', type=int, default=110000, help="변환할 선수 행 수 (매니저 1만 명 x 11명)")
+        parser.add_argument('--repeat', type=int, default=5, help="반복 횟수 (가장 빠른 회차 기준)")
+
+    def handle(self, *args, **options):
+        raw = self.load_raw(options)
+        texts = {name: json.dumps(raw[name], ensure_ascii=False) for name in TABLES}
+        players = self.make_players(raw, options['players'])
+        self.stdout.write(
+            f"메타데이터: 선수 카드 {len(raw['spid']):,} / 시즌 {len(raw['season']):,} / 포지션 {len(raw['position']):,}, "
+            f"선수 행 {len(players):,}"
+        )
+
+        dicts, dict_bytes = measure_memory(build_dicts, texts)
+        tables, table_bytes = measure_memory(build_tables, texts)
+        self.stdout.write(
+            f"메모리: dict {dict_bytes / 1024 / 1024:.2f}MB, 조회표 {table_bytes / 1024 / 1024:.2f}MB "
+            f"({dict_bytes / max(table_bytes, 1):.1f}배 절감)"
+        )
+
+        expected = resolve_dicts(dicts, players)
+        actual = resolve_tables(tables, players)
+        mismatches = [(a, b) for a, b in zip(expected, actual) if a != b]
+        if mismatches:
+            raise CommandError(f"변환 결과 불일치 {len(mismatches):,}건, 예: dict={mismatches[0][0]} 조회표={mismatches[0][1]}")
+
+        timings = {}
+        for name, resolve, built in (('dict', resolve_dicts, dicts), ('조회표', resolve_tables, tables)):
+            best = None
+            for _ in range(max(options['repeat'], 1)):
+                start = time.perf_counter()
+                resolve(built, players)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+        for name, seconds in timings.items():
+            self.stdout.write(f"  {name:<4} {seconds * 1000:>8.1f}ms  {len(players) / seconds:>12,.0f}행/s")
+        self.stdout.write(f"변환 결과 일치, 조회표가 {timings['dict'] / timings['조회표']:.1f}배 빠름")
+
+    def load_raw(self, options):
+        if options['source'] == 'store':
+            store = get_store()
+            return {name: store.raw(name) for name in TABLES}
+
+        # 실제 spid.json과 비슷한 분포: 시즌 100여 개, 한 선수가 여러 시즌 카드로 등장
+        rnd = random.Random(1)
+        seasons = [
+            {'seasonId': season_id, 'className': f"시즌{season_id} ({season_id % 7 + 2}{'TH' if season_id % 2 else 'ST'})"}
+            for season_id in range(100, 330, 2)
+        ]
+        players = [f"선수 {idx:05d} {'가나다라마바사'[idx % 7]}" for idx in range(options['spids'] // 4)]
+        spids = {}
+        while len(spids) < options['spids']:
+            season = rnd.choice(seasons)['seasonId']
+            person = rnd.randrange(len(players))
+            spids[season * SEASON_DIVISOR + person] = players[person]
+        return {
+            'spid': [{'id': spid, 'name': name} for spid, name in spids.items()],
+            'season': seasons,
+            'position': [{'spposition': idx, 'desc': f"P{idx}"} for idx in range(29)],
+        }
+
+    def make_players(self, raw, count):
+        # 알 수 없는 spid/시즌도 일부 섞어 기본값 처리까지 비교
+        rnd = random.Random(2)
+        known = [item['id'] for item in raw['spid']]
+        players = []
+        for idx in range(count):
+            spid = rnd.choice(known) if idx % 50 else 999 * SEASON_DIVISOR + rnd.randrange(1000)
+            players.append({'spId': spid, 'spPosition': rnd.randrange(29), 'spGrade': rnd.randint(1, 10)})
+        return players
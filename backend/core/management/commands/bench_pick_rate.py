@@ -0,0 +1,109 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Manager, Player
+from core.pick_index import POSITION_GROUPS, PickRateIndex
+from core.snapshots import live_snapshot_id
+
+
+def legacy_pick_rate(snapshot_id, rank_range, team_color, top_n):
+    # 기존 get_pick_rate의 포지션별 집계 (포지션마다 distinct 조회 + 선수마다 top_users 조회)
+    manager_filter = {'rank__lte': rank_range}
+    if team_color:
+        manager_filter['team_color'] = team_color
+    filtered_managers = Manager.objects.filter(snapshot_id=snapshot_id, **manager_filter)
+    manager_count = filtered_managers.count()
+    players = Player.objects.filter(snapshot_id=snapshot_id)
+
+    result = {}
+    for position, sub_positions in POSITION_GROUPS.items():
+        unique_players = (
+            players.filter(manager__in=filtered_managers, position__in=sub_positions)
+            .values('manager_id', 'player_name', 'season', 'grade')
+            .distinct()
+        )
+        player_counter = {}
+        for up in unique_players:
+            player_counter.setdefault((up['player_name'], up['season'], up['grade']), set()).add(up['manager_id'])
+        player_list = [
+            {'player_name': k[0], 'season': k[1], 'grade': k[2], 'user_count': len(v)}
+            for k, v in player_counter.items()
+        ]
+        player_list.sort(key=lambda x: (-x['user_count'], -int(x['season'] if str(x['season']).isdigit() else 0), -x['grade']))
+        player_list = player_list[:top_n]
+        position_total = manager_count if manager_count else 1
+        for p in player_list:
+            p['usage_rate'] = round(p['user_count'] * 100.0 / position_total, 1)
+            top_nicknames = list(
+                players.filter(
+                    manager__in=filtered_managers,
+                    position__in=sub_positions,
+                    player_name=p['player_name'],
+                    season=p['season'],
+                    grade=p['grade'],
+                ).values_list('manager__nickname', flat=True).distinct()[:3]
+            )
+            p['top_users'] = top_nicknames
+            p['remaining_users'] = p['user_count'] - len(top_nicknames)
+        if player_list:
+            result[position] = player_list
+    return manager_count, result
+
+
+class Command(BaseCommand):
+    help = "픽률 포지션별 집계: 기존 ORM 방식과 스냅샷 등수 누적 색인의 결과 비교 및 응답 시간 측정"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--snapshot', type=int, help="대상 스냅샷 id (기본: 공개 스냅샷)")
+        parser.add_argument('--rank-ranges', default='1,10,50,100,500,1000,5000,10000',
+                            help="비교할 rank_range 목록 (쉼표 구분)")
+        parser.add_argument('--top-n', default='3,10', help="비교할 top_n 목록 (쉼표 구분)")
+        parser.add_argument('--team-colors', type=int, default=3,
+                            help="전체 외에 비교할 팀컬러 수 (매니저가 많은 순)")
+        parser.add_argument('--no-legacy', action='store_true', help="기존 방식 비교 생략 (색인만 측정)")
+
+    def handle(self, *args, **options):
+        snapshot_id = options['snapshot'] or live_snapshot_id()
+        if snapshot_id is None:
+            raise CommandError("공개된 스냅샷이 없습니다.")
+        rank_ranges = [int(value) for value in options['rank_ranges'].split(',')]
+        top_ns = [int(value) for value in options['top_n'].split(',')]
+
+        start = time.perf_counter()
+        index = PickRateIndex(snapshot_id)
+        build_seconds = time.perf_counter() - start
+        colors = sorted(index.team_colors, key=lambda color: -len(index.team_colors[color].ranks))
+        team_colors = [''] + colors[:max(options['team_colors'], 0)]
+        self.stdout.write(
+            f"스냅샷 #{snapshot_id}: 매니저 {len(index.all.ranks):,}명, 팀컬러 {len(index.team_colors):,}개, "
+            f"색인 생성 {build_seconds:.2f}s"
+        )
+
+        timings = {'legacy': 0.0, 'index': 0.0}
+        cases = 0
+        for team_color in team_colors:
+            view = index.view(team_color)
+            for rank_range in rank_ranges:
+                for top_n in top_ns:
+                    start = time.perf_counter()
+                    manager_count = view.manager_count(rank_range)
+                    actual = view.pick_rate(rank_range, top_n, manager_count)
+                    timings['index'] += time.perf_counter() - start
+                    cases += 1
+                    if options['no_legacy']:
+                        continue
+                    start = time.perf_counter()
+                    expected = legacy_pick_rate(snapshot_id, rank_range, team_color, top_n)
+                    timings['legacy'] += time.perf_counter() - start
+                    if expected != (manager_count, actual):
+                        raise CommandError(
+                            f"결과 불일치: team_color={team_color!r} rank_range={rank_range} top_n={top_n}"
+                        )
+
+        self.stdout.write(f"조건 {cases}건 ({len(team_colors)}개 팀컬러 조건 x rank_range {len(rank_ranges)} x top_n {len(top_ns)})")
+        self.stdout.write(f"  색인 {timings['index'] * 1000 / cases:>9.2f}ms/건")
+        if not options['no_legacy']:
+            self.stdout.write(f"  기존 {timings['legacy'] * 1000 / cases:>9.2f}ms/건")
+            self.stdout.write(f"결과 일치, 색인이 {timings['legacy'] / max(timings['index'], 1e-9):.0f}배 빠름")
@@ -0,0 +1,129 @@
+import concurrent.futures
+import itertools
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.rank_parser import BACKENDS, available_backends, parse_club_value
+
+RANK_URL = "https://fconline.nexon.com/datacenter/rank_inner?rt=manager&n4pageno={page}"
+
+# 구단 가치 표기 → 기대값 (경/조/억/만 단위, 단위 없는 숫자는 만 단위)
+CLUB_VALUE_CASES = [
+    ('2경 3조 4억 5000만', 2 * 10**16 + 3 * 10**12 + 4 * 10**8 + 5000 * 10**4),
+    ('1380 2351만', 2351 * 10**4 + 1380 * 10**4),
+    ('5400만', 5400 * 10**4),
+    ('2경 2197', 2 * 10**16 + 2197 * 10**4),
+    ('32조 9,944억 7,622만', 32 * 10**12 + 9944 * 10**8 + 7622 * 10**4),
+    ('1,234억', 1234 * 10**8),
+    ('', 0),
+]
+
+
+def default_corpus_dir():
+    return Path(settings.BASE_DIR) / 'cache' / 'rank_pages'
+
+
+class Command(BaseCommand):
+    help = "저장된 랭킹 페이지(rank_inner) HTML로 파서 백엔드별 결과 일치 여부와 처리 속도 측정"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', default=None, help="랭킹 페이지 HTML 디렉터리 (기본: cache/rank_pages)")
+        parser.add_argument('--fetch', action='store_true',
+                            help="랭킹 페이지를 새로 받아 저장 (NEXON_STANDIN_URL 지정 시 대체 서버에서 받음)")
+        parser.add_argument('--pages', type=int, default=500, help="저장/생성할 페이지 수")
+        parser.add_argument('--backends', default=None, help="비교할 백엔드 (쉼표 구분, 기본: 설치된 전체)")
+        parser.add_argument('--repeat', type=int, default=3, help="백엔드별 반복 횟수 (가장 빠른 회차 기준)")
+        parser.add_argument('--threads', type=int, default=1,
+                            help="동시에 파싱할 스레드 수 (crawl_managers처럼 여러 스레드가 GIL을 나누는 상황 측정)")
+
+    def handle(self, *args, **options):
+        self.check_club_values()
+
+        corpus = Path(options['corpus']) if options['corpus'] else default_corpus_dir()
+        if options['fetch'] or not list(corpus.glob('page-*.html')):
+            self.save_corpus(corpus, options['pages'], options['fetch'])
+        pages = [path.read_text(encoding='utf-8') for path in sorted(corpus.glob('page-*.html'))]
+        self.stdout.write(f"코퍼스: {corpus} ({len(pages):,}페이지, {sum(map(len, pages)) / 1024 / 1024:.1f}MB)")
+
+        backends = options['backends'].split(',') if options['backends'] else available_backends()
+        for name in backends:
+            if name not in BACKENDS:
+                raise CommandError(f"알 수 없는 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+            if name not in available_backends():
+                raise CommandError(f"{name} 백엔드를 사용할 수 없습니다 (패키지 미설치)")
+
+        results = {}
+        timings = {}
+        for name in backends:
+            results[name], timings[name] = self.run_backend(name, pages, options['repeat'], options['threads'])
+
+        # bs4(기존 파서) 결과를 기준으로 모든 백엔드의 매니저 dict 비교
+        reference = 'bs4' if 'bs4' in results else backends[0]
+        mismatches = 0
+        for name in backends:
+            for idx, (expected, actual) in enumerate(zip(results[reference], results[name])):
+                if expected != actual:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        row = next(pair for pair in itertools.zip_longest(expected, actual) if pair[0] != pair[1])
+                        self.stderr.write(f"[{name}] {idx + 1}번째 페이지 결과 불일치: {reference}={row[0]} {name}={row[1]}")
+
+        rows = sum(len(page) for page in results[reference])
+        self.stdout.write(f"매니저 {rows:,}행, 스레드 {options['threads']}개, 반복 {options['repeat']}회 중 최단 시간")
+        base = timings.get('bs4')
+        for name in backends:
+            seconds = timings[name]
+            speedup = f"  (bs4 대비 {base / seconds:.1f}배)" if base and name != 'bs4' else ''
+            self.stdout.write(
+                f"  {name:<5} {seconds:>7.3f}초  {len(pages) / seconds:>8.1f}페이지/s  "
+                f"{rows / seconds:>10,.0f}행/s  페이지당 {seconds / max(len(pages), 1) * 1000:.2f}ms{speedup}"
+            )
+        if mismatches:
+            raise CommandError(f"백엔드 간 결과가 다른 페이지 {mismatches:,}개")
+        self.stdout.write(f"모든 백엔드 결과 일치 ({', '.join(backends)})")
+
+    def check_club_values(self):
+        for text, expected in CLUB_VALUE_CASES:
+            actual = parse_club_value(text)
+            if actual != expected:
+                raise CommandError(f"구단 가치 변환 오류: {text!r} → {actual:,} (기대값 {expected:,})")
+        self.stdout.write(f"구단 가치 변환 {len(CLUB_VALUE_CASES)}건 확인")
+
+    def save_corpus(self, corpus, count, fetch):
+        corpus.mkdir(parents=True, exist_ok=True)
+        if fetch:
+            from core.http import get_client
+            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+            client = get_client()
+            pages = (client.get_ok(RANK_URL.format(page=page), headers=headers).text for page in range(1, count + 1))
+            source = client.url(RANK_URL.format(page=1)).split('/datacenter')[0]
+        else:
+            # 받아 둔 페이지가 없으면 대체 서버와 같은 데이터로 생성 (선수 메타데이터는 필요 없으므로 읽지 않음)
+            from core.standin import PAGE_SIZE, StandinData
+            data = StandinData(managers=count * PAGE_SIZE, meta_dir=corpus)
+            pages = (data.rank_page(page) for page in range(1, count + 1))
+            source = "대체 서버 데이터"
+        saved = 0
+        for page, html in enumerate(pages, start=1):
+            (corpus / f"page-{page:03d}.html").write_text(html, encoding='utf-8')
+            saved += 1
+        self.stdout.write(f"랭킹 페이지 {saved:,}개 저장 ({source})")
+
+    def run_backend(self, name, pages, repeat, threads):
+        parse = BACKENDS[name]
+        best = None
+        results = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            if threads > 1:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+                    results = list(executor.map(parse, pages))
+            else:
+                results = [parse(html) for html in pages]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return results, best
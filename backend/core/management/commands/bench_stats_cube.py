@@ -0,0 +1,134 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core.models import Manager
+from core.snapshots import live_snapshot_id
+from core.stats_cube import StatsCube
+
+
+def legacy_stat(managers, field, is_rank=False):
+    # 기존 방식: 값 목록 전체 조회 + 최솟값/최댓값 매니저를 .first()로 한 번씩 더 조회
+    values = list(managers.values_list(field, flat=True))
+    if not values:
+        return {'avg': None, 'min': None, 'max': None, 'min_nickname': None, 'max_nickname': None}
+    min_value, max_value = min(values), max(values)
+    min_manager = managers.filter(**{field: min_value}).first()
+    max_manager = managers.filter(**{field: max_value}).first()
+    avg = round(sum(values) / len(values), 1)
+    if is_rank:
+        return {'avg': avg, 'max': min_value, 'min': max_value,
+                'max_nickname': min_manager.nickname, 'min_nickname': max_manager.nickname}
+    return {'avg': avg, 'min': min_value, 'max': max_value,
+            'min_nickname': min_manager.nickname, 'max_nickname': max_manager.nickname}
+
+
+def legacy_pick_rate_stats(snapshot_id, rank_range, team_color):
+    # 기존 get_pick_rate의 포메이션 순위 + 등수/점수/구단가치 통계
+    manager_filter = {'rank__lte': rank_range}
+    if team_color:
+        manager_filter['team_color'] = team_color
+    managers = Manager.objects.filter(snapshot_id=snapshot_id, **manager_filter)
+    manager_count = managers.count()
+    formation_total = manager_count if manager_count else 1
+    formation_stats = managers.values('formation').annotate(count=Count('id')).order_by('-count')
+    return {
+        'manager_count': manager_count,
+        'formation_rank': [
+            {
+                'rank': idx + 1,
+                'formation': f['formation'],
+                'percentage': round(f['count'] * 100.0 / formation_total, 1),
+                'count': f['count'],
+                'top_users': list(
+                    managers.filter(formation=f['formation']).values_list('nickname', flat=True).order_by('rank')[:3]
+                ),
+            }
+            for idx, f in enumerate(formation_stats)
+        ],
+        'rank_stats': legacy_stat(managers, 'rank', is_rank=True),
+        'score_stats': legacy_stat(managers, 'score'),
+        'club_value_stats': legacy_stat(managers, 'club_value'),
+    }
+
+
+def legacy_team_color_stats(snapshot_id, rank_range, top_n):
+    # 기존 get_team_color_stats (팀컬러마다 통계 3개 + 포메이션 집계 조회)
+    managers = Manager.objects.filter(snapshot_id=snapshot_id, rank__lte=rank_range)
+    total = managers.count() if managers.exists() else 1
+    color_stats = managers.values('team_color').exclude(team_color='').annotate(count=Count('id')).order_by('-count')
+    result = []
+    for idx, color in enumerate(color_stats[:top_n]):
+        color_managers = managers.filter(team_color=color['team_color'])
+        formation_stats = (
+            color_managers.values('formation').exclude(formation='')
+            .annotate(count=Count('id')).order_by('-count')[:3]
+        )
+        result.append({
+            'rank': idx + 1,
+            'team_color': color['team_color'],
+            'count': color['count'],
+            'percentage': round(color['count'] * 100.0 / total, 1),
+            'details': {
+                'club_value': legacy_stat(color_managers, 'club_value'),
+                'rank': legacy_stat(color_managers, 'rank'),
+                'score': legacy_stat(color_managers, 'score'),
+                'formation_rank': [
+                    {'rank': i + 1, 'formation': f['formation'], 'count': f['count']}
+                    for i, f in enumerate(formation_stats)
+                ],
+            },
+        })
+    return result
+
+
+class Command(BaseCommand):
+    help = "팀컬러/포메이션 통계: 기존 ORM 방식과 스냅샷 통계 큐브의 결과 비교 및 응답 시간 측정"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--snapshot', type=int, help="대상 스냅샷 id (기본: 공개 스냅샷)")
+        parser.add_argument('--rank-ranges', default='1,10,50,99,100,250,500,1000,5000,10000',
+                            help="비교할 rank_range 목록 (쉼표 구분)")
+        parser.add_argument('--top-n', type=int, default=10, help="팀컬러 순위 top_n")
+
+    def handle(self, *args, **options):
+        snapshot_id = options['snapshot'] or live_snapshot_id()
+        if snapshot_id is None:
+            raise CommandError("공개된 스냅샷이 없습니다.")
+        rank_ranges = [int(value) for value in options['rank_ranges'].split(',')]
+
+        start = time.perf_counter()
+        cube = StatsCube(snapshot_id)
+        build_seconds = time.perf_counter() - start
+        team_colors = [''] + sorted({manager[3] for manager in cube.managers})
+        self.stdout.write(
+            f"스냅샷 #{snapshot_id}: 매니저 {len(cube.managers):,}명, 누적 구간 {len(cube.prefix)}개, "
+            f"큐브 생성 {build_seconds:.2f}s"
+        )
+
+        timings = {name: [0.0, 0.0, 0] for name in ('팀컬러 통계', '픽률 통계')}
+        for rank_range in rank_ranges:
+            cases = [('팀컬러 통계', cube.team_color_stats, legacy_team_color_stats, (rank_range, options['top_n']))]
+            cases += [
+                ('픽률 통계', cube.pick_rate_stats, legacy_pick_rate_stats, (rank_range, team_color))
+                for team_color in team_colors
+            ]
+            for name, current, legacy, params in cases:
+                start = time.perf_counter()
+                actual = current(*params)
+                middle = time.perf_counter()
+                expected = legacy(snapshot_id, *params)
+                timings[name][0] += middle - start
+                timings[name][1] += time.perf_counter() - middle
+                timings[name][2] += 1
+                if actual != expected:
+                    raise CommandError(f"결과 불일치: {name} {params}")
+
+        for name, (cube_seconds, legacy_seconds, count) in timings.items():
+            self.stdout.write(
+                f"  {name:<8} {count:>3}건  큐브 {cube_seconds * 1000 / count:>7.2f}ms/건  "
+                f"기존 {legacy_seconds * 1000 / count:>8.2f}ms/건  ({legacy_seconds / max(cube_seconds, 1e-9):.0f}배)"
+            )
+        self.stdout.write("결과 일치")
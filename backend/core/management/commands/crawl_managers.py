@@ -1,34 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
-import re
 import time
 import datetime
-from django.db import transaction
-from django.core.management.base import BaseCommand
-from core.models import Manager, ManagerTemp
+from django.core.management.base import BaseCommand, CommandError
+from core.http import get_client
+from core.rank_parser import parse_rank_page
 import concurrent.futures
 import random
 import logging
 
-def parse_club_value(text):
-    text = text.replace(",", "").strip()
-    total = 0
-    units = {'만': 10**4, '억': 10**8, '조': 10**12, '경': 10**16}
-    # ex: '2경 3조 4억 5000만', '1380 2351만', '5400만', '2경 2197'
-    # 숫자+단위 조합 추출
-    matches = re.findall(r'(\d+)([만억조경])', text)
-    for num, unit in matches:
-        total += int(num) * units[unit]
-    # 단위 없는 숫자(예: '2197')가 있으면 만 단위로 간주
-    remain = re.sub(r'(\d+[만억조경])', '', text).strip()
-    if remain.isdigit():
-        total += int(remain) * 10000
-    return total
-
-def clean_team_color(text):
-    # '유벤투스 (11명)' -> '유벤투스'
-    return re.sub(r"\s*\(.*\)$", "", text.strip())
-
 def log_with_time(msg):
     now = datetime.datetime.now().strftime('[%Y년 %m월 %d일 %H시 %M분 %S초]')
     if "[크롤링]" in msg:
@@ -38,17 +16,9 @@ def log_with_time(msg):
     else:
         print(f"{now} {msg}")
 
-def robust_request(url, params=None, headers=None, max_retries=3, sleep_sec=1):
-    for attempt in range(max_retries):
-        try:
-            resp = requests.get(url, params=params, headers=headers, timeout=10)
-            resp.raise_for_status()
-            return resp
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(sleep_sec)
-            else:
-                raise e
+def robust_request(url, params=None, headers=None, max_retries=3):
+    # 공용 HTTP 클라이언트로 요청(연결 재사용, 실패 시 재시도)
+    return get_client().get_ok(url, params=params, headers=headers, attempts=max_retries)
 
 def crawl_page(page):
     url = f"https://fconline.nexon.com/datacenter/rank_inner?rt=manager&n4pageno={page}"
@@ -56,49 +26,7 @@ def crawl_page(page):
     for attempt in range(3):  # 최대 3번 재시도
         try:
             resp = robust_request(url, headers=headers)
-            soup = BeautifulSoup(resp.text, "html.parser")
-            rows = soup.select(".tbody .tr")
-            managers = []
-            
-            for row in rows:
-                try:
-                    # rank 파싱
-                    rank_elem = row.select_one(".rank_no")
-                    if not rank_elem:
-                        continue
-                    rank = int(rank_elem.text.strip())
-                    
-                    # nickname 파싱
-                    nickname = row.select_one(".name.profile_pointer").text.strip()
-                    
-                    # club_value 파싱
-                    club_value_text = row.select_one(".price").get("alt") or row.select_one(".price").text
-                    club_value = int(club_value_text.replace(",", "")) if club_value_text.isdigit() else parse_club_value(row.select_one(".price").text)
-                    
-                    # team_color 파싱
-                    team_color_elem = row.select_one(".td.team_color")
-                    team_color = clean_team_color(team_color_elem.text.strip()) if team_color_elem else "알 수 없음"
-                    
-                    # formation 파싱
-                    formation = row.select_one(".td.formation").text.strip()
-                    
-                    # score 파싱
-                    score = int(float(row.select_one(".td.rank_r_win_point").text.strip()))
-                    
-                    managers.append({
-                        "rank": rank,
-                        "nickname": nickname,
-                        "club_value": club_value,
-                        "team_color": team_color,
-                        "formation": formation,
-                        "score": score,
-                    })
-                except Exception as e:
-                    print(f"[DEBUG] 행 파싱 실패: {e}")
-                    continue
-            
-            return managers
-            
+            return parse_rank_page(resp.text)
         except Exception as e:
             if attempt == 2:  # 마지막 시도였다면
                 raise e
@@ -115,7 +43,28 @@ def crawl_page_safe(page):
 class Command(BaseCommand):
     help = "FC온라인 랭커 데이터 최초 수집 및 저장"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engine',
+            choices=['pipeline', 'threaded'],
+            default=None,
+            help="선수 데이터 수집 엔진 (기본값: settings.INGEST_ENGINE)",
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help="증분 갱신 없이 모든 매니저의 매치 디테일을 다시 조회",
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help="랭킹 페이지를 받는 즉시 선수 수집 단계로 전달 (크롤링과 수집 동시 진행, pipeline 엔진 사용)",
+        )
+
     def handle(self, *args, **options):
+        get_client().reset_stats()
+        if options.get('stream'):
+            return self.handle_stream(options)
         total = 0
         failed = []
         all_data = []
@@ -144,7 +93,45 @@ class Command(BaseCommand):
                 total += len(batch_data)
                 log_with_time(f"[크롤링] {batch_start} ~ {batch_end} 페이지 크롤링 완료({total:,}/10,000)")
 
-        # 1차 전체 크롤링 후, 누락된 페이지 탐색 (20명 미만 데이터 수집된 페이지)
+        self.log_missing(page_to_count)
+        log_with_time(f"[크롤링] 크롤링 완료 ({len(all_data):,}/10,000)")
+        # DB 저장: 새 스냅샷에 매니저 저장 (선수 수집이 끝나고 공개되기 전까지 기존 데이터가 계속 조회됨)
+        from core.snapshots import create_snapshot
+        snapshot = create_snapshot(all_data)
+        log_with_time(f"[크롤링] 스냅샷 #{snapshot.pk} 매니저 {len(all_data):,}명 저장")
+        # 새로 보이거나 만료된 닉네임의 OUID 캐시 예열
+        from core.ouid_cache import warm_ouid_cache
+        warm_ouid_cache(m["nickname"] for m in all_data)
+        # 크롤링 후 자동으로 API 호출 및 Player 저장
+        from core.tasks import fetch_and_save_players_for_all_managers
+        if not fetch_and_save_players_for_all_managers(
+            engine=options.get('engine'),
+            incremental=False if options.get('full') else None,
+            snapshot=snapshot,
+        ):
+            raise CommandError(f"스냅샷 #{snapshot.pk} 선수 수집 실패")
+
+    def handle_stream(self, options):
+        from core.pipeline import ManagerStream
+        from core.snapshots import create_snapshot
+        from core.tasks import fetch_and_save_players_for_all_managers
+        if options.get('engine') == 'threaded':
+            log_with_time("[크롤링] --stream은 pipeline 엔진으로만 동작합니다 (threaded 무시)")
+        # 빈 스냅샷을 만들고 페이지마다 매니저를 저장 (선수 수집이 끝나고 공개되기 전까지 기존 데이터가 계속 조회됨)
+        snapshot = create_snapshot()
+        log_with_time(f"[크롤링] 스냅샷 #{snapshot.pk} 스트리밍 수집 시작 (랭킹 페이지 → 선수 수집)")
+        stream = ManagerStream(snapshot, range(1, 501), crawl_page_safe, workers=50)
+        succeeded = fetch_and_save_players_for_all_managers(
+            incremental=False if options.get('full') else None,
+            stream=stream,
+        )
+        self.log_missing(stream.page_counts)
+        log_with_time(f"[크롤링] 크롤링 완료 ({stream.count:,}/10,000)")
+        if not succeeded:
+            raise CommandError(f"스냅샷 #{snapshot.pk} 선수 수집 실패")
+
+    def log_missing(self, page_to_count):
+        # 전체 크롤링 후, 누락된 페이지 탐색 (20명 미만 데이터 수집된 페이지)
         missing_pages = [page for page, count in page_to_count.items() if count < 20]
         failed_ranks = []
         for page in missing_pages:
@@ -156,30 +143,3 @@ class Command(BaseCommand):
         # 실패 페이지는 출력하지 않음
         if failed_ranks:
             log_with_time(f"[크롤링] 크롤링 실패 등수 - {sorted(failed_ranks)}")
-
-        log_with_time(f"[크롤링] 크롤링 완료 ({len(all_data):,}/10,000)")
-        # DB 저장
-        with transaction.atomic():
-            # 1. ManagerTemp 비우기
-            ManagerTemp.objects.all().delete()
-            # 2. 크롤링 데이터 임시 저장
-            temp_objs = [ManagerTemp(**m) for m in all_data]
-            ManagerTemp.objects.bulk_create(temp_objs)
-            # 3. Manager 테이블 초기화
-            Manager.objects.all().delete()
-            # 4. ManagerTemp → Manager로 복사
-            for temp in ManagerTemp.objects.all():
-                Manager.objects.create(
-                    rank=temp.rank,
-                    nickname=temp.nickname,
-                    club_value=temp.club_value,
-                    team_color=temp.team_color,
-                    formation=temp.formation,
-                    score=temp.score,
-                    created_at=temp.created_at,
-                )
-            # 5. ManagerTemp 비우기
-            ManagerTemp.objects.all().delete()
-        # 크롤링 후 자동으로 API 호출 및 Player 저장
-        from core.tasks import fetch_and_save_players_for_all_managers
-        fetch_and_save_players_for_all_managers()
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core.models import IngestRun
+
+
+class Command(BaseCommand):
+    help = "선수 데이터 수집 실행(run) 조회/재개/중단/정리"
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'show', 'resume', 'abandon', 'prune'])
+        parser.add_argument('run_id', nargs='?')
+        parser.add_argument('--limit', type=int, default=20, help="list에서 보여줄 실행 수")
+        parser.add_argument('--engine', choices=['pipeline', 'threaded'], default=None)
+
+    def handle(self, *args, **options):
+        action = options['action']
+        if action == 'list':
+            return self.list_runs(options['limit'])
+        if action == 'prune':
+            from core.run_state import prune_runs
+            cleared, removed = prune_runs()
+            self.stdout.write(f"체크포인트 정리 {cleared:,}개 실행, 실행 기록 삭제 {removed:,}개")
+            return
+
+        run_id = options.get('run_id')
+        if not run_id:
+            raise CommandError(f"{action}에는 run_id가 필요합니다.")
+        try:
+            run = IngestRun.objects.get(run_id=run_id)
+        except IngestRun.DoesNotExist:
+            raise CommandError(f"실행을 찾을 수 없습니다: {run_id}")
+
+        if action == 'show':
+            self.show_run(run)
+        elif action == 'resume':
+            if run.status in ('completed', 'abandoned'):
+                raise CommandError(f"이미 종료된 실행입니다: {run_id} ({run.status})")
+            from core.tasks import fetch_and_save_players_for_all_managers
+            ok = fetch_and_save_players_for_all_managers(engine=options.get('engine'), run_id=run_id)
+            if not ok:
+                raise CommandError(f"실행 재개 실패: {run_id}")
+        elif action == 'abandon':
+            from core.run_state import RunState
+            RunState(run).finish('abandoned')
+            self.stdout.write(f"{run_id} 실행을 중단 처리했습니다.")
+
+    def checkpoint_counts(self, run):
+        counts = dict(run.checkpoints.values_list('kind').annotate(count=Count('id')))
+        return f"OUID {counts.get('ouid', 0):,} / MATCH ID {counts.get('match', 0):,} / 스쿼드 {counts.get('squad', 0):,}"
+
+    def list_runs(self, limit):
+        for run in IngestRun.objects.order_by('-started_at')[:limit]:
+            self.stdout.write(
+                f"{run.run_id}  {run.status:<9} {run.stage or '-':<12} "
+                f"{run.started_at:%Y-%m-%d %H:%M:%S}  {self.checkpoint_counts(run)}"
+            )
+
+    def show_run(self, run):
+        self.stdout.write(f"실행 ID : {run.run_id}")
+        self.stdout.write(f"상태    : {run.get_status_display()} ({run.status})")
+        self.stdout.write(f"단계    : {run.stage or '-'}")
+        self.stdout.write(f"시작    : {run.started_at:%Y-%m-%d %H:%M:%S}")
+        self.stdout.write(f"갱신    : {run.updated_at:%Y-%m-%d %H:%M:%S}")
+        if run.finished_at:
+            self.stdout.write(f"종료    : {run.finished_at:%Y-%m-%d %H:%M:%S}")
+        self.stdout.write(f"체크포인트: {self.checkpoint_counts(run)}")
+        metrics = run.metrics or {}
+        if metrics.get('engine'):
+            self.stdout.write(f"엔진    : {metrics['engine']} (선수 수집 {metrics.get('collect_seconds', 0):.1f}초)")
+        if metrics.get('stages'):
+            stages = ", ".join(f"{stage} {seconds:.1f}초" for stage, seconds in metrics['stages'].items())
+            self.stdout.write(f"소요    : {stages} (전체 {metrics.get('duration', 0):.1f}초)")
+        for endpoint, status_counts in sorted(metrics.get('requests', {}).items()):
+            counts = " ".join(f"{code}:{count:,}" for code, count in sorted(status_counts.items()))
+            self.stdout.write(f"요청    : {endpoint} {counts}")
+        if metrics.get('retry_waves'):
+            self.stdout.write(f"재시도  : {metrics['retry_waves']}")
+        if metrics.get('rows'):
+            rows = ", ".join(f"{table} {count:,}" for table, count in metrics['rows'].items())
+            self.stdout.write(f"저장    : {rows}")
+        if run.error:
+            self.stdout.write(f"오류    : {run.error}")
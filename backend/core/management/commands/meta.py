@@ -0,0 +1,41 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.meta import TABLES, get_store
+
+
+def format_time(ts):
+    return datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else '-'
+
+
+class Command(BaseCommand):
+    help = "메타데이터 저장소(spid/seasonid/spposition) 조회/갱신"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['status', 'refresh'])
+        parser.add_argument('--force', action='store_true',
+                            help="refresh에서 최근 확인 여부와 상관없이 조건부 요청 전송")
+
+    def handle(self, *args, **options):
+        store = get_store()
+        if options['action'] == 'refresh':
+            failed = []
+            for name in TABLES:
+                try:
+                    changed = store.refresh(name, force=options['force'])
+                except Exception as e:
+                    failed.append(name)
+                    self.stderr.write(f"{name} 갱신 실패: {e}")
+                    continue
+                self.stdout.write(f"{name}: {'새 버전 로드' if changed else '변경 없음'}")
+            if failed:
+                raise CommandError(f"갱신 실패: {', '.join(failed)}")
+
+        self.stdout.write(f"저장소: {store.directory}")
+        for name, entry in store.status().items():
+            self.stdout.write(
+                f"  {name:<8} 버전 {entry.get('version') or '-':<12}  ETag {entry.get('etag') or '-'}  "
+                f"받은 시각 {format_time(entry.get('fetched_at'))}  확인 시각 {format_time(entry.get('checked_at'))}"
+            )
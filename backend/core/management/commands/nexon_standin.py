@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.standin import LatencyModel, start_standin
+
+
+def add_standin_arguments(parser):
+    parser.add_argument('--managers', type=int, default=10000, help="랭킹 매니저 수 (기본값: 10,000명)")
+    parser.add_argument('--seed', type=int, default=1, help="데이터 생성 시드")
+    parser.add_argument('--meta-dir', default=None, help="spid.json/seasonid.json 위치 (기본값: frontend/public/fconline/meta)")
+    parser.add_argument('--latency-ms', type=float, default=30, help="응답 지연 중앙값(ms)")
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help="lognormal 분포의 sigma")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="429 응답 비율(0~1)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500 응답 비율(0~1)")
+    parser.add_argument('--key-rate', type=int, default=0, help="API 키당 초당 허용 요청 수(0이면 제한 없음)")
+
+
+def standin_options(options):
+    return {
+        'managers': options['managers'],
+        'seed': options['seed'],
+        'meta_dir': options['meta_dir'],
+        'latency': LatencyModel(options['latency_ms'], options['latency_dist'], options['latency_sigma']),
+        'throttle_rate': options['throttle_rate'],
+        'error_rate': options['error_rate'],
+        'key_rate': options['key_rate'],
+    }
+
+
+class Command(BaseCommand):
+    help = "Nexon Open API/랭킹 페이지 대체 서버 실행 (NEXON_STANDIN_URL로 연결)"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        add_standin_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = start_standin(host=options['host'], port=options['port'], **standin_options(options))
+        self.stdout.write(f"대체 서버 실행 중: {server.url} (매니저 {options['managers']:,}명)")
+        self.stdout.write(f"다른 터미널에서: export NEXON_STANDIN_URL={server.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            for (endpoint, status), count in sorted(server.counts.items()):
+                self.stdout.write(f"{endpoint} {status}: {count:,}")
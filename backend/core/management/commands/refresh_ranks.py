@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.tasks import fetch_rankings_for_all_managers
+
+
+class Command(BaseCommand):
+    help = "공개 스냅샷 매니저의 순위/점수를 랭킹 페이지 기준으로 갱신"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['http', 'browser'], default=None,
+                            help="랭킹 조회 방식 (기본: settings.RANK_REFRESH['SOURCE'])")
+        parser.add_argument('--pages', type=int, default=None, help="조회할 랭킹 페이지 수")
+
+    def handle(self, *args, **options):
+        changed = fetch_rankings_for_all_managers(source=options['source'], pages=options['pages'])
+        self.stdout.write(f"매니저 {changed:,}명 갱신")
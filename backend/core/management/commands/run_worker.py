@@ -0,0 +1,40 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "수집 워커 실행 (웹 서버와 별도 프로세스에서 크롤링 스케줄러 실행, 새 스냅샷은 포인터로 공개)"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-startup', action='store_true',
+                            help="시작 시 Player 데이터 최신성 확인/수집 생략")
+        parser.add_argument('--once', action='store_true',
+                            help="스케줄 없이 크롤링 한 번만 실행하고 종료 (리더 워커가 있거나 크롤링 중이면 실행하지 않음)")
+
+    def handle(self, *args, **options):
+        from core.apps import crawl_once, crawl_scheduler, wait_for_db_and_load_meta
+        from core.scheduler import Scheduler
+        from core.tasks import fetch_and_save_players_for_all_managers
+        import core.response_cache  # noqa: F401 (스냅샷 공개 직후 조회 응답을 공유 캐시에 미리 채움)
+
+        if not wait_for_db_and_load_meta():
+            return
+
+        startup_job = None if options['no_startup'] else fetch_and_save_players_for_all_managers
+        scheduler = Scheduler('crawl', crawl_once, startup_job=startup_job)
+        if options['once']:
+            # 리더 워커의 크롤링과 겹치지 않도록 같은 임대/실행 기록을 확인
+            if scheduler.run_once() is None:
+                raise CommandError("다른 워커가 리더이거나 크롤링이 진행 중이라 실행하지 않았습니다.")
+            return
+
+        # 종료 신호를 받으면 현재 대기만 끝내고 임대를 반납해 다른 워커가 바로 리더가 되도록 함
+        def stop(signum, frame):
+            self.stdout.write(f"[워커] 종료 신호({signal.Signals(signum).name}) 수신, 스케줄러 정지")
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        crawl_scheduler(scheduler=scheduler)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Snapshot
+from core.snapshots import live_snapshot_id, prune_snapshots
+
+
+class Command(BaseCommand):
+    help = "매니저/선수 스냅샷 조회/정리"
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'prune'])
+        parser.add_argument('--limit', type=int, default=30, help="list에서 보여줄 스냅샷 수")
+        parser.add_argument('--hours', type=int, default=None, help="prune 보관 시간 (기본: SNAPSHOT_RETENTION_HOURS)")
+
+    def handle(self, *args, **options):
+        if options['action'] == 'list':
+            live_id = live_snapshot_id()
+            for snapshot in Snapshot.objects.order_by('-pk')[:options['limit']]:
+                published = f"{snapshot.published_at:%Y-%m-%d %H:%M:%S}" if snapshot.published_at else '-'
+                mark = '*' if snapshot.pk == live_id else ' '
+                self.stdout.write(
+                    f"{mark}#{snapshot.pk:<6} {snapshot.status:<9} {snapshot.source:<12} 시작 {snapshot.started_at:%Y-%m-%d %H:%M:%S}  "
+                    f"공개 {published:<19}  매니저 {snapshot.manager_count:,} / 선수 {snapshot.player_count:,}"
+                )
+        else:
+            removed = prune_snapshots(options['hours'])
+            self.stdout.write(f"스냅샷 {len(removed)}개 삭제: {', '.join(f'#{pk}' for pk in removed) or '-'}")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from core.models import PickRollup, Player, Snapshot, TeamColorRollup, TrendPoint
+from core.trends import downsample, record_snapshot
+
+
+class Command(BaseCommand):
+    help = "픽률/팀컬러 추이 집계 조회/저장 (backfill: 남아 있는 공개 스냅샷 저장, downsample: 오래된 시점 일 단위로 합치기)"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['status', 'backfill', 'downsample'])
+
+    def handle(self, *args, **options):
+        if options['action'] == 'backfill':
+            # 보관 기간 안에 남아 있는 공개/이전 공개 스냅샷 중 아직 시점이 없는 것
+            snapshots = Snapshot.objects.filter(status__in=['live', 'retired'], published_at__isnull=False).order_by('pk')
+            for snapshot in snapshots:
+                saved = record_snapshot(snapshot)
+                if saved is None:
+                    self.stdout.write(f"스냅샷 #{snapshot.pk}: 이미 저장됨")
+                else:
+                    _, rollups, players = saved
+                    self.stdout.write(f"스냅샷 #{snapshot.pk}: 집계 {rollups:,}행 저장 (선수 행 {players:,})")
+        if options['action'] in ('backfill', 'downsample'):
+            merged, expired = downsample()
+            self.stdout.write(f"일 단위로 합친 시간 단위 시점 {merged}개, 보관 기간이 지나 삭제한 행 {expired}개")
+
+        for period, label in TrendPoint.PERIOD_CHOICES:
+            points = TrendPoint.objects.filter(period=period)
+            summary = points.aggregate(count=Count('id'), samples=Sum('samples'))
+            first = points.order_by('at').values_list('at', flat=True).first()
+            last = points.order_by('-at').values_list('at', flat=True).first()
+            self.stdout.write(
+                f"  {label} 단위 시점 {summary['count']}개 (스냅샷 {summary['samples'] or 0}개)"
+                + (f", {first:%Y-%m-%d %H:%M} ~ {last:%Y-%m-%d %H:%M}" if first else "")
+            )
+        self.stdout.write(
+            f"  집계 행: 선수 {PickRollup.objects.count():,} / 팀컬러 {TeamColorRollup.objects.count():,}, "
+            f"원본 선수 행 {Player.objects.count():,}"
+        )
@@ -0,0 +1,236 @@
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from core.http import get_client
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 해석
+    orjson = None
+
+# 스쿼드에 필요한 선수 필드(원본 페이로드의 나머지 스탯은 저장하지 않음)
+SQUAD_FIELDS = ('spId', 'spPosition', 'spGrade')
+
+
+def loads(content):
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def compact_squads(data):
+    # 매치 디테일 응답에서 양쪽 매니저의 선발 11명만 추출: ((ouid, ((spId, spPosition, spGrade), ...)), ...)
+    squads = []
+    for info in data.get('matchInfo', []) or []:
+        ouid = info.get('ouid')
+        if not ouid:
+            continue
+        player_list = info.get('player', [])
+        if not isinstance(player_list, list):
+            player_list = []
+        squads.append((ouid, tuple(
+            (p.get('spId'), p.get('spPosition'), p.get('spGrade'))
+            for p in player_list[:11]
+            if isinstance(p, dict)
+        )))
+    return tuple(squads)
+
+
+def decode_squads(content):
+    # 응답 바이트 → 압축된 스쿼드 튜플 (프로세스 풀에서 실행, 결과만 작게 돌려보냄)
+    return compact_squads(loads(content))
+
+
+def expand_squads(compact):
+    # 압축된 스쿼드 → {ouid: [선수 dict, ...]} (디스크 캐시, 매치 상태, 선수 저장에서 쓰는 형식)
+    return {ouid: [dict(zip(SQUAD_FIELDS, row)) for row in rows] for ouid, rows in compact}
+
+
+def extract_squads(data):
+    # 매치 디테일 응답(dict)에서 양쪽 매니저의 선발 11명만 추출: {ouid: [선수, ...]}
+    return expand_squads(compact_squads(data))
+
+
+class SquadDecoder:
+    """
+    매치 디테일 응답 해석기
+    - process: 원본 바이트를 프로세스 풀에 넘겨 JSON 디코딩과 선발 11명 추출을 맡기고 작은 튜플만 받음
+      (수백 개의 I/O 스레드가 해석 때문에 GIL을 기다리지 않음)
+    - inline: 호출한 I/O 스레드에서 바로 해석 (CPU가 하나뿐이면 프로세스 간 전달 비용만 늘어나므로 auto의 기본값)
+    - 프로세스 풀이 깨지면(작업 프로세스 종료 등) 그 요청은 inline으로 해석하고 다음 요청에서 풀을 다시 만듦
+    """
+
+    def __init__(self, mode=None, workers=None):
+        conf = getattr(settings, 'MATCH_DETAIL_DECODE', {})
+        mode = mode or conf.get('MODE', 'auto')
+        if mode not in ('auto', 'process', 'inline'):
+            raise ValueError(f"알 수 없는 매치 디테일 해석 방식: {mode}")
+        cpus = os.cpu_count() or 1
+        if mode == 'auto':
+            mode = 'process' if cpus > 1 else 'inline'
+        self.mode = mode
+        self.workers = workers or conf.get('WORKERS') or max(1, min(4, cpus - 1))
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # fork는 수집 스레드가 잡고 있던 잠금까지 복사하므로 spawn으로 새 인터프리터 시작
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def decode(self, content):
+        if self.mode == 'inline':
+            return decode_squads(content)
+        pool = self._get_pool()
+        try:
+            return pool.submit(decode_squads, content).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return decode_squads(content)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class MatchDetailFetcher:
+    """
+    매치 디테일 조회 계층
+    - 같은 match_id에 대한 동시 요청은 한 번만 호출하고 결과를 공유
+    - 한 응답에서 양쪽 매니저의 스쿼드를 모두 보관하므로 서로 경기한 매니저는 재호출 없음
+    - 최근 매치 스쿼드는 디스크에 보관(개수 제한)해 다음 실행에서도 API 호출 없이 재사용
+    """
+
+    def __init__(self, cache_dir=None, max_entries=None):
+        conf = getattr(settings, 'MATCH_DETAIL_CACHE', {})
+        self.cache_dir = str(cache_dir or conf.get('DIR', settings.BASE_DIR / 'cache' / 'match_detail'))
+        self.max_entries = max_entries or conf.get('MAX_ENTRIES', 40000)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._memory = {}
+        self.stats = {'api': 0, 'memory': 0, 'disk': 0, 'coalesced': 0}
+        self.decoder = SquadDecoder()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def start_run(self):
+        # 실행 단위 메모리/통계 초기화 (디스크 캐시는 유지)
+        with self._lock:
+            self._memory = {}
+            self.stats = {'api': 0, 'memory': 0, 'disk': 0, 'coalesced': 0}
+
+    def _path(self, match_id):
+        return os.path.join(self.cache_dir, f"{match_id}.json")
+
+    def _load_disk(self, match_id):
+        try:
+            with open(self._path(match_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_disk(self, match_id, squads):
+        path = self._path(match_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(squads, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _download(self, match_id):
+        from core.tasks import KEY_SCHEDULER, next_api_key
+        api_key = next_api_key()
+        url = f"https://open.api.nexon.com/fconline/v1/match-detail?matchid={match_id}"
+        headers = {"x-nxopen-api-key": api_key}
+        resp = get_client().get(url, headers=headers, timeout=5)
+        KEY_SCHEDULER.report(api_key, resp.status_code)
+        with self._lock:
+            self.stats['api'] += 1
+        if resp.status_code != 200:
+            return resp.status_code, None
+        return 200, expand_squads(self.decoder.decode(resp.content))
+
+    def fetch(self, match_id):
+        # (status_code, {ouid: squad}) 반환, 실패 응답은 캐시하지 않음
+        with self._lock:
+            squads = self._memory.get(match_id)
+            if squads is not None:
+                self.stats['memory'] += 1
+                return 200, squads
+            future = self._inflight.get(match_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[match_id] = future
+            else:
+                self.stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            squads = self._load_disk(match_id)
+            if squads is not None:
+                with self._lock:
+                    self.stats['disk'] += 1
+                result = (200, squads)
+            else:
+                result = self._download(match_id)
+                if result[1] is not None:
+                    self._save_disk(match_id, result[1])
+            if result[1] is not None:
+                with self._lock:
+                    self._memory[match_id] = result[1]
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(match_id, None)
+
+    def prune(self):
+        # 디스크 캐시가 최대 개수를 넘으면 오래된 파일부터 삭제
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+        except OSError:
+            return 0
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        removed = 0
+        for entry in entries[:overflow]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = MatchDetailFetcher()
+            atexit.register(_fetcher.decoder.close)
+        return _fetcher
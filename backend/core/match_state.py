@@ -0,0 +1,81 @@
+import datetime
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+# SQLite 변수 개수 제한을 피하기 위한 일괄 처리 단위
+BATCH_SIZE = 500
+
+
+class MatchStateSession:
+    """
+    매니저별 마지막 처리 경기 기록(증분 갱신용)
+    - 시작 시 직전 실행까지의 (최신 match_id, 스쿼드)를 한 번에 읽음
+    - 이번 실행에서 limit=1로 확인한 최신 match_id가 같으면 저장된 스쿼드를 그대로 이어받음
+    - 새로 조회/이어받은 결과는 flush()에서 일괄 저장
+    """
+
+    def __init__(self, incremental=None):
+        from core.models import ManagerMatchState
+        if incremental is None:
+            incremental = getattr(settings, 'INGEST_INCREMENTAL', True)
+        self.incremental = incremental
+        self.previous = {}
+        if incremental:
+            self.previous = {
+                ouid: (latest_match_id, squad)
+                for ouid, latest_match_id, squad in ManagerMatchState.objects.values_list('ouid', 'latest_match_id', 'squad')
+            }
+        self.latest = {}
+        self.updates = {}
+        self.counts = {'fetched': 0, 'carried': 0}
+        self._lock = threading.Lock()
+
+    def observe_latest(self, ouid, match_id):
+        # limit=1 조회로 확인한 최신 경기 기록
+        with self._lock:
+            self.latest[ouid] = match_id
+
+    def carry_over(self, manager, ouid, match_id):
+        # 최신 경기가 직전 실행과 같으면 저장된 스쿼드 반환(없으면 None)
+        if not self.incremental:
+            return None
+        with self._lock:
+            previous = self.previous.get(ouid)
+            if not previous or self.latest.get(ouid) != match_id:
+                return None
+            latest_match_id, squad = previous
+            if latest_match_id != match_id or not squad or len(squad) < 11:
+                return None
+            self.counts['carried'] += 1
+            self.updates[ouid] = (manager.nickname, match_id, squad)
+            return squad
+
+    def record(self, manager, ouid, squad):
+        # 새로 조회한 스쿼드 기록 (최신 경기를 모르면 다음 실행에서 재조회되도록 저장하지 않음)
+        with self._lock:
+            self.counts['fetched'] += 1
+            latest_match_id = self.latest.get(ouid)
+            if latest_match_id:
+                self.updates[ouid] = (manager.nickname, latest_match_id, list(squad))
+
+    def flush(self):
+        from core.models import ManagerMatchState
+        with self._lock:
+            updates = dict(self.updates)
+        now = timezone.now()
+        ManagerMatchState.objects.bulk_create(
+            [
+                ManagerMatchState(ouid=ouid, nickname=nickname, latest_match_id=match_id, squad=squad, updated_at=now)
+                for ouid, (nickname, match_id, squad) in updates.items()
+            ],
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['ouid'],
+            update_fields=['nickname', 'latest_match_id', 'squad', 'updated_at'],
+        )
+        # 오래 갱신되지 않은 기록(랭킹에서 빠진 매니저) 정리
+        retention = datetime.timedelta(days=getattr(settings, 'MATCH_STATE_RETENTION_DAYS', 7))
+        ManagerMatchState.objects.filter(updated_at__lt=now - retention).delete()
+        return len(updates)
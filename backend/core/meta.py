@@ -0,0 +1,370 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+from core.http import get_client
+
+META_BASE_URL = 'https://open.api.nexon.com/static/fconline/meta/'
+
+# spid = 시즌 id(앞 3자리) * SEASON_DIVISOR + 선수 고유 번호(6자리)
+SEASON_DIVISOR = 10**6
+
+
+def clean_season_name(season_name):
+    # 'ICON (ICON)' -> 'ICON'
+    return re.split(r'\s*\(', season_name)[0].strip()
+
+
+class IdNameTable:
+    """
+    정수 id → 이름 조회표 (정렬된 id 배열 + 같은 순서의 이름 목록, 이진 탐색)
+    - 이름은 sys.intern으로 한 번만 저장 (시즌만 다른 같은 선수 이름을 한 객체로 공유)
+    - dict처럼 get(key, default) 지원, key는 정수 또는 숫자 문자열
+    """
+
+    __slots__ = ('ids', 'names')
+
+    def __init__(self, pairs):
+        # 같은 id가 여러 번 나오면 dict와 같이 마지막 값 사용
+        merged = {int(key): name for key, name in pairs}
+        self.ids = array('q', sorted(merged))
+        self.names = [sys.intern(merged[key]) for key in self.ids]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def index(self, key):
+        ids = self.ids
+        idx = bisect_left(ids, key)
+        return idx if idx < len(ids) and ids[idx] == key else -1
+
+    def get(self, key, default=None):
+        try:
+            idx = self.index(int(key))
+        except (TypeError, ValueError):
+            return default
+        return self.names[idx] if idx >= 0 else default
+
+    def items(self):
+        return zip(self.ids, self.names)
+
+
+class SeasonTable(IdNameTable):
+    """
+    시즌 id → 시즌 이름
+    - get은 원래 이름('ICON (ICON)'), short_names[시즌 id]는 괄호 앞 이름('ICON')
+    - short_names는 시즌 id를 그대로 인덱스로 쓰는 목록이라 선수마다 정규식 없이 한 번에 조회
+    """
+
+    __slots__ = ('short_names',)
+
+    def __init__(self, pairs):
+        super().__init__(pairs)
+        size = (self.ids[-1] + 1) if self.ids and self.ids[-1] < 10 * SEASON_DIVISOR else 0
+        self.short_names = [None] * size
+        for season_id, name in self.items():
+            if 0 <= season_id < size:
+                self.short_names[season_id] = sys.intern(clean_season_name(name))
+
+    def short_name(self, season_id):
+        # 괄호 앞 시즌 이름, 모르는 시즌은 id 문자열
+        if 0 <= season_id < len(self.short_names):
+            name = self.short_names[season_id]
+            if name is not None:
+                return name
+        return str(season_id)
+
+
+# 테이블 이름 → (원본 파일, 원본 목록 → 조회표 변환)
+TABLES = {
+    'spid': ('spid.json', lambda data: IdNameTable((item['id'], item['name']) for item in data)),
+    'season': ('seasonid.json', lambda data: SeasonTable((item['seasonId'], item['className']) for item in data)),
+    'position': ('spposition.json', lambda data: IdNameTable((item['spposition'], item['desc']) for item in data)),
+}
+
+
+def log_with_time(msg):
+    now = datetime.datetime.now().strftime('[%Y년 %m월 %d일 %H시 %M분 %S초]')
+    print(f"{now} [메타데이터] {msg}")
+
+
+class MetaStore:
+    """
+    Nexon 메타데이터(spid/seasonid/spposition) 저장소
+    - 원본은 디스크에 버전(내용 해시)별 파일로 보관하고 manifest.json이 현재 버전과 ETag/Last-Modified를 가리킴
+    - 테이블은 처음 사용할 때 디스크에서 읽음(네트워크 없음), 디스크에 없을 때만 바로 다운로드
+    - 백그라운드 스레드가 REFRESH_SECONDS마다 조건부 요청(If-None-Match/If-Modified-Since)으로 변경 확인,
+      304면 확인 시각만 갱신하고 200이면 새 버전을 저장한 뒤 교체
+    - 다른 프로세스가 먼저 갱신했으면 manifest만 보고 디스크에서 다시 읽음(요청 없음)
+    - 갱신이 실패해도 마지막 버전으로 계속 응답
+    """
+
+    def __init__(self, directory=None, refresh_seconds=None, keep_versions=None):
+        conf = getattr(settings, 'META_STORE', {})
+        self.directory = Path(directory or conf.get('DIR', Path(settings.BASE_DIR) / 'cache' / 'meta'))
+        self.refresh_seconds = conf.get('REFRESH_SECONDS', 6 * 3600) if refresh_seconds is None else refresh_seconds
+        self.keep_versions = keep_versions or conf.get('KEEP_VERSIONS', 3)
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._versions = {}
+        self._refresher = None
+        self._stop = threading.Event()
+
+    # 디스크 -------------------------------------------------------------
+
+    def _manifest_path(self):
+        return self.directory / 'manifest.json'
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _version_path(self, name, version):
+        return self.directory / name / f"{version}.json"
+
+    def _load_version(self, name, version):
+        with open(self._version_path(name, version), 'r', encoding='utf-8') as f:
+            return TABLES[name][1](json.load(f))
+
+    def _update_manifest(self, name, entry):
+        # 테이블 하나의 항목만 바꿔 저장 (다른 프로세스가 쓴 나머지 항목은 유지)
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[name] = entry
+            self._write_json(self._manifest_path(), manifest)
+
+    def _prune_versions(self, name, current):
+        # 최근 keep_versions개(현재 버전 포함)만 남김
+        try:
+            files = sorted((self.directory / name).glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+        except OSError:
+            return
+        for path in [path for path in files if path.stem != current][self.keep_versions - 1:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    # 네트워크 -----------------------------------------------------------
+
+    def fetch(self, name, entry=None):
+        """
+        원격 메타데이터 조회 (entry의 ETag/Last-Modified로 조건부 요청)
+        - 변경 없음(304)이면 확인 시각만 갱신, 변경되었으면 새 버전 저장
+        - 갱신된 manifest 항목과 변경 여부 반환
+        """
+        entry = dict(entry or {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        resp = get_client().get_ok(META_BASE_URL + TABLES[name][0], headers=headers or None, timeout=(3.05, 30))
+        entry['checked_at'] = time.time()
+        if resp.status_code == 304 and entry.get('version'):
+            self._update_manifest(name, entry)
+            return entry, False
+
+        content = resp.content
+        data = json.loads(content)
+        TABLES[name][1](data)  # 형식 확인 (변환 실패 시 저장하지 않음)
+        version = hashlib.sha1(content).hexdigest()[:12]
+        changed = version != entry.get('version')
+        if changed:
+            self._write_json(self._version_path(name, version), data)
+        entry.update(
+            version=version,
+            etag=resp.headers.get('ETag', ''),
+            last_modified=resp.headers.get('Last-Modified', ''),
+            fetched_at=entry['checked_at'],
+        )
+        self._update_manifest(name, entry)
+        if changed:
+            self._prune_versions(name, version)
+        return entry, changed
+
+    # 조회 ---------------------------------------------------------------
+
+    def table(self, name):
+        # 조회표 (처음 호출 시 로드), 반환된 조회표는 교체만 되고 수정되지 않으므로 잠금 없이 읽어도 됨
+        table = self._tables.get(name)
+        if table is None:
+            table = self._load(name)
+        return table
+
+    def _load(self, name):
+        with self._lock:
+            if name in self._tables:
+                return self._tables[name]
+        entry = self._read_manifest().get(name)
+        table = None
+        if entry and entry.get('version'):
+            try:
+                table = self._load_version(name, entry['version'])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                log_with_time(f"{name} 디스크 버전 {entry['version']} 읽기 실패, 다시 다운로드: {e}")
+                entry = None
+        if table is None:
+            entry, _ = self.fetch(name, None)
+            table = self._load_version(name, entry['version'])
+            log_with_time(f"{name} 다운로드 ({len(table):,}건, 버전 {entry['version']})")
+        with self._lock:
+            self._tables.setdefault(name, table)
+            self._versions.setdefault(name, entry['version'])
+            table = self._tables[name]
+        self.start_refresh()
+        return table
+
+    def raw(self, name):
+        # 현재 버전의 원본 목록 (디스크에 없으면 먼저 로드)
+        self.table(name)
+        with open(self._version_path(name, self.versions()[name]), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_all(self):
+        for name in TABLES:
+            self.table(name)
+
+    def versions(self):
+        with self._lock:
+            return dict(self._versions)
+
+    def status(self):
+        # 테이블별 디스크 manifest 항목과 이 프로세스에 로드된 버전
+        manifest = self._read_manifest()
+        loaded = self.versions()
+        return {name: dict(manifest.get(name, {}), loaded=loaded.get(name)) for name in TABLES}
+
+    # 갱신 ---------------------------------------------------------------
+
+    def refresh(self, name, force=False):
+        """
+        테이블 하나의 변경 확인 후 필요하면 교체, 교체했으면 True
+        - 다른 프로세스가 최근(refresh_seconds 이내) 확인했으면 요청 없이 디스크의 현재 버전만 반영
+        """
+        entry = self._read_manifest().get(name) or {}
+        recently = time.time() - entry.get('checked_at', 0) < self.refresh_seconds
+        if force or not recently or not entry.get('version'):
+            entry, _ = self.fetch(name, entry)
+        version = entry['version']
+        if self._versions.get(name) == version:
+            return False
+        table = self._load_version(name, version)
+        with self._lock:
+            previous = self._versions.get(name)
+            self._tables[name] = table
+            self._versions[name] = version
+        log_with_time(f"{name} 버전 교체 {previous or '-'} → {version} ({len(table):,}건)")
+        return True
+
+    def refresh_all(self, force=False):
+        changed = []
+        for name in TABLES:
+            try:
+                if self.refresh(name, force=force):
+                    changed.append(name)
+            except Exception as e:
+                log_with_time(f"{name} 갱신 실패 (기존 버전 유지): {e}")
+        return changed
+
+    def start_refresh(self):
+        # 백그라운드 갱신 스레드 시작 (프로세스당 한 번, refresh_seconds가 0이면 시작하지 않음)
+        if not self.refresh_seconds:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name='meta-refresh', daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        # 여러 프로세스가 같은 시각에 몰리지 않도록 간격의 최대 10% 범위에서 흔들어 대기
+        jitter = hashlib.sha1(str(os.getpid()).encode()).digest()[0] / 255 * 0.1
+        while not self._stop.wait(self.refresh_seconds * (1 + jitter)):
+            self.refresh_all()
+
+    def stop(self):
+        self._stop.set()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetaStore()
+    return _store
+
+
+def spid_names():
+    # spid → 선수 이름
+    return get_store().table('spid')
+
+
+def season_names():
+    # 시즌 id → 시즌 이름 (괄호 앞 이름은 short_name)
+    return get_store().table('season')
+
+
+def position_names():
+    # 포지션 번호 → 포지션 이름
+    return get_store().table('position')
+
+
+def make_resolver(spids, seasons, positions):
+    """
+    매치 디테일 선수(spId, spPosition) → (선수 이름, 시즌 이름, 포지션 이름) 변환 함수
+    - spid는 정렬된 id 배열 이진 탐색, 시즌은 short_names 인덱스, 포지션은 작은 dict 한 번 조회
+    - 모르는 id는 숫자 문자열 그대로 (기존 dict 조회의 기본값과 같음)
+    """
+    ids, names, count = spids.ids, spids.names, len(spids.ids)
+    short_names, short_count = seasons.short_names, len(seasons.short_names)
+    position_names = dict(positions.items())
+    low, high = 100 * SEASON_DIVISOR, 1000 * SEASON_DIVISOR
+
+    def resolve(spid, sp_position):
+        spid = int(spid)
+        idx = bisect_left(ids, spid)
+        name = names[idx] if idx < count and ids[idx] == spid else str(spid)
+        season_id = spid // SEASON_DIVISOR if low <= spid < high else int(str(spid)[:3])
+        season = short_names[season_id] if 0 <= season_id < short_count else None
+        position = position_names.get(sp_position)
+        return (
+            name,
+            season if season is not None else str(season_id),
+            position if position is not None else str(sp_position),
+        )
+
+    return resolve
+
+
+def player_resolver():
+    # 현재 메타데이터 버전에 묶인 변환 함수 (한 번 만들어 한 번의 저장 동안 재사용)
+    return make_resolver(spid_names(), season_names(), position_names())
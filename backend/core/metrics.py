@@ -0,0 +1,204 @@
+import threading
+import time
+
+from django.utils import timezone
+
+from core.http import get_client
+
+# 선수 수집 엔진 (collect_squads의 engine 값)
+ENGINES = ('pipeline', 'threaded')
+
+# 엔진별 최근 소요 시간을 찾을 때 살펴보는 최근 완료 실행 수
+RECENT_RUNS = 50
+
+
+class RunMetrics:
+    """
+    수집 실행 1회의 구조화된 지표
+    - stages: 단계별 소요 시간(초), 파이프라인은 시작부터 각 단계가 끝날 때까지의 시간
+    - requests/errors/bytes: 엔드포인트별 요청 수(상태 코드별), 연결 오류 수, 응답 크기
+    - retry_waves: 단계별 재시도 차수별 대상 수
+    - keys: API 키별 요청/429 횟수
+    - rows: 테이블별 저장 행 수, counters: 캐시 적중 등 기타 집계
+    - engine/collect_seconds: 수집 엔진과 선수 수집(collect_squads) 소요 시간 (재시도하면 누적)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.retry_waves = {}
+        self.keys = {}
+        self.rows = {}
+        self.counters = {}
+        self.engine = None
+        self.collect_seconds = 0.0
+        self._stage = None
+        self._stage_started = None
+        self._http_base = get_client().stats()
+
+    def start_stage(self, stage):
+        # 이전 단계를 끝내고 새 단계 시작 (같은 단계가 반복되면 누적)
+        now = time.time()
+        with self._lock:
+            if self._stage is not None:
+                self.stages[self._stage] = self.stages.get(self._stage, 0.0) + now - self._stage_started
+            self._stage = stage
+            self._stage_started = now
+
+    def end_stage(self):
+        self.start_stage(None)
+
+    def set_stage_seconds(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_collect(self, engine, seconds):
+        with self._lock:
+            self.engine = engine
+            self.collect_seconds += seconds
+
+    def retry_wave(self, stage, wave, size=1):
+        with self._lock:
+            waves = self.retry_waves.setdefault(stage, {})
+            waves[str(wave)] = waves.get(str(wave), 0) + size
+
+    def add_rows(self, table, count):
+        with self._lock:
+            self.rows[table] = self.rows.get(table, 0) + count
+
+    def add_counter(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_key_stats(self, stats):
+        # 키 스케줄러 통계는 수집 시도마다 초기화되므로 시도별로 누적
+        with self._lock:
+            for stat in stats:
+                entry = self.keys.setdefault(stat['key'], {'requests': 0, 'throttled': 0})
+                entry['requests'] += stat['requests']
+                entry['throttled'] += stat['throttled']
+
+    def _http_delta(self):
+        # 실행 시작 이후 증가분 (중간에 통계가 초기화됐으면 현재 값 사용)
+        requests, errors, size = {}, {}, {}
+        for endpoint, stat in get_client().stats().items():
+            base = self._http_base.get(endpoint)
+            if base is None or base['requests'] > stat['requests']:
+                base = {'requests': 0, 'errors': 0, 'bytes': 0, 'status': {}}
+            status = {
+                str(code): count - base['status'].get(code, 0)
+                for code, count in stat['status'].items()
+                if count - base['status'].get(code, 0) > 0
+            }
+            if status:
+                requests[endpoint] = status
+            if stat['errors'] - base['errors'] > 0:
+                errors[endpoint] = stat['errors'] - base['errors']
+            if stat['bytes'] - base['bytes'] > 0:
+                size[endpoint] = stat['bytes'] - base['bytes']
+        return requests, errors, size
+
+    def snapshot(self):
+        requests, errors, size = self._http_delta()
+        with self._lock:
+            stages = dict(self.stages)
+            if self._stage is not None:
+                stages[self._stage] = stages.get(self._stage, 0.0) + time.time() - self._stage_started
+            return {
+                'duration': round(time.time() - self.started, 3),
+                'stages': {stage: round(seconds, 3) for stage, seconds in stages.items()},
+                'requests': requests,
+                'errors': errors,
+                'bytes': size,
+                'retry_waves': {stage: dict(waves) for stage, waves in self.retry_waves.items()},
+                'keys': {key: dict(entry) for key, entry in self.keys.items()},
+                'rows': dict(self.rows),
+                'counters': dict(self.counters),
+                'engine': self.engine,
+                'collect_seconds': round(self.collect_seconds, 3),
+            }
+
+
+def engine_collect_times():
+    # 엔진별 가장 최근 완료 실행의 선수 수집 소요 시간 {engine: (run_id, 초)} (엔진은 보통 서로 다른 프로세스에서 실행)
+    from core.models import IngestRun
+    times = {}
+    # 최근 실행만 살펴보고, 모든 엔진을 찾으면 중단 (실행 기록이 쌓여도 수집/스크레이프마다 비용 일정)
+    runs = IngestRun.objects.filter(status='completed', finished_at__isnull=False).order_by('-finished_at')
+    for run_id, metrics in runs.values_list('run_id', 'metrics')[:RECENT_RUNS]:
+        engine = (metrics or {}).get('engine')
+        if engine and engine not in times:
+            times[engine] = (run_id, metrics.get('collect_seconds', 0))
+            if len(times) == len(ENGINES):
+                break
+    return times
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _family(lines, name, help_text, samples):
+    # 같은 지표의 HELP/TYPE/값은 연속으로 출력
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    for value, labels in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+        else:
+            lines.append(f"{name} {value}")
+
+
+def render_prometheus():
+    # 최근 수집 실행 지표를 Prometheus 텍스트 형식으로 변환
+    from core.models import IngestRun
+    lines = []
+    now = timezone.now()
+
+    _family(lines, 'fc_ingest_runs', "상태별 수집 실행 수", [
+        (IngestRun.objects.filter(status=status).count(), {'status': status})
+        for status, _ in IngestRun.STATUS_CHOICES
+    ])
+
+    last_success = IngestRun.objects.filter(status='completed', finished_at__isnull=False).order_by('-finished_at').first()
+    if last_success:
+        _family(lines, 'fc_ingest_last_success_timestamp_seconds', "마지막 성공 실행 종료 시각", [
+            (f"{last_success.finished_at.timestamp():.0f}", {}),
+        ])
+        _family(lines, 'fc_ingest_data_age_seconds', "마지막 성공 실행 이후 경과 시간(데이터 신선도)", [
+            (f"{(now - last_success.finished_at).total_seconds():.0f}", {}),
+        ])
+
+    run = IngestRun.objects.filter(finished_at__isnull=False).order_by('-finished_at').first()
+    if run is None:
+        return "\n".join(lines) + "\n"
+    metrics = run.metrics or {}
+    run_labels = {'run_id': run.run_id, 'status': run.status}
+
+    def samples(values, label):
+        return [(value, {label: key, **run_labels}) for key, value in sorted(values.items())]
+
+    def nested(values, outer, inner):
+        return [
+            (value, {outer: key, inner: sub_key, **run_labels})
+            for key, sub_values in sorted(values.items())
+            for sub_key, value in sorted(sub_values.items())
+        ]
+
+    keys = metrics.get('keys', {})
+    _family(lines, 'fc_ingest_last_run_duration_seconds', "마지막 실행 소요 시간", [(metrics.get('duration', 0), run_labels)])
+    _family(lines, 'fc_ingest_stage_duration_seconds', "마지막 실행 단계별 소요 시간", samples(metrics.get('stages', {}), 'stage'))
+    _family(lines, 'fc_ingest_requests', "마지막 실행 엔드포인트/상태 코드별 요청 수", nested(metrics.get('requests', {}), 'endpoint', 'code'))
+    _family(lines, 'fc_ingest_request_errors', "마지막 실행 엔드포인트별 연결 오류 수", samples(metrics.get('errors', {}), 'endpoint'))
+    _family(lines, 'fc_ingest_response_bytes', "마지막 실행 엔드포인트별 응답 크기", samples(metrics.get('bytes', {}), 'endpoint'))
+    _family(lines, 'fc_ingest_retry_wave_size', "마지막 실행 단계/재시도 차수별 대상 수", nested(metrics.get('retry_waves', {}), 'stage', 'wave'))
+    _family(lines, 'fc_ingest_key_requests', "마지막 실행 API 키별 요청 수", samples({k: v['requests'] for k, v in keys.items()}, 'key'))
+    _family(lines, 'fc_ingest_key_throttled', "마지막 실행 API 키별 429 횟수", samples({k: v['throttled'] for k, v in keys.items()}, 'key'))
+    _family(lines, 'fc_ingest_rows_written', "마지막 실행 테이블별 저장 행 수", samples(metrics.get('rows', {}), 'table'))
+    _family(lines, 'fc_ingest_events', "마지막 실행 캐시 적중/이어받기 등 기타 집계", samples(metrics.get('counters', {}), 'name'))
+    _family(lines, 'fc_ingest_engine_collect_seconds', "엔진별 최근 완료 실행의 선수 수집 소요 시간", [
+        (seconds, {'engine': engine, 'run_id': run_id}) for engine, (run_id, seconds) in sorted(engine_collect_times().items())
+    ])
+    return "\n".join(lines) + "\n"
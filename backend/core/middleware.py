@@ -0,0 +1,15 @@
+from core.snapshots import poll_live_snapshot
+
+
+class SnapshotVersionMiddleware:
+    # 요청 처리 전에 새 스냅샷 공개 여부를 확인(간격 제한, 대부분의 요청은 DB 조회 없음)
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            poll_live_snapshot()
+        except Exception:
+            # 마이그레이션 전 등 포인터를 읽을 수 없는 경우에도 요청은 처리
+            pass
+        return self.get_response(request)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_review_bad_review_good'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OuidCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nickname', models.CharField(max_length=100, unique=True)),
+                ('ouid', models.CharField(db_index=True, max_length=100)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_ouidcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManagerMatchState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ouid', models.CharField(max_length=100, unique=True)),
+                ('nickname', models.CharField(max_length=100)),
+                ('latest_match_id', models.CharField(max_length=64)),
+                ('squad', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_managermatchstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=32, unique=True)),
+                ('status', models.CharField(choices=[('running', '진행 중'), ('failed', '실패'), ('completed', '완료'), ('abandoned', '중단')], default='running', max_length=16)),
+                ('stage', models.CharField(blank=True, max_length=32)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IngestCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ouid', 'OUID'), ('match', 'MATCH ID'), ('squad', '스쿼드')], max_length=8)),
+                ('nickname', models.CharField(max_length=100)),
+                ('value', models.JSONField()),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='core.ingestrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'kind', 'nickname'), name='unique_ingest_checkpoint')],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def adopt_existing_rows(apps, schema_editor):
+    # 기존 매니저/선수 데이터를 첫 스냅샷으로 묶어 공개 상태로 유지
+    Snapshot = apps.get_model('core', 'Snapshot')
+    SnapshotPointer = apps.get_model('core', 'SnapshotPointer')
+    Manager = apps.get_model('core', 'Manager')
+    Player = apps.get_model('core', 'Player')
+    if not Manager.objects.exists():
+        return
+    snapshot = Snapshot.objects.create()
+    Manager.objects.filter(snapshot__isnull=True).update(snapshot=snapshot)
+    Player.objects.filter(snapshot__isnull=True).update(snapshot=snapshot)
+    SnapshotPointer.objects.update_or_create(name='live', defaults={'snapshot': snapshot})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_ingestrun_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Snapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SnapshotPointer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=16, unique=True)),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='ManagerTemp',
+        ),
+        migrations.RemoveField(
+            model_name='playertemp',
+            name='manager',
+        ),
+        migrations.AddField(
+            model_name='manager',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='managers', to='core.snapshot'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='players', to='core.snapshot'),
+        ),
+        migrations.AddIndex(
+            model_name='manager',
+            index=models.Index(fields=['snapshot', 'rank'], name='manager_snapshot_rank'),
+        ),
+        migrations.AddField(
+            model_name='snapshotpointer',
+            name='snapshot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.snapshot'),
+        ),
+        migrations.DeleteModel(
+            name='PlayerTemp',
+        ),
+        migrations.RunPython(adopt_existing_rows, migrations.RunPython.noop),
+    ]
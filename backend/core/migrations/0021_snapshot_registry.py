@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:25
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_registry(apps, schema_editor):
+    # 기존 스냅샷의 행 수와 공개 시각(마지막 선수 저장 시각) 채우기
+    Snapshot = apps.get_model('core', 'Snapshot')
+    SnapshotPointer = apps.get_model('core', 'SnapshotPointer')
+    live_id = SnapshotPointer.objects.filter(name='live').values_list('snapshot_id', flat=True).first()
+    for snapshot in Snapshot.objects.all():
+        snapshot.manager_count = snapshot.managers.count()
+        snapshot.player_count = snapshot.players.count()
+        published_at = snapshot.players.aggregate(latest=Max('created_at'))['latest']
+        if snapshot.pk == live_id:
+            snapshot.status = 'live'
+            snapshot.published_at = published_at or snapshot.started_at
+        elif live_id is not None and snapshot.pk < live_id:
+            snapshot.status = 'retired'
+            snapshot.published_at = published_at or snapshot.started_at
+        snapshot.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_snapshot'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='snapshot',
+            old_name='created_at',
+            new_name='started_at',
+        ),
+        migrations.AddField(
+            model_name='snapshot',
+            name='manager_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='snapshot',
+            name='player_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='snapshot',
+            name='published_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='snapshot',
+            name='status',
+            field=models.CharField(choices=[('building', '수집 중'), ('failed', '실패'), ('live', '공개'), ('retired', '이전 공개')], default='building', max_length=16),
+        ),
+        migrations.RunPython(fill_registry, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_snapshot_registry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('holder', models.CharField(blank=True, max_length=100)),
+                ('acquired_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('running', '실행 중'), ('succeeded', '성공'), ('failed', '실패'), ('skipped', '건너뜀'), ('abandoned', '중단')], default='running', max_length=16)),
+                ('holder', models.CharField(blank=True, max_length=100)),
+                ('scheduled_for', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField()),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('message', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'status'], name='jobrun_job_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', '시간'), ('day', '일')], max_length=8)),
+                ('at', models.DateTimeField()),
+                ('snapshot_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('samples', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['at'], name='trend_point_at')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'at'), name='unique_trend_point')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamColorRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_color', models.CharField(max_length=100)),
+                ('rank_bucket', models.PositiveIntegerField()),
+                ('manager_count', models.PositiveIntegerField()),
+                ('point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_colors', to='core.trendpoint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['team_color', 'point'], name='team_color_rollup_color')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.CharField(max_length=8)),
+                ('player_name', models.CharField(max_length=64)),
+                ('season', models.CharField(max_length=64)),
+                ('grade', models.PositiveIntegerField()),
+                ('rank_bucket', models.PositiveIntegerField()),
+                ('user_count', models.PositiveIntegerField()),
+                ('point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='picks', to='core.trendpoint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player_name', 'position', 'point'], name='pick_rollup_player')],
+            },
+        ),
+    ]
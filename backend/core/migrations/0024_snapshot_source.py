@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_trend_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snapshot',
+            name='source',
+            field=models.CharField(choices=[('ingest', '선수 수집'), ('rank_refresh', '순위 갱신')], default='ingest', max_length=16),
+        ),
+    ]
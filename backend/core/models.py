@@ -1,6 +1,37 @@
 from django.db import models
 
+class Snapshot(models.Model):
+    # 수집 1회분(매니저 + 선수) 데이터 세대, 공개 여부는 SnapshotPointer가 결정
+    STATUS_CHOICES = [
+        ('building', '수집 중'),
+        ('failed', '실패'),
+        ('live', '공개'),
+        ('retired', '이전 공개'),
+    ]
+    SOURCE_CHOICES = [
+        ('ingest', '선수 수집'),
+        ('rank_refresh', '순위 갱신'),
+    ]
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='building')
+    source = models.CharField(max_length=16, choices=SOURCE_CHOICES, default='ingest')  # rank_refresh: 이전 스냅샷의 스쿼드를 옮기고 순위만 갱신
+    started_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    manager_count = models.PositiveIntegerField(default=0)
+    player_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"스냅샷 #{self.pk} ({self.get_status_display()}, {self.started_at:%Y-%m-%d %H:%M})"
+
+class SnapshotPointer(models.Model):
+    # 조회 API가 읽는 스냅샷 (name='live' 한 행, 교체는 이 행만 갱신)
+    name = models.CharField(max_length=16, unique=True)
+    snapshot = models.ForeignKey(Snapshot, null=True, on_delete=models.SET_NULL, related_name='+')
+
+    def __str__(self):
+        return f"{self.name} → {self.snapshot_id}"
+
 class Manager(models.Model):
+    snapshot = models.ForeignKey(Snapshot, null=True, on_delete=models.CASCADE, related_name='managers')
     rank = models.PositiveIntegerField()
     nickname = models.CharField(max_length=100)
     club_value = models.BigIntegerField()
@@ -9,10 +40,14 @@ class Manager(models.Model):
     score = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['snapshot', 'rank'], name='manager_snapshot_rank')]
+
     def __str__(self):
         return f"{self.rank}위 {self.nickname} ({self.team_color})"
 
 class Player(models.Model):
+    snapshot = models.ForeignKey(Snapshot, null=True, on_delete=models.CASCADE, related_name='players')
     manager = models.ForeignKey(Manager, on_delete=models.CASCADE, related_name='players')
     rank = models.PositiveIntegerField()
     nickname = models.CharField(max_length=64)
@@ -26,20 +61,6 @@ class Player(models.Model):
     def __str__(self):
         return f"{self.manager.nickname} - {self.player_name} ({self.position})"
 
-class PlayerTemp(models.Model):
-    manager = models.ForeignKey(Manager, on_delete=models.CASCADE, related_name='players_temp')
-    rank = models.PositiveIntegerField()
-    nickname = models.CharField(max_length=64)
-    team_color = models.CharField(max_length=64)
-    position = models.CharField(max_length=16)
-    player_name = models.CharField(max_length=64)
-    season = models.CharField(max_length=64)
-    grade = models.PositiveIntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    def __str__(self):
-        return f"{self.manager.nickname} - {self.player_name} ({self.position})"
-
 class Notice(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
@@ -59,17 +80,132 @@ class Resource(models.Model):
     size = models.CharField(max_length=20, default='0MB')
     downloads = models.PositiveIntegerField(default=0)
 
-class ManagerTemp(models.Model):
-    rank = models.PositiveIntegerField()
+class OuidCache(models.Model):
+    nickname = models.CharField(max_length=100, unique=True)
+    ouid = models.CharField(max_length=100, db_index=True)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.nickname} ({self.ouid})"
+
+class ManagerMatchState(models.Model):
+    ouid = models.CharField(max_length=100, unique=True)
     nickname = models.CharField(max_length=100)
-    club_value = models.BigIntegerField()
-    team_color = models.CharField(max_length=100)
-    formation = models.CharField(max_length=50)
-    score = models.IntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    latest_match_id = models.CharField(max_length=64)
+    squad = models.JSONField(default=list)  # 선발 11명 [{spId, spPosition, spGrade}, ...]
+    updated_at = models.DateTimeField()
 
     def __str__(self):
-        return f"{self.rank}위 {self.nickname} ({self.team_color})"
+        return f"{self.nickname} ({self.latest_match_id})"
+
+class IngestRun(models.Model):
+    STATUS_CHOICES = [
+        ('running', '진행 중'),
+        ('failed', '실패'),
+        ('completed', '완료'),
+        ('abandoned', '중단'),
+    ]
+    run_id = models.CharField(max_length=32, unique=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='running')
+    stage = models.CharField(max_length=32, blank=True)
+    error = models.TextField(blank=True)
+    metrics = models.JSONField(default=dict, blank=True)  # 단계별 소요 시간, 요청/429 집계, 재시도, 저장 행 수
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.run_id} ({self.status})"
+
+class IngestCheckpoint(models.Model):
+    KIND_CHOICES = [
+        ('ouid', 'OUID'),
+        ('match', 'MATCH ID'),
+        ('squad', '스쿼드'),
+    ]
+    run = models.ForeignKey(IngestRun, on_delete=models.CASCADE, related_name='checkpoints')
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    nickname = models.CharField(max_length=100)
+    value = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'kind', 'nickname'], name='unique_ingest_checkpoint'),
+        ]
+
+class SchedulerLease(models.Model):
+    # 스케줄러 리더 임대 (이름별 한 행, 만료 전까지 holder 프로세스만 작업 실행)
+    name = models.CharField(max_length=50, unique=True)
+    holder = models.CharField(max_length=100, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.holder or '-'})"
+
+class JobRun(models.Model):
+    STATUS_CHOICES = [
+        ('running', '실행 중'),
+        ('succeeded', '성공'),
+        ('failed', '실패'),
+        ('skipped', '건너뜀'),
+        ('abandoned', '중단'),
+    ]
+    job = models.CharField(max_length=50)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='running')
+    holder = models.CharField(max_length=100, blank=True)  # 실행한 프로세스(호스트:PID)
+    scheduled_for = models.DateTimeField(null=True, blank=True)  # 예정 시각 (시작 시 즉시 실행은 None)
+    started_at = models.DateTimeField()
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    message = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['job', 'status'], name='jobrun_job_status')]
+
+    def __str__(self):
+        return f"{self.job} {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+class TrendPoint(models.Model):
+    # 픽률/팀컬러 추이의 한 시점: 공개 스냅샷 하나(hour) 또는 하루치 시간 단위 시점을 합친 것(day)
+    PERIOD_CHOICES = [
+        ('hour', '시간'),
+        ('day', '일'),
+    ]
+    period = models.CharField(max_length=8, choices=PERIOD_CHOICES)
+    at = models.DateTimeField()  # hour: 스냅샷 공개 시각, day: 해당 날짜 0시
+    snapshot_id = models.PositiveIntegerField(null=True, blank=True)  # hour 시점의 스냅샷 (스냅샷 정리와 무관하게 유지)
+    samples = models.PositiveIntegerField(default=1)  # 합친 스냅샷 수 (집계 행의 값은 합계)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['period', 'at'], name='unique_trend_point')]
+        indexes = [models.Index(fields=['at'], name='trend_point_at')]
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.at:%Y-%m-%d %H:%M} (스냅샷 {self.samples}개)"
+
+class PickRollup(models.Model):
+    # 시점별 포지션 그룹/선수 조합/등수 구간의 사용 매니저 수 (원본 Player 행 대신 추이 조회에 사용)
+    point = models.ForeignKey(TrendPoint, on_delete=models.CASCADE, related_name='picks')
+    position = models.CharField(max_length=8)  # 포지션 그룹 (ST, CM, ...)
+    player_name = models.CharField(max_length=64)
+    season = models.CharField(max_length=64)  # ''은 모든 시즌
+    grade = models.PositiveIntegerField()  # 0은 모든 강화단계
+    rank_bucket = models.PositiveIntegerField()  # 등수 구간 상한 (PICK_TREND['RANK_BUCKETS'])
+    user_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['player_name', 'position', 'point'], name='pick_rollup_player')]
+
+class TeamColorRollup(models.Model):
+    # 시점별 팀컬러/등수 구간의 매니저 수 (team_color=''은 전체 매니저, 사용률 계산의 분모)
+    point = models.ForeignKey(TrendPoint, on_delete=models.CASCADE, related_name='team_colors')
+    team_color = models.CharField(max_length=100)
+    rank_bucket = models.PositiveIntegerField()
+    manager_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['team_color', 'point'], name='team_color_rollup_color')]
 
 class VisitorLog(models.Model):
     ip = models.GenericIPAddressField()
@@ -0,0 +1,131 @@
+import datetime
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+# SQLite 변수 개수 제한을 피하기 위한 IN 조회 단위
+QUERY_CHUNK = 500
+
+
+def get_ttl():
+    return datetime.timedelta(hours=getattr(settings, 'OUID_CACHE_TTL_HOURS', 24))
+
+
+def load_fresh_ouids(nicknames=None):
+    # TTL 이내에 갱신된 닉네임 → OUID 매핑 조회 (nicknames가 None이면 전체)
+    from core.models import OuidCache
+    threshold = timezone.now() - get_ttl()
+    if nicknames is None:
+        return dict(OuidCache.objects.filter(updated_at__gte=threshold).values_list('nickname', 'ouid'))
+    nicknames = list(nicknames)
+    result = {}
+    for i in range(0, len(nicknames), QUERY_CHUNK):
+        chunk = nicknames[i:i + QUERY_CHUNK]
+        rows = OuidCache.objects.filter(nickname__in=chunk, updated_at__gte=threshold).values_list('nickname', 'ouid')
+        result.update(rows)
+    return result
+
+
+def store_ouids(mapping):
+    # 닉네임 → OUID 일괄 저장(있으면 갱신)
+    from core.models import OuidCache
+    if not mapping:
+        return
+    now = timezone.now()
+    ouids = list(mapping.values())
+    # 같은 OUID가 다른 닉네임으로 남아 있으면 닉네임이 바뀐 것이므로 이전 항목 제거
+    for i in range(0, len(ouids), QUERY_CHUNK):
+        chunk = ouids[i:i + QUERY_CHUNK]
+        renamed = [
+            nickname for nickname, ouid in OuidCache.objects.filter(ouid__in=chunk).values_list('nickname', 'ouid')
+            if mapping.get(nickname) != ouid
+        ]
+        if renamed:
+            OuidCache.objects.filter(nickname__in=renamed).delete()
+    OuidCache.objects.bulk_create(
+        [OuidCache(nickname=nickname, ouid=ouid, updated_at=now) for nickname, ouid in mapping.items()],
+        batch_size=QUERY_CHUNK,
+        update_conflicts=True,
+        unique_fields=['nickname'],
+        update_fields=['ouid', 'updated_at'],
+    )
+
+
+def invalidate(nicknames):
+    from core.models import OuidCache
+    nicknames = list(nicknames)
+    for i in range(0, len(nicknames), QUERY_CHUNK):
+        OuidCache.objects.filter(nickname__in=nicknames[i:i + QUERY_CHUNK]).delete()
+
+
+class OuidCacheSession:
+    """
+    수집 1회 동안 사용하는 OUID 캐시
+    - 시작 시 TTL 이내 항목을 한 번에 읽고, 새로 조회/무효화된 항목은 flush()에서 일괄 반영
+    - 매니저 목록을 미리 알 수 없으면(크롤링 스트리밍) nicknames=None으로 전체 항목을 읽음
+    - 여러 스레드에서 동시에 사용 가능
+    """
+
+    def __init__(self, nicknames=None):
+        self.cached = load_fresh_ouids(nicknames)
+        self.resolved = {}
+        self.stale = set()
+        self._lock = threading.Lock()
+
+    def get(self, nickname):
+        with self._lock:
+            return self.resolved.get(nickname) or self.cached.get(nickname)
+
+    def is_cached(self, nickname):
+        # 이번 실행에서 새로 조회하지 않고 캐시에서 가져온 OUID인지 여부
+        with self._lock:
+            return nickname in self.cached and nickname not in self.resolved
+
+    def put(self, nickname, ouid):
+        with self._lock:
+            self.resolved[nickname] = ouid
+            self.stale.discard(nickname)
+
+    def mark_stale(self, nickname):
+        with self._lock:
+            self.cached.pop(nickname, None)
+            self.stale.add(nickname)
+
+    def flush(self):
+        with self._lock:
+            resolved = dict(self.resolved)
+            stale = set(self.stale)
+        invalidate(stale)
+        store_ouids(resolved)
+        return len(resolved), len(stale)
+
+
+def warm_ouid_cache(nicknames, max_workers=80):
+    # 캐시에 없거나 만료된 닉네임만 OUID 조회 후 저장 (crawl_managers에서 사용)
+    import concurrent.futures
+    from types import SimpleNamespace
+    from core.tasks import fetch_ouid, log_with_time
+
+    nicknames = list(dict.fromkeys(nicknames))
+    cached = load_fresh_ouids(nicknames)
+    pending = [SimpleNamespace(nickname=nickname) for nickname in nicknames if nickname not in cached]
+    log_with_time(f"[API] OUID 캐시 예열 시작 (캐시 적중: {len(cached):,}, 조회 대상: {len(pending):,})")
+    resolved = {}
+    for retry_count in range(3):
+        if not pending:
+            break
+        failed = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_ouid, target, retry_count): target for target in pending}
+            for future in concurrent.futures.as_completed(futures):
+                target = futures[future]
+                _, ouid = future.result()
+                if ouid:
+                    resolved[target.nickname] = ouid
+                else:
+                    failed.append(target)
+        pending = failed
+    store_ouids(resolved)
+    log_with_time(f"[API] OUID 캐시 예열 완료 (신규 저장: {len(resolved):,}, 실패: {len(pending):,})")
+    return len(resolved)
@@ -0,0 +1,144 @@
+from core.pick_index import RankPrefixIndex, get_index
+from core.stats_cube import Cell, get_cube, pick_rate_summary
+
+# 한 요청에서 받을 수 있는 조회 조건 수
+MAX_SPECS = 50
+
+DEFAULT_RANK_MIN = 1
+DEFAULT_RANK_MAX = 100
+DEFAULT_TOP_N = 3
+# 포지션 그룹별 선수 수 상한 (더 크게 요청해도 이 값으로 맞춤)
+MAX_TOP_N = 50
+
+
+def _int(raw, name, default):
+    value = raw.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}은(는) 숫자여야 합니다.")
+
+
+def _names(raw, plural, single):
+    # 목록 또는 문자열 하나로 받은 팀컬러/포메이션 조건 (빈 문자열은 조건 없음)
+    value = raw.get(plural, raw.get(single, []))
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{plural}은(는) 문자열 목록이어야 합니다.")
+    return sorted({item for item in value if item})
+
+
+def normalize_spec(raw):
+    """
+    일괄 조회 조건 하나 정규화
+    - rank_min/rank_max: 등수 구간 (rank_max 대신 기존 조회와 같은 rank_range도 허용)
+    - team_colors/formations: 여러 개면 그중 하나와 일치하는 매니저 (team_color/formation 문자열 하나도 허용)
+    - top_n: 포지션 그룹별 선수 수 (1 ~ MAX_TOP_N으로 맞춤)
+    - 등수가 1보다 작거나 rank_min > rank_max이면 ValueError
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("조회 조건은 객체여야 합니다.")
+    rank_min = _int(raw, 'rank_min', DEFAULT_RANK_MIN)
+    rank_max = _int(raw, 'rank_max', raw.get('rank_range', DEFAULT_RANK_MAX))
+    if rank_min < 1:
+        raise ValueError("rank_min은 1 이상이어야 합니다.")
+    if rank_min > rank_max:
+        raise ValueError("rank_min은 rank_max보다 클 수 없습니다.")
+    return {
+        'rank_min': rank_min,
+        'rank_max': rank_max,
+        'team_colors': _names(raw, 'team_colors', 'team_color'),
+        'formations': _names(raw, 'formations', 'formation'),
+        'top_n': max(1, min(_int(raw, 'top_n', DEFAULT_TOP_N), MAX_TOP_N)),
+    }
+
+
+class _Scan:
+    # 색인으로 바로 답할 수 없는 조건 하나의 집계 (포지션 그룹 색인 + 포메이션별 통계 Cell)
+    def __init__(self, spec, rows):
+        self.spec = spec
+        self.team_colors = set(spec['team_colors']) or None
+        self.formations = set(spec['formations']) or None
+        self.index = RankPrefixIndex(rows)
+        self.by_formation = {}
+
+    def matches(self, manager):
+        rank, team_color, formation = manager[1], manager[3], manager[4]
+        return (
+            self.spec['rank_min'] <= rank <= self.spec['rank_max']
+            and (self.team_colors is None or team_color in self.team_colors)
+            and (self.formations is None or formation in self.formations)
+        )
+
+    def add(self, idx, manager):
+        pk, rank, nickname, _, formation, score, club_value = manager
+        self.index.add(idx)
+        cell = self.by_formation.get(formation)
+        if cell is None:
+            cell = self.by_formation[formation] = Cell()
+        cell.add(pk, rank, nickname, (rank, score, club_value))
+
+    def result(self):
+        self.index.finish()
+        summary = pick_rate_summary(self.by_formation)
+        positions = self.index.pick_rate(self.spec['rank_max'], self.spec['top_n'], summary['manager_count'])
+        return summary, positions
+
+
+def evaluate(snapshot, specs):
+    """
+    여러 조회 조건을 스냅샷 한 번 순회로 계산 → 조건마다 get_pick_rate와 같은 형태의 결과
+    - 1위부터의 등수 + 팀컬러 하나 이하 + 포메이션 조건 없음: 픽률 색인/통계 큐브에서 바로 조회
+    - 나머지 조건: 모든 조건의 등수 구간을 합친 범위의 매니저를 한 번만 순회하며 일치하는 조건마다
+      포지션 그룹별 선수 조합(미리 묶어 둔 행 배열)과 포메이션별 통계를 누적
+    """
+    index = get_index(snapshot.pk)
+    rows = index.rows
+    first_rank = rows.ranks[0] if len(rows) else 0
+
+    answers = [None] * len(specs)
+    scans = []
+    for idx, spec in enumerate(specs):
+        if spec['rank_min'] <= first_rank and len(spec['team_colors']) <= 1 and not spec['formations']:
+            team_color = spec['team_colors'][0] if spec['team_colors'] else ''
+            view = index.view(team_color)
+            summary = get_cube(snapshot.pk).pick_rate_stats(spec['rank_max'], team_color)
+            positions = view.pick_rate(spec['rank_max'], spec['top_n'], summary['manager_count']) if view else {}
+            answers[idx] = (summary, positions)
+        else:
+            scans.append((idx, _Scan(spec, rows)))
+
+    if scans:
+        window = rows.positions(
+            min(scan.spec['rank_min'] for _, scan in scans),
+            max(scan.spec['rank_max'] for _, scan in scans),
+        )
+        for position in window:
+            manager = rows.managers[position]
+            for _, scan in scans:
+                if scan.matches(manager):
+                    scan.add(position, manager)
+        for idx, scan in scans:
+            answers[idx] = scan.result()
+
+    base_date = snapshot.published_at.strftime('%Y년 %m월 %d일 %H시')
+    results = []
+    for spec, (summary, positions) in zip(specs, answers):
+        manager_count = summary['manager_count']
+        result = {'spec': spec}
+        if not manager_count:
+            result['error'] = "조건에 일치하는 매니저가 없습니다."
+            results.append(result)
+            continue
+        result.update(positions)
+        result['base_date'] = base_date
+        result['total_count'] = manager_count
+        result['percentage'] = round((manager_count / snapshot.manager_count) * 100, 1)
+        result['manager_count'] = manager_count
+        result['formation_rank'] = summary['formation_rank']
+        result['rank_stats'] = summary['rank_stats']
+        result['score_stats'] = summary['score_stats']
+        result['club_value_stats'] = summary['club_value_stats']
+        results.append(result)
+    return results
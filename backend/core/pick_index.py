@@ -0,0 +1,284 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+from core.snapshots import SnapshotLocal
+
+# 픽률 포지션 그룹 (그룹 이름 → 세부 포지션)
+POSITION_GROUPS = {
+    'ST': ['LS', 'ST', 'RS'],
+    'CF': ['LF', 'CF', 'RF'],
+    'LW': ['LW'],
+    'RW': ['RW'],
+    'CAM': ['CAM'],
+    'RAM': ['RAM'],
+    'LAM': ['LAM'],
+    'RM': ['RM'],
+    'LM': ['LM'],
+    'CM': ['LCM', 'CM', 'RCM'],
+    'CDM': ['LDM', 'CDM', 'RDM'],
+    'CB': ['LCB', 'CB', 'SW', 'RCB'],
+    'LB': ['LWB', 'LB'],
+    'RB': ['RWB', 'RB'],
+    'GK': ['GK'],
+}
+GROUP_OF = {position: group for group, positions in POSITION_GROUPS.items() for position in positions}
+
+# 선수별로 미리 보관하는 사용자 닉네임 수
+TOP_USERS = 3
+
+
+def season_order(season):
+    # 같은 사용자 수일 때 시즌 정렬값 (숫자 시즌만 큰 순, 나머지는 0)
+    return int(season) if str(season).isdigit() else 0
+
+
+class _KeyBuilder:
+    # 한 포지션 그룹의 선수 조합(이름, 시즌, 강화단계) 하나를 등수 순으로 누적
+    __slots__ = ('ranks', 'last_manager', 'best', 'bp_ranks', 'bp_first', 'bp_users')
+
+    def __init__(self):
+        self.ranks = array('l')
+        self.last_manager = None
+        self.best = []  # 행 번호가 가장 작은 (행 번호, 닉네임) 최대 TOP_USERS개, 닉네임 중복 없음
+        self.bp_ranks = array('l')
+        self.bp_first = array('q')
+        self.bp_users = []
+
+    def add(self, rank, manager_id, pk, nickname):
+        if manager_id == self.last_manager:
+            return
+        self.last_manager = manager_id
+        self.ranks.append(rank)
+
+        best = self.best
+        for idx, (seen_pk, seen_nickname) in enumerate(best):
+            if seen_nickname == nickname:
+                if seen_pk < pk:
+                    return
+                del best[idx]
+                break
+        if len(best) == TOP_USERS and pk > best[-1][0]:
+            return
+        best.append((pk, nickname))
+        best.sort()
+        del best[TOP_USERS:]
+
+        # 등수 구간마다 (첫 행 번호, 닉네임 목록)이 바뀌는 지점만 기록
+        users = tuple(name for _, name in best)
+        if self.bp_ranks and self.bp_ranks[-1] == rank:
+            self.bp_first[-1] = best[0][0]
+            self.bp_users[-1] = users
+        else:
+            self.bp_ranks.append(rank)
+            self.bp_first.append(best[0][0])
+            self.bp_users.append(users)
+
+
+class PositionIndex:
+    """
+    한 포지션 그룹의 등수 누적 색인
+    - 선수 조합마다 사용 매니저 등수(오름차순) 배열: rank_range 이하 사용자 수 = 이진 탐색
+    - 조합 순서는 전체 사용자 수 내림차순, 상위 N개는 남은 조합의 전체 사용자 수가 현재 N번째보다 작아지면 중단
+    - 동률은 기존 집계(선수 행을 행 번호 순으로 읽어 처음 나온 순서)와 같도록 rank_range 이하 행 중 가장 작은 행 번호로 정렬
+    - top_users도 같은 기준(행 번호 순 앞의 닉네임 3개)을 등수 구간별로 미리 계산
+    """
+
+    def __init__(self, builders, keys):
+        items = sorted(builders.items(), key=lambda item: -len(item[1].ranks))
+        self.keys = [keys[key_id] for key_id, _ in items]
+        self.totals = array('l', (len(builder.ranks) for _, builder in items))
+        self.orders = [(season_order(key[1]), key[2]) for key in self.keys]
+        self.ranks = [builder.ranks for _, builder in items]
+        self.bp_ranks = [builder.bp_ranks for _, builder in items]
+        self.bp_first = [builder.bp_first for _, builder in items]
+        self.bp_users = [builder.bp_users for _, builder in items]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _entry(self, idx, rank_range):
+        count = bisect_right(self.ranks[idx], rank_range)
+        if not count:
+            return None
+        season, grade = self.orders[idx]
+        bp = bisect_right(self.bp_ranks[idx], rank_range) - 1
+        # 큰 값이 앞 순위: 사용자 수, 시즌, 강화단계 큰 순, 처음 나온 행 번호 작은 순
+        return count, season, grade, -self.bp_first[idx][bp], idx, bp
+
+    def top(self, rank_range, top_n):
+        if top_n <= 0:
+            # 기존 player_list[:top_n] 동작(0이면 빈 목록, 음수면 뒤에서 자름) 유지
+            entries = (self._entry(idx, rank_range) for idx in range(len(self.keys)))
+            return sorted((entry for entry in entries if entry), reverse=True)[:top_n]
+
+        heap = []
+        for idx, total in enumerate(self.totals):
+            if len(heap) == top_n and total < heap[0][0]:
+                break
+            entry = self._entry(idx, rank_range)
+            if entry is None:
+                continue
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        return sorted(heap, reverse=True)
+
+    def players(self, rank_range, top_n, manager_count):
+        position_total = manager_count if manager_count else 1
+        result = []
+        for count, _, _, _, idx, bp in self.top(rank_range, top_n):
+            player_name, season, grade = self.keys[idx]
+            users = list(self.bp_users[idx][bp])
+            result.append({
+                'player_name': player_name,
+                'season': season,
+                'grade': grade,
+                'user_count': count,
+                'usage_rate': round(count * 100.0 / position_total, 1),
+                'top_users': users,
+                'remaining_users': count - len(users),
+            })
+        return result
+
+
+class PlayerRows:
+    """
+    스냅샷의 매니저/선수 행을 매니저 순서(등수, 행 번호)로 정렬해 열 배열로 보관
+    - managers: (행 번호, 등수, 닉네임, 팀컬러, 포메이션, 점수, 구단가치)
+    - 매니저 i의 선수 행은 row_start[i]:row_start[i + 1] 구간 (행 번호 순)
+    - 선수 행은 포지션 그룹에 속한 것만, 그룹/선수 조합(이름, 시즌, 강화단계)은 번호로 저장
+    """
+
+    def __init__(self, snapshot_id):
+        from core.models import Manager, Player
+        self.managers = list(
+            Manager.objects.filter(snapshot_id=snapshot_id).order_by('rank', 'pk')
+            .values_list('pk', 'rank', 'nickname', 'team_color', 'formation', 'score', 'club_value')
+        )
+        self.ranks = array('l', (manager[1] for manager in self.managers))
+        position_of = {manager[0]: idx for idx, manager in enumerate(self.managers)}
+
+        self.groups = list(POSITION_GROUPS)
+        group_ids = {position: self.groups.index(group) for position, group in GROUP_OF.items()}
+        self.keys = []
+        key_ids = {}
+        rows = [[] for _ in self.managers]
+        players = (
+            Player.objects.filter(snapshot_id=snapshot_id, position__in=list(GROUP_OF))
+            .order_by('pk').values_list('pk', 'manager_id', 'position', 'player_name', 'season', 'grade')
+            .iterator(chunk_size=5000)
+        )
+        for pk, manager_id, position, player_name, season, grade in players:
+            idx = position_of.get(manager_id)
+            if idx is None:
+                continue
+            key = (player_name, season, grade)
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            rows[idx].append((pk, group_ids[position], key_id))
+
+        self.row_start = array('l', [0])
+        self.row_pk = array('q')
+        self.row_group = array('b')
+        self.row_key = array('l')
+        for manager_rows in rows:
+            for pk, group_id, key_id in manager_rows:
+                self.row_pk.append(pk)
+                self.row_group.append(group_id)
+                self.row_key.append(key_id)
+            self.row_start.append(len(self.row_pk))
+
+    def __len__(self):
+        return len(self.managers)
+
+    def positions(self, rank_min, rank_max):
+        # 등수 구간 [rank_min, rank_max]에 해당하는 매니저 순번 범위
+        return range(bisect_left(self.ranks, rank_min), bisect_right(self.ranks, rank_max))
+
+
+class RankPrefixIndex:
+    """
+    매니저 한 집합(전체, 팀컬러 하나, 일괄 조회 조건 하나)의 등수 배열 + 포지션 그룹별 색인
+    - add()로 매니저를 등수 순으로 넣은 뒤 finish()로 색인 생성
+    """
+
+    def __init__(self, rows, positions=None):
+        self.rows = rows
+        self.ranks = array('l')
+        self.builders = [{} for _ in rows.groups]
+        if positions is not None:
+            for idx in positions:
+                self.add(idx)
+            self.finish()
+
+    def add(self, idx):
+        rows = self.rows
+        manager_id, rank, nickname = rows.managers[idx][:3]
+        self.ranks.append(rank)
+        for row in range(rows.row_start[idx], rows.row_start[idx + 1]):
+            group_builders = self.builders[rows.row_group[row]]
+            key_id = rows.row_key[row]
+            builder = group_builders.get(key_id)
+            if builder is None:
+                builder = group_builders[key_id] = _KeyBuilder()
+            builder.add(rank, manager_id, rows.row_pk[row], nickname)
+
+    def finish(self):
+        self.groups = {
+            group: PositionIndex(builders, self.rows.keys)
+            for group, builders in zip(self.rows.groups, self.builders)
+        }
+        del self.builders
+        return self
+
+    def manager_count(self, rank_range):
+        return bisect_right(self.ranks, rank_range)
+
+    def pick_rate(self, rank_range, top_n, manager_count=None):
+        # 포지션 그룹별 상위 top_n 선수 (선수가 없는 그룹은 제외)
+        if manager_count is None:
+            manager_count = self.manager_count(rank_range)
+        result = {}
+        for group, index in self.groups.items():
+            players = index.players(rank_range, top_n, manager_count)
+            if players:
+                result[group] = players
+        return result
+
+
+class PickRateIndex:
+    """
+    스냅샷 하나의 픽률 색인 (스냅샷마다 한 번 생성, 이후 읽기 전용)
+    - 전체 매니저용 색인과 팀컬러별 색인
+    - 원본 행(PlayerRows)은 일괄 조회에서 조건별 집계에 다시 사용
+    """
+
+    def __init__(self, snapshot_id):
+        self.snapshot_id = snapshot_id
+        self.rows = PlayerRows(snapshot_id)
+        self.all = RankPrefixIndex(self.rows, range(len(self.rows)))
+        by_color = {}
+        for idx, manager in enumerate(self.rows.managers):
+            by_color.setdefault(manager[3], []).append(idx)
+        self.team_colors = {
+            team_color: RankPrefixIndex(self.rows, positions)
+            for team_color, positions in by_color.items()
+        }
+
+    def view(self, team_color=''):
+        # 팀컬러 조건이 없으면 전체, 해당 팀컬러 매니저가 없으면 None
+        if not team_color:
+            return self.all
+        return self.team_colors.get(team_color)
+
+
+_indexes = SnapshotLocal('픽률 색인', PickRateIndex)
+
+
+def get_index(snapshot_id):
+    # 스냅샷의 픽률 색인 (공개 시 미리 생성, 없으면 이 요청에서 생성)
+    return _indexes.get(snapshot_id)
@@ -0,0 +1,295 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from core import tasks
+from core.run_state import FLUSH_SIZE, RunState
+from core.tasks import log_with_time
+
+# 단계 종료 신호
+STAGE_DONE = None
+
+
+class IngestPipeline:
+    """
+    OUID → MATCH ID → MATCH DETAIL 스트리밍 수집 엔진
+    - 매니저 한 명씩 단계별 큐(bounded)를 따라 독립적으로 이동
+    - 각 단계는 정해진 수의 워커가 동시에 처리하므로 세 단계 호출이 서로 겹쳐서 진행됨
+    - 재시도 규칙은 기존과 동일(OUID 최대 3회, MATCH ID limit 1/2/3, 디테일 실패 시 이전 경기 대체)
+      단, OUID는 재시도 대상 실패(429, 타임아웃 등)만 재시도, 재시도 간격은 고정 대기 없이 키 스케줄러가 조절
+    - OUID 캐시에 있는 닉네임은 1단계 호출 없이 바로 2단계로 전달
+    - 최신 경기가 직전 실행과 같으면 3단계 없이 이전 스쿼드를 그대로 사용
+    """
+
+    def __init__(self, ouid_workers=None, match_workers=None, detail_workers=None, queue_size=None,
+                 ouid_cache=None, match_state=None, run_state=None):
+        conf = getattr(settings, 'INGEST_PIPELINE', {})
+        self.ouid_workers = ouid_workers or conf.get('OUID_WORKERS', 80)
+        self.match_workers = match_workers or conf.get('MATCH_WORKERS', 300)
+        self.detail_workers = detail_workers or conf.get('DETAIL_WORKERS', 80)
+        self.queue_size = queue_size or conf.get('QUEUE_SIZE', 1000)
+        self.ouid_cache = ouid_cache
+        self.match_state = match_state
+        self.run_state = run_state
+        self.log_interval = 200
+        self.executor = None
+        self.db_executor = None
+        self._flushing = None
+        self.started = None
+        self.stage_seconds = {}
+        self.total = 0
+        self.counts = {'ouid': 0, 'match': 0, 'detail': 0, 'ouid_cached': 0}
+        self.done = {'ouid': 0, 'match': 0, 'detail': 0}
+        self.results = []
+
+    async def _call(self, func, *args):
+        # requests 기반 블로킹 호출은 스레드풀에서 실행
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def _progress(self, stage, label):
+        self.done[stage] += 1
+        if self.done[stage] % self.log_interval == 0:
+            log_with_time(f"[API] {label} {self.done[stage]:,}명 처리 (성공: {self.counts[stage]:,}/{self.total:,})")
+
+    async def _resolve_ouid(self, manager):
+        if self.ouid_cache is not None:
+            ouid = self.ouid_cache.get(manager.nickname)
+            if ouid:
+                self.counts['ouid'] += 1
+                self.counts['ouid_cached'] += 1
+                self._progress('ouid', "OUID 조회")
+                return manager, ouid
+        for retry_count in range(3):
+            if retry_count > 0:
+                self._retry('ouid', retry_count)
+            returned, ouid = await self._call(tasks.fetch_ouid, manager, retry_count)
+            if ouid:
+                if self.ouid_cache is not None:
+                    self.ouid_cache.put(manager.nickname, ouid)
+                self._checkpoint('ouid', manager.nickname, ouid)
+                self.counts['ouid'] += 1
+                self._progress('ouid', "OUID 조회")
+                return manager, ouid
+            if returned is not None:
+                # 재시도 대상이 아닌 실패(없는 닉네임, 4xx 등)는 바로 종료
+                break
+        self._progress('ouid', "OUID 조회")
+        return None
+
+    def _checkpoint(self, kind, nickname, value):
+        # 이벤트 루프에서는 ORM을 쓸 수 없으므로 모아 두었다가 DB 전용 스레드에서 저장
+        if self.run_state is None:
+            return
+        self.run_state.record(kind, nickname, value, autoflush=False)
+        if self.run_state.pending() >= FLUSH_SIZE and (self._flushing is None or self._flushing.done()):
+            loop = asyncio.get_running_loop()
+            self._flushing = loop.run_in_executor(self.db_executor, self.run_state.flush)
+
+    def _retry(self, stage, wave):
+        if self.run_state is not None:
+            self.run_state.metrics.retry_wave(stage, wave)
+
+    def _add_result(self, manager, squad):
+        self._checkpoint('squad', manager.nickname, squad)
+        self.results.append((manager, squad))
+
+    def _matched(self, manager, ouid, match_id, latest):
+        # MATCH ID 확정: latest(limit=1로 받은 최신 경기)면 증분 기록에 반영하고 변동 없으면 이전 스쿼드로 종료
+        self.counts['match'] += 1
+        self._progress('match', "MATCH ID 조회")
+        if self.match_state is not None:
+            if latest:
+                self.match_state.observe_latest(ouid, match_id)
+            squad = self.match_state.carry_over(manager, ouid, match_id)
+            if squad:
+                self._add_result(manager, squad)
+                return None
+        return manager, ouid, match_id
+
+    async def _resolve_match_id(self, item):
+        manager, ouid = item
+        if self.run_state is not None:
+            # 체크포인트의 MATCH ID도 새로 조회한 것과 같은 증분 판단을 거침 (재개 시 변동 없는 매니저 재조회 방지)
+            saved = self.run_state.match_ids.get(manager.nickname)
+            if saved and saved[0] == ouid:
+                return self._matched(manager, ouid, saved[1], RunState.is_latest(saved))
+        for retry_count in range(3):
+            if retry_count > 0:
+                self._retry('match_id', retry_count)
+            _, match_id = await self._call(tasks.fetch_match_id, manager, ouid, retry_count)
+            if match_id:
+                self._checkpoint('match', manager.nickname, (ouid, match_id, retry_count == 0))
+                return self._matched(manager, ouid, match_id, retry_count == 0)
+        if self.ouid_cache is not None and self.ouid_cache.is_cached(manager.nickname):
+            # 캐시된 OUID가 더 이상 유효하지 않을 수 있으므로 재검증
+            self._retry('match_id', 'revalidate')
+            ouid, match_id = await self._call(tasks.revalidate_ouid_and_fetch_match_id, manager, ouid, self.ouid_cache)
+            if match_id:
+                self._checkpoint('match', manager.nickname, (ouid, match_id, True))
+                return self._matched(manager, ouid, match_id, True)
+        self._progress('match', "MATCH ID 조회")
+        return None
+
+    async def _resolve_detail(self, item):
+        metrics = self.run_state.metrics if self.run_state is not None else None
+        result = await self._call(tasks.fetch_match_detail_with_retry, item, metrics)
+        if result:
+            if self.match_state is not None:
+                self.match_state.record(result[0], item[1], result[1])
+            self.counts['detail'] += 1
+            self._add_result(*result)
+        self._progress('detail', "MATCH DETAIL 조회")
+        return None
+
+    async def _stage(self, name, in_q, out_q, workers, next_workers, handler):
+        async def worker():
+            while True:
+                item = await in_q.get()
+                if item is STAGE_DONE:
+                    return
+                result = await handler(item)
+                if result is not None and out_q is not None:
+                    await out_q.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        # 파이프라인 시작부터 이 단계의 마지막 항목이 끝날 때까지의 시간
+        self.stage_seconds[name] = time.time() - self.started
+        if out_q is not None:
+            for _ in range(next_workers):
+                await out_q.put(STAGE_DONE)
+
+    async def _produce(self, source, out_q):
+        if hasattr(source, 'produce'):
+            # 크롤링 스트림: 페이지를 받는 대로 매니저 저장 후 전달
+            async for manager in source.produce(self):
+                self.total += 1
+                await out_q.put(manager)
+        elif hasattr(source, '__aiter__'):
+            async for manager in source:
+                self.total += 1
+                await out_q.put(manager)
+        else:
+            for manager in source:
+                self.total += 1
+                await out_q.put(manager)
+        for _ in range(self.ouid_workers):
+            await out_q.put(STAGE_DONE)
+
+    async def run(self, source):
+        ouid_q = asyncio.Queue(maxsize=self.queue_size)
+        match_q = asyncio.Queue(maxsize=self.queue_size)
+        detail_q = asyncio.Queue(maxsize=self.queue_size)
+        max_workers = self.ouid_workers + self.match_workers + self.detail_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
+        loop = asyncio.get_running_loop()
+        self.started = time.time()
+        stages = [
+            asyncio.ensure_future(self._produce(source, ouid_q)),
+            asyncio.ensure_future(self._stage('ouid', ouid_q, match_q, self.ouid_workers, self.match_workers, self._resolve_ouid)),
+            asyncio.ensure_future(self._stage('match_id', match_q, detail_q, self.match_workers, self.detail_workers, self._resolve_match_id)),
+            asyncio.ensure_future(self._stage('match_detail', detail_q, None, self.detail_workers, 0, self._resolve_detail)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            # 한 단계라도 실패하면 나머지 단계도 정리 후 예외 전달
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        finally:
+            self.executor.shutdown(wait=True)
+            if self.run_state is not None:
+                for name, seconds in self.stage_seconds.items():
+                    self.run_state.metrics.set_stage_seconds(name, seconds)
+                await loop.run_in_executor(self.db_executor, self.run_state.flush)
+            await loop.run_in_executor(self.db_executor, connections.close_all)
+            self.db_executor.shutdown(wait=True)
+        return self.results
+
+
+class ManagerStream:
+    """
+    랭킹 페이지를 받는 즉시 매니저를 스냅샷에 저장하고 파이프라인으로 흘려보내는 소스
+    - fetch_page(page) -> (매니저 dict 목록, 실패 시 page): 크롤링 스레드풀에서 실행
+    - 페이지는 끝나는 순서대로 저장(파이프라인의 DB 전용 스레드, 체크포인트 저장과 같은 스레드)하고 바로 OUID 단계로 전달
+    - 스냅샷은 선수 저장 후 publish()로 공개되므로 크롤링 도중의 매니저는 조회 API에 보이지 않음
+    """
+
+    def __init__(self, snapshot, pages, fetch_page, workers=50):
+        self.snapshot = snapshot
+        self.pages = list(pages)
+        self.fetch_page = fetch_page
+        self.workers = workers
+        self.page_counts = {}
+        self.failed_pages = []
+        self.count = 0
+        self.finished = False
+
+    def _fetch(self, page):
+        managers, failed = self.fetch_page(page)
+        return page, managers, failed
+
+    def _save(self, page, rows, failed):
+        from core.models import Manager
+        from core.snapshots import BATCH_SIZE
+        managers = Manager.objects.bulk_create(
+            [Manager(snapshot=self.snapshot, **row) for row in rows], batch_size=BATCH_SIZE
+        )
+        self.page_counts[page] = len(managers)
+        if failed:
+            self.failed_pages.append(page)
+        self.count += len(managers)
+        return managers
+
+    def _finish(self):
+        self.snapshot.manager_count = self.count
+        self.snapshot.save(update_fields=['manager_count'])
+        self.finished = True
+
+    async def produce(self, pipeline):
+        loop = asyncio.get_running_loop()
+        crawler = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [loop.run_in_executor(crawler, self._fetch, page) for page in self.pages]
+            done = 0
+            for next_page in asyncio.as_completed(futures):
+                page, rows, failed = await next_page
+                managers = await loop.run_in_executor(pipeline.db_executor, self._save, page, rows, failed)
+                done += 1
+                if done % 100 == 0:
+                    log_with_time(f"[크롤링] {done}/{len(self.pages)} 페이지 수집 ({self.count:,}명 수집 단계로 전달)")
+                for manager in managers:
+                    yield manager
+            await loop.run_in_executor(pipeline.db_executor, self._finish)
+            pipeline.stage_seconds['crawl'] = time.time() - pipeline.started
+        finally:
+            crawler.shutdown(wait=False, cancel_futures=True)
+
+    def complete(self):
+        # 스트리밍 도중 실패한 경우 남은 페이지를 마저 받아 저장 (재시도는 스냅샷에 저장된 매니저로 진행)
+        if self.finished:
+            return
+        remaining = [page for page in self.pages if page not in self.page_counts]
+        with ThreadPoolExecutor(max_workers=self.workers) as crawler:
+            for page, rows, failed in crawler.map(self._fetch, remaining):
+                self._save(page, rows, failed)
+        self._finish()
+
+
+def collect_squads_pipeline(managers, **kwargs):
+    pipeline = IngestPipeline(**kwargs)
+    stages = "랭킹 크롤링 → OUID → MATCH ID → MATCH DETAIL" if hasattr(managers, 'produce') else "OUID → MATCH ID → MATCH DETAIL"
+    log_with_time(f"[API] 파이프라인 수집 시작 ({stages} 동시 진행)")
+    start_time = time.time()
+    results = asyncio.run(pipeline.run(managers))
+    log_with_time(
+        f"[API] 파이프라인 수집 완료 (OUID: {pipeline.counts['ouid']:,}(캐시 {pipeline.counts['ouid_cached']:,}), MATCH ID: {pipeline.counts['match']:,}, "
+        f"MATCH DETAIL: {pipeline.counts['detail']:,}/{pipeline.total:,}), {time.time() - start_time:.1f}초"
+    )
+    return results
@@ -0,0 +1,210 @@
+import heapq
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from core import meta
+
+# 한글 음절(가~힣)의 초성 순서, 호환 자모(ㄱ~ㅎ)로 표기
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+CHOSEONG_SET = frozenset(CHOSEONG)
+HANGUL_FIRST, HANGUL_LAST = ord('가'), ord('힣')
+
+# 한 글자 검색어는 후보가 너무 많으므로 이름/단어 시작 일치만 사용
+MIN_NGRAM_QUERY = 2
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize(text):
+    # 비교용 이름: 소문자, 공백/점/하이픈 제거, 라틴 문자 악센트 제거 ('C. 호날두' → 'c호날두', 'Mbappé' → 'mbappe')
+    out = []
+    for ch in text.lower():
+        if not ch.isalnum():
+            continue
+        if 0x7f < ord(ch) < 0x1100:
+            ch = unicodedata.normalize('NFKD', ch)[0]
+        out.append(ch)
+    return ''.join(out)
+
+
+def choseong(text):
+    # 한글 음절을 초성으로 바꾼 문자열 ('손흥민' → 'ㅅㅎㅁ'), 나머지 글자는 그대로
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_FIRST <= code <= HANGUL_LAST:
+            out.append(CHOSEONG[(code - HANGUL_FIRST) // 588])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def has_choseong(query):
+    return any(ch in CHOSEONG_SET for ch in query)
+
+
+def char_matches(query, norm, cho, start):
+    # query가 start 위치부터 일치하는지: 같은 글자이거나, 검색어의 초성 자모가 이름 음절의 초성과 같으면 일치
+    for offset, ch in enumerate(query):
+        idx = start + offset
+        if norm[idx] != ch and (ch not in CHOSEONG_SET or cho[idx] != ch):
+            return False
+    return True
+
+
+def find_match(query, norm, cho, starts):
+    """
+    이름에서 검색어 위치 찾기 → (일치 종류, 위치) 또는 None
+    - 종류: 0 이름 전체 일치, 1 이름 시작, 2 단어 시작, 3 중간
+    """
+    length = len(query)
+    if length > len(norm):
+        return None
+    if char_matches(query, norm, cho, 0):
+        return (0 if length == len(norm) else 1), 0
+    for start in starts:
+        if start + length <= len(norm) and char_matches(query, norm, cho, start):
+            return 2, start
+    for start in range(1, len(norm) - length + 1):
+        if char_matches(query, norm, cho, start):
+            return 3, start
+    return None
+
+
+def _sorted_keys(pairs):
+    # (문자열, 선수 번호) 목록을 정렬해 이진 탐색용 두 배열로
+    pairs.sort()
+    return [key for key, _ in pairs], array('l', (idx for _, idx in pairs))
+
+
+class PlayerSearchIndex:
+    """
+    선수 이름 검색 색인 (메타데이터 버전마다 한 번 생성)
+    - 선수(시즌 카드를 제외한 고유 번호 pid + 이름) 단위로 묶고 시즌별 spid를 함께 보관
+    - 이름/단어 시작: 정렬된 키 목록 이진 탐색 (한 글자 검색어)
+    - 두 글자 이상: 2-gram 역색인으로 후보를 좁힌 뒤 위치 확인
+    - 초성: 이름을 초성 문자열로 바꾼 색인을 따로 두어 'ㅅㅎㅁ', '손ㅎ' 같은 검색어도 일치
+    - 순위: 전체 일치 > 이름 시작 > 단어 시작 > 중간, 같으면 짧은 이름, 시즌 카드가 많은 선수 순
+    """
+
+    def __init__(self, spids, seasons):
+        self.spids = spids
+        self.seasons = seasons
+        groups = {}
+        for spid, name in spids.items():
+            text = str(spid)
+            groups.setdefault((text[3:], name), []).append(spid)
+
+        self.players = []
+        self.norms = []
+        self.chos = []
+        self.starts = []
+        self.card_counts = array('l')
+        prefix = []
+        cho_prefix = []
+        self.grams = {}
+        self.cho_grams = {}
+        for idx, ((pid, name), cards) in enumerate(sorted(groups.items())):
+            norm = normalize(name)
+            cho = choseong(norm)
+            starts = self._word_starts(name)
+            self.players.append((pid, name, cards))
+            self.norms.append(norm)
+            self.chos.append(cho)
+            self.starts.append(starts)
+            self.card_counts.append(len(cards))
+            for start in (0, *starts):
+                prefix.append((norm[start:], idx))
+                cho_prefix.append((cho[start:], idx))
+            for grams, text in ((self.grams, norm), (self.cho_grams, cho)):
+                for gram in {text[pos:pos + 2] for pos in range(len(text) - 1)}:
+                    grams.setdefault(gram, array('l')).append(idx)
+        self.prefix_keys, self.prefix_ids = _sorted_keys(prefix)
+        self.cho_prefix_keys, self.cho_prefix_ids = _sorted_keys(cho_prefix)
+
+    def __len__(self):
+        return len(self.players)
+
+    @staticmethod
+    def _word_starts(name):
+        # 정규화된 이름에서 두 번째 단어부터의 시작 위치 ('리오넬 메시' → [3])
+        starts = []
+        pos = 0
+        for word in name.lower().split()[:-1]:
+            pos += len(normalize(word))
+            starts.append(pos)
+        return [start for start in starts if 0 < start < len(normalize(name))]
+
+    def _prefix_candidates(self, query, keys, ids):
+        lo = bisect_left(keys, query)
+        hi = bisect_left(keys, query + '\U0010ffff')
+        return set(ids[lo:hi])
+
+    def _candidates(self, query):
+        if len(query) < MIN_NGRAM_QUERY:
+            if has_choseong(query):
+                return self._prefix_candidates(query, self.cho_prefix_keys, self.cho_prefix_ids)
+            return self._prefix_candidates(query, self.prefix_keys, self.prefix_ids)
+        # 초성이 섞인 검색어는 초성 문자열의 2-gram으로, 아니면 이름의 2-gram으로 후보 교집합
+        grams, text = (self.cho_grams, choseong(query)) if has_choseong(query) else (self.grams, query)
+        postings = []
+        for gram in {text[pos:pos + 2] for pos in range(len(text) - 1)}:
+            posting = grams.get(gram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        query = normalize(query)
+        if not query:
+            return []
+        ranked = []
+        for idx in self._candidates(query):
+            found = find_match(query, self.norms[idx], self.chos[idx], self.starts[idx])
+            if found is not None:
+                ranked.append((found[0], len(self.norms[idx]), -self.card_counts[idx], found[1], idx))
+        return [self.player(entry[-1]) for entry in heapq.nsmallest(limit, ranked)]
+
+    def player(self, idx):
+        pid, name, cards = self.players[idx]
+        seasons = []
+        for spid in sorted(cards, reverse=True):
+            season_id = spid // meta.SEASON_DIVISOR
+            seasons.append({
+                'spid': spid,
+                'season_id': season_id,
+                'season': self.seasons.short_name(season_id),
+                'class_name': self.seasons.get(season_id, str(season_id)),
+            })
+        return {'pid': pid, 'name': name, 'spid': seasons[0]['spid'], 'seasons': seasons}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    # 메타데이터 조회표가 교체된 경우(새 버전)에만 다시 생성
+    global _index
+    spids, seasons = meta.spid_names(), meta.season_names()
+    index = _index
+    if index is not None and index.spids is spids and index.seasons is seasons:
+        return index
+    with _index_lock:
+        if _index is None or _index.spids is not spids or _index.seasons is not seasons:
+            _index = PlayerSearchIndex(spids, seasons)
+        return _index
+
+
+def search_players(query, limit=DEFAULT_LIMIT):
+    return get_index().search(query, max(1, min(limit, MAX_LIMIT)))
@@ -0,0 +1,143 @@
+import re
+
+from django.conf import settings
+
+try:
+    import lxml.html
+except ImportError:  # lxml이 없으면 BeautifulSoup(html.parser)으로 파싱
+    lxml = None
+
+# 랭킹 행에서 읽는 셀 (이름: 필요한 class 목록), BeautifulSoup의 select_one 선택자와 같은 조건
+FIELDS = {
+    'rank': ('rank_no',),
+    'nickname': ('name', 'profile_pointer'),
+    'price': ('price',),
+    'team_color': ('td', 'team_color'),
+    'formation': ('td', 'formation'),
+    'score': ('td', 'rank_r_win_point'),
+}
+
+CLUB_VALUE_UNITS = {'만': 10**4, '억': 10**8, '조': 10**12, '경': 10**16}
+
+
+def parse_club_value(text):
+    text = text.replace(",", "").strip()
+    total = 0
+    # ex: '2경 3조 4억 5000만', '1380 2351만', '5400만', '2경 2197'
+    # 숫자+단위 조합 추출
+    matches = re.findall(r'(\d+)([만억조경])', text)
+    for num, unit in matches:
+        total += int(num) * CLUB_VALUE_UNITS[unit]
+    # 단위 없는 숫자(예: '2197')가 있으면 만 단위로 간주
+    remain = re.sub(r'(\d+[만억조경])', '', text).strip()
+    if remain.isdigit():
+        total += int(remain) * 10000
+    return total
+
+
+def clean_team_color(text):
+    # '유벤투스 (11명)' -> '유벤투스'
+    return re.sub(r"\s*\(.*\)$", "", text.strip())
+
+
+def build_manager(cells):
+    # cells: 이름 → (텍스트, alt 속성) / 셀이 없으면 None, 두 파서가 같은 규칙으로 값을 만들도록 공통 처리
+    if cells['rank'] is None:
+        return None
+    price_text, price_alt = cells['price']
+    club_value_text = price_alt or price_text
+    club_value = int(club_value_text.replace(",", "")) if club_value_text.isdigit() else parse_club_value(price_text)
+    team_color = clean_team_color(cells['team_color'][0].strip()) if cells['team_color'] else "알 수 없음"
+    return {
+        "rank": int(cells['rank'][0].strip()),
+        "nickname": cells['nickname'][0].strip(),
+        "club_value": club_value,
+        "team_color": team_color,
+        "formation": cells['formation'][0].strip(),
+        "score": int(float(cells['score'][0].strip())),
+    }
+
+
+def _parse_rows(rows, cells_of):
+    managers = []
+    for row in rows:
+        try:
+            manager = build_manager(cells_of(row))
+        except Exception as e:
+            print(f"[DEBUG] 행 파싱 실패: {e}")
+            continue
+        if manager is not None:
+            managers.append(manager)
+    return managers
+
+
+def parse_bs4(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+
+    def cells_of(row):
+        cells = {}
+        for name, classes in FIELDS.items():
+            elem = row.select_one('.' + '.'.join(classes))
+            cells[name] = (elem.text, elem.get("alt")) if elem is not None else None
+        return cells
+
+    return _parse_rows(soup.select(".tbody .tr"), cells_of)
+
+
+def _class_xpath(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+ROWS_XPATH = f"//*[{_class_xpath('tbody')}]//*[{_class_xpath('tr')}]"
+
+
+def parse_lxml(html):
+    if not html.strip():
+        return []
+    root = lxml.html.fromstring(html)
+    wanted = {name: set(classes) for name, classes in FIELDS.items()}
+
+    def cells_of(row):
+        # 행의 하위 요소를 한 번만 순회하며 셀마다 문서 순서상 첫 번째 요소 선택(select_one과 동일)
+        cells = dict.fromkeys(FIELDS)
+        remaining = len(FIELDS)
+        for elem in row.iterdescendants():
+            class_attr = elem.get('class') if isinstance(elem.tag, str) else None
+            if not class_attr:
+                continue
+            classes = set(class_attr.split())
+            for name, required in wanted.items():
+                if cells[name] is None and required <= classes:
+                    cells[name] = (elem.text_content(), elem.get('alt'))
+                    remaining -= 1
+            if not remaining:
+                break
+        return cells
+
+    return _parse_rows(root.xpath(ROWS_XPATH), cells_of)
+
+
+BACKENDS = {
+    'lxml': parse_lxml,
+    'bs4': parse_bs4,
+}
+
+
+def available_backends():
+    return [name for name in BACKENDS if name != 'lxml' or lxml is not None]
+
+
+def get_backend(name=None):
+    # settings.RANK_PARSER(기본 lxml), 설치되지 않은 경우 bs4로 대체
+    name = name or getattr(settings, 'RANK_PARSER', 'lxml')
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 랭킹 파서: {name}")
+    if name not in available_backends():
+        name = 'bs4'
+    return name
+
+
+def parse_rank_page(html, backend=None):
+    # 랭킹 페이지(rank_inner) HTML → 매니저 dict 목록
+    return BACKENDS[get_backend(backend)](html)
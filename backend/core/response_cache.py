@@ -0,0 +1,226 @@
+import functools
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified, QueryDict
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from core.snapshots import live_snapshot_id, on_publish, poll_live_snapshot
+
+# 엔드포인트 이름 → (뷰 함수, 조회 조건 정규화 함수)
+ENDPOINTS = {}
+
+
+def get_config():
+    conf = getattr(settings, 'RESPONSE_CACHE', {})
+    return {
+        'ALIAS': conf.get('ALIAS', 'responses'),
+        'LRU_SIZE': conf.get('LRU_SIZE', 512),
+        'WARM': conf.get('WARM', {}),
+        'TEAM_COLORS': conf.get('TEAM_COLORS', 10),
+    }
+
+
+class LRU:
+    # 프로세스별 최근 응답 (스레드 간 공유)
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is not None:
+                self.items.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            self.items[key] = entry
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+
+_lru = None
+_lru_lock = threading.Lock()
+
+
+def get_lru():
+    global _lru
+    with _lru_lock:
+        if _lru is None:
+            _lru = LRU(get_config()['LRU_SIZE'])
+        return _lru
+
+
+def shared_store():
+    return caches[get_config()['ALIAS']]
+
+
+def cache_key(name, snapshot_id, params):
+    return f"{name}:{snapshot_id}:{urlencode(sorted(params.items()))}"
+
+
+def make_etag(body):
+    # 강한 ETag: 응답 본문 해시 (스냅샷이 바뀌어도 내용이 같으면 같은 값)
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def lookup(key):
+    # LRU → 공유 캐시 순서로 조회, 공유 캐시에서 찾으면 LRU에도 보관
+    lru = get_lru()
+    entry = lru.get(key)
+    if entry is None:
+        try:
+            entry = shared_store().get(key)
+        except Exception as e:
+            print(f"[응답 캐시] 공유 캐시 조회 실패: {e}")
+            entry = None
+        if entry is not None:
+            lru.set(key, entry)
+    return entry
+
+
+def store(key, entry):
+    get_lru().set(key, entry)
+    try:
+        shared_store().set(key, entry)
+    except Exception as e:
+        print(f"[응답 캐시] 공유 캐시 저장 실패: {e}")
+
+
+def render_entry(view, request, *args, **kwargs):
+    # 뷰를 실행해 캐시 항목(dict)으로 변환, 200 JSON 응답이 아니면 (None, 응답)
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    content_type = response.get('Content-Type', '')
+    if response.status_code != 200 or not content_type.startswith('application/json'):
+        return None, response
+    body = response.content
+    return {'content_type': content_type, 'body': body, 'etag': make_etag(body)}, response
+
+
+def respond(request, entry, response=None):
+    # If-None-Match가 현재 ETag와 같으면 본문 없이 304
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if '*' in etags or entry['etag'] in etags:
+        response = HttpResponseNotModified()
+    elif response is None:
+        response = HttpResponse(entry['body'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    # 브라우저는 보관한 응답을 쓰기 전에 항상 ETag로 재검증 (새 스냅샷이 공개되면 바로 반영)
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def request_snapshot_id(request):
+    # 캐시 키에 사용한 공개 스냅샷 id (snapshot_cached를 거치지 않은 요청이면 지금 공개된 스냅샷)
+    snapshot_id = getattr(request, 'snapshot_id', None)
+    return snapshot_id if snapshot_id is not None else live_snapshot_id()
+
+
+def snapshot_cached(name, normalize):
+    """
+    스냅샷 버전별 응답 캐시 데코레이터 (api_view 바깥에 적용)
+    - 키: 엔드포인트 이름 + 공개 스냅샷 id + normalize(request.GET)가 반환한 조회 조건
+    - 스냅샷 id는 포인터에서 한 번만 읽어 request.snapshot_id로 뷰에 전달 (뷰는 request_snapshot_id로 같은 스냅샷을 읽음)
+    - normalize가 None을 반환(잘못된 값 등)하거나 HTML(브라우저블 API)을 원하는 요청은 캐시를 거치지 않음
+    - 200 JSON 응답만 저장하고, 모든 캐시 응답에 ETag를 붙여 If-None-Match에 304로 응답
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or 'text/html' in request.META.get('HTTP_ACCEPT', ''):
+                return view(request, *args, **kwargs)
+            params = normalize(request.GET)
+            # 다른 프로세스의 공개 감지(리스너 호출)는 주기적으로, 키에 쓸 스냅샷 id는 매 요청 포인터에서 읽음
+            poll_live_snapshot()
+            snapshot_id = live_snapshot_id()
+            if params is None or snapshot_id is None:
+                return view(request, *args, **kwargs)
+            request.snapshot_id = snapshot_id
+
+            key = cache_key(name, snapshot_id, params)
+            entry = lookup(key)
+            if entry is not None:
+                return respond(request, entry)
+            entry, response = render_entry(view, request, *args, **kwargs)
+            if entry is None:
+                return response
+            store(key, entry)
+            return respond(request, entry, response)
+
+        ENDPOINTS[name] = (wrapper, normalize)
+        return wrapper
+
+    return decorator
+
+
+def warm_requests(snapshot_id):
+    # 미리 채울 (엔드포인트, 조회 조건) 목록: 설정의 값 조합, 픽률은 전체 + 매니저가 많은 팀컬러
+    from core.stats_cube import get_cube
+    config = get_config()
+    for name, grid in config['WARM'].items():
+        grid = dict(grid)
+        if name == 'pick-rate' and 'team_color' not in grid:
+            colors = get_cube(snapshot_id).team_color_stats(10 ** 9, config['TEAM_COLORS'])
+            grid['team_color'] = [''] + [item['team_color'] for item in colors]
+        fields = list(grid)
+        for values in itertools.product(*(grid[field] for field in fields)):
+            yield name, {field: str(value) for field, value in zip(fields, values)}
+
+
+def warm(snapshot_id):
+    """
+    새 스냅샷의 주요 조회 조건 응답을 미리 만들어 LRU/공유 캐시에 저장
+    - 다른 프로세스(수집 워커 등)가 이미 공유 캐시에 넣은 응답은 읽어서 LRU에만 보관
+    """
+    import core.views  # noqa: F401 (엔드포인트 등록)
+    if live_snapshot_id() != snapshot_id:
+        # 미리 채우기 전에 다음 스냅샷이 공개된 경우 (뷰는 항상 공개 스냅샷을 읽음)
+        return
+    started = time.monotonic()
+    built = loaded = 0
+    for name, query in warm_requests(snapshot_id):
+        view, normalize = ENDPOINTS[name]
+        get = QueryDict(mutable=True)
+        get.update(query)
+        params = normalize(get)
+        if params is None:
+            continue
+        key = cache_key(name, snapshot_id, params)
+        if lookup(key) is not None:
+            loaded += 1
+            continue
+        request = HttpRequest()
+        request.method = 'GET'
+        request.GET = get
+        request.snapshot_id = snapshot_id
+        request.META.update({'HTTP_ACCEPT': 'application/json', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80'})
+        entry, _ = render_entry(view.__wrapped__, request)
+        if entry is not None:
+            store(key, entry)
+            built += 1
+    print(f"[응답 캐시] 스냅샷 #{snapshot_id} 미리 채움: 생성 {built}건, 공유 캐시 {loaded}건 ({time.monotonic() - started:.1f}s)")
+
+
+@on_publish
+def warm_on_publish(snapshot_id):
+    def run():
+        try:
+            warm(snapshot_id)
+        except Exception as e:
+            print(f"[응답 캐시] 스냅샷 #{snapshot_id} 미리 채우기 실패: {e}")
+    threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,148 @@
+import datetime
+import threading
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.metrics import RunMetrics
+
+# 체크포인트를 모아서 저장하는 단위
+FLUSH_SIZE = 200
+
+
+def new_run_id():
+    return f"{timezone.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def resume_window():
+    return datetime.timedelta(minutes=getattr(settings, 'INGEST_RESUME_WINDOW_MINUTES', 60))
+
+
+def find_resumable_run():
+    # 재개 가능 시간 안에 시작된, 끝나지 않은 가장 최근 실행
+    from core.models import IngestRun
+    return (
+        IngestRun.objects.filter(status__in=['running', 'failed'], started_at__gte=timezone.now() - resume_window())
+        .order_by('-started_at')
+        .first()
+    )
+
+
+def prune_runs(now=None):
+    """
+    오래된 실행 기록 정리 (새 실행을 시작할 때 호출)
+    - 재개 가능 시간이 지난 실패 실행은 자동으로 이어받지 않으므로 체크포인트 삭제 (실행 기록/지표는 유지)
+    - 종료 후 INGEST_RUN_RETENTION_DAYS가 지난 실행은 기록째 삭제 (진행 중인 실행은 유지)
+    반환: (체크포인트를 지운 실행 수, 삭제한 실행 수)
+    """
+    from core.models import IngestCheckpoint, IngestRun
+    now = now or timezone.now()
+    expired = IngestRun.objects.filter(status='failed', started_at__lt=now - resume_window())
+    cleared = expired.filter(checkpoints__isnull=False).distinct().count()
+    if cleared:
+        IngestCheckpoint.objects.filter(run__in=expired).delete()
+    retention = datetime.timedelta(days=getattr(settings, 'INGEST_RUN_RETENTION_DAYS', 14))
+    _, deleted = IngestRun.objects.exclude(status='running').filter(finished_at__lt=now - retention).delete()
+    return cleared, deleted.get(IngestRun._meta.label, 0)
+
+
+class RunState:
+    """
+    수집 실행(run) 단위 진행 상황 저장소
+    - 단계별 완료 단위(OUID, MATCH ID, 스쿼드)를 닉네임 기준 체크포인트로 저장
+    - 같은 run을 다시 열면 저장된 체크포인트부터 이어서 진행
+    - record()는 결과를 모으는 스레드에서 호출, DB 저장은 flush()를 호출한 스레드에서 수행
+      (이벤트 루프에서는 autoflush=False로 모은 뒤 별도 스레드에서 flush)
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self.ouids = {}
+        self.match_ids = {}
+        self.squads = {}
+        self._buffer = []
+        self._lock = threading.Lock()
+        self.metrics = RunMetrics()
+        for kind, nickname, value in run.checkpoints.values_list('kind', 'nickname', 'value'):
+            if kind == 'ouid':
+                self.ouids[nickname] = value
+            elif kind == 'match':
+                self.match_ids[nickname] = tuple(value)
+            elif kind == 'squad':
+                self.squads[nickname] = value
+
+    @classmethod
+    def open(cls, run_id=None):
+        from core.models import IngestRun
+        if run_id:
+            run = IngestRun.objects.get(run_id=run_id)
+            if run.status in ('completed', 'abandoned'):
+                raise ValueError(f"이미 종료된 실행입니다: {run_id} ({run.status})")
+        else:
+            run = find_resumable_run()
+            if run is None:
+                prune_runs()
+                run = IngestRun.objects.create(run_id=new_run_id())
+        if run.status != 'running':
+            run.status = 'running'
+            run.save(update_fields=['status', 'updated_at'])
+        return cls(run)
+
+    @staticmethod
+    def is_latest(saved):
+        # MATCH ID 체크포인트 (ouid, match_id, latest): latest는 limit=1로 받은 최신 경기 여부 (이전 형식은 모름 → False)
+        return len(saved) > 2 and bool(saved[2])
+
+    @property
+    def resumed(self):
+        return bool(self.ouids or self.match_ids or self.squads)
+
+    def set_stage(self, stage):
+        self.flush()
+        self.metrics.start_stage(stage)
+        self.run.stage = stage
+        self.run.save(update_fields=['stage', 'updated_at'])
+
+    def record(self, kind, nickname, value, autoflush=True):
+        if kind == 'ouid':
+            self.ouids[nickname] = value
+        elif kind == 'match':
+            self.match_ids[nickname] = tuple(value)
+            value = list(value)
+        elif kind == 'squad':
+            self.squads[nickname] = value
+        with self._lock:
+            self._buffer.append((kind, nickname, value))
+        if autoflush and self.pending() >= FLUSH_SIZE:
+            self.flush()
+
+    def pending(self):
+        return len(self._buffer)
+
+    def flush(self):
+        from core.models import IngestCheckpoint
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+        if not buffer:
+            return
+        IngestCheckpoint.objects.bulk_create(
+            [IngestCheckpoint(run=self.run, kind=kind, nickname=nickname, value=value) for kind, nickname, value in buffer],
+            batch_size=FLUSH_SIZE,
+            update_conflicts=True,
+            unique_fields=['run', 'kind', 'nickname'],
+            update_fields=['value'],
+        )
+        self.metrics.add_rows('ingest_checkpoint', len(buffer))
+
+    def finish(self, status, error=''):
+        # 완료된 실행은 체크포인트를 지우고 실행 기록(지표 포함)만 남김
+        self.flush()
+        self.metrics.end_stage()
+        self.run.status = status
+        self.run.error = error
+        self.run.metrics = self.metrics.snapshot()
+        self.run.finished_at = timezone.now()
+        self.run.save(update_fields=['status', 'error', 'metrics', 'finished_at', 'updated_at'])
+        if status in ('completed', 'abandoned'):
+            self.run.checkpoints.all().delete()
@@ -0,0 +1,291 @@
+import datetime
+import os
+import socket
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, connection
+from django.db.models import Q
+from django.utils import timezone
+
+# 이 프로세스의 식별자 (호스트:PID:난수, 재시작 후 같은 PID여도 구분)
+HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:4]}"
+
+# 건너뛴 예정 시각을 기록하는 최대 개수 (오래 멈췄다 돌아온 경우 기록 폭증 방지)
+MAX_MISSED = 24
+
+
+def log_with_time(msg):
+    now = datetime.datetime.now().strftime('[%Y년 %m월 %d일 %H시 %M분 %S초]')
+    print(f"{now} [스케줄러] {msg}")
+
+
+def local_now():
+    return timezone.localtime() if settings.USE_TZ else timezone.now()
+
+
+class CronSchedule:
+    """
+    5필드 cron 표현식(분 시 일 월 요일)
+    - *, 값, 범위(a-b), 목록(a,b), 간격(*/n, a-b/n, a/n) 지원, 요일은 0과 7이 일요일
+    - 일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행(cron 규칙)
+    """
+
+    FIELDS = [('분', 0, 59), ('시', 0, 23), ('일', 1, 31), ('월', 1, 12), ('요일', 0, 7)]
+
+    def __init__(self, expr):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드여야 합니다: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse(part, *field) for part, field in zip(parts, self.FIELDS)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    @staticmethod
+    def _parse(field, name, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            stepped = '/' in part
+            if stepped:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"cron {name} 간격은 1 이상이어야 합니다: {field!r}")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = int(part)
+                # a/n은 a부터 최댓값까지 간격 n (목록의 다른 항목에 붙은 간격은 무관)
+                end = high if stepped else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron {name} 범위({low}~{high})를 벗어났습니다: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        day = dt.day in self.days
+        weekday = dt.isoweekday() % 7 in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday
+        if self.any_weekday:
+            return day
+        return day or weekday
+
+    def next_after(self, dt):
+        # dt 이후 첫 실행 시각(분 단위), 맞지 않는 월/일/시는 통째로 건너뜀
+        t = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = t + datetime.timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + datetime.timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += datetime.timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"실행 시각이 없는 cron 표현식입니다: {self.expr!r}")
+
+    def between(self, start, end, limit=MAX_MISSED):
+        # start 이후 end 이전(포함) 예정 시각 목록
+        times = []
+        t = self.next_after(start)
+        while t <= end and len(times) < limit:
+            times.append(t)
+            t = self.next_after(t)
+        return times
+
+
+class LeaderLease:
+    """
+    DB 행 하나로 구현한 리더 임대
+    - 만료되었거나 비어 있을 때만 조건부 UPDATE로 가져가므로 여러 프로세스 중 하나만 성공
+    - 리더는 만료 전에 acquire()를 다시 호출해 연장, 갱신이 끊기면 다른 프로세스가 가져감
+    """
+
+    def __init__(self, name, seconds, holder=HOLDER):
+        self.name = name
+        self.seconds = seconds
+        self.holder = holder
+
+    def acquire(self):
+        from core.models import SchedulerLease
+        now = timezone.now()
+        expires_at = now + datetime.timedelta(seconds=self.seconds)
+        leases = SchedulerLease.objects.filter(name=self.name)
+        if leases.filter(holder=self.holder).update(expires_at=expires_at):
+            return True
+        if not leases.exists():
+            try:
+                SchedulerLease.objects.create(name=self.name)
+            except IntegrityError:
+                pass
+        return bool(
+            leases.filter(Q(expires_at__isnull=True) | Q(expires_at__lt=now))
+            .update(holder=self.holder, acquired_at=now, expires_at=expires_at)
+        )
+
+    def release(self):
+        from core.models import SchedulerLease
+        SchedulerLease.objects.filter(name=self.name, holder=self.holder).update(holder='', expires_at=None)
+
+
+class Scheduler:
+    """
+    cron 일정으로 작업 하나를 실행하는 단일 리더 스케줄러
+    - 여러 프로세스에서 실행해도 임대(SchedulerLease)를 가진 프로세스만 작업 실행, 나머지는 대기하며 임대 만료 감시
+    - 실행 중에는 heartbeat 스레드가 임대와 JobRun.heartbeat_at을 갱신
+    - 실행이 다음 예정 시각을 넘기면 overlap 정책에 따라 건너뛰거나(skip) 끝난 뒤 한 번만 이어서 실행(queue)
+    - 모든 실행(건너뜀 포함)은 JobRun으로 기록
+    """
+
+    def __init__(self, name, job, cron=None, overlap=None, lease_seconds=None, poll_seconds=None, startup_job=None):
+        conf = getattr(settings, 'CRAWL_SCHEDULER', {})
+        self.name = name
+        self.job = job
+        self.cron = CronSchedule(cron or conf.get('CRON', '10 * * * *'))
+        self.overlap = overlap or conf.get('OVERLAP', 'skip')
+        if self.overlap not in ('skip', 'queue'):
+            raise ValueError(f"알 수 없는 overlap 정책: {self.overlap}")
+        self.lease = LeaderLease(name, lease_seconds or conf.get('LEASE_SECONDS', 120))
+        self.poll_seconds = poll_seconds or conf.get('POLL_SECONDS', 30)
+        self.startup_job = startup_job
+        self.stop_event = threading.Event()
+        self.is_leader = False
+
+    def run_forever(self):
+        log_with_time(f"{self.name} 시작 (일정: {self.cron.expr}, 중복 실행: {self.overlap}, 프로세스: {self.lease.holder})")
+        next_run = self.cron.next_after(local_now())
+        startup_job = self.startup_job
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self._set_leader(self.lease.acquire())
+                    if self.is_leader and startup_job is not None:
+                        # 리더가 된 첫 프로세스만 시작 시 작업 실행 (데이터 최신성 확인 등)
+                        self.run_job(f"{self.name}:startup", startup_job, None)
+                        startup_job = None
+                    now = local_now()
+                    if now >= next_run:
+                        next_run = self._run_due(next_run) if self.is_leader else self.cron.next_after(now)
+                        continue
+                    wait = min(self.poll_seconds, (next_run - now).total_seconds())
+                except Exception as e:
+                    log_with_time(f"{self.name} 오류: {e}")
+                    wait = self.poll_seconds
+                self.stop_event.wait(max(wait, 0.1))
+        finally:
+            if self.is_leader:
+                self.lease.release()
+            connection.close()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_once(self):
+        # 일정과 무관하게 한 번 실행 (수동 실행), 리더와 같은 임대를 잡고 살아 있는 실행이 없을 때만 실행
+        if not self.lease.acquire():
+            log_with_time(f"{self.name} 다른 프로세스가 리더 → 실행 안 함")
+            return None
+        try:
+            active = self._active_run()
+            if active is not None:
+                log_with_time(f"{self.name} 실행 #{active.pk}({active.holder}) 진행 중 → 실행 안 함")
+                return None
+            return self.run_job(self.name, self.job, None)
+        finally:
+            self.lease.release()
+
+    def _set_leader(self, is_leader):
+        if is_leader != self.is_leader:
+            log_with_time(f"{self.name} 리더 {'획득' if is_leader else '상실'} ({self.lease.holder})")
+        self.is_leader = is_leader
+
+    def _run_due(self, due):
+        # 다른 프로세스(이전 리더)의 실행이 아직 살아 있으면 overlap 정책 적용
+        active = self._active_run()
+        if active is not None:
+            if self.overlap == 'queue':
+                return local_now() + datetime.timedelta(seconds=self.poll_seconds)
+            self._record_skipped([due], f"실행 #{active.pk}({active.holder}) 진행 중")
+            return self.cron.next_after(local_now())
+
+        self.run_job(self.name, self.job, due)
+        finished = local_now()
+        missed = self.cron.between(due, finished)
+        if not missed:
+            return self.cron.next_after(finished)
+        if self.overlap == 'queue':
+            # 밀린 예정 시각은 한 번으로 합쳐 바로 실행
+            self._record_skipped(missed[:-1], "이전 실행이 끝나지 않아 다음 실행으로 합침")
+            return missed[-1]
+        self._record_skipped(missed, "이전 실행이 끝나지 않음")
+        return self.cron.next_after(finished)
+
+    def _active_run(self):
+        # 실행 중으로 남은 기록 중 heartbeat가 끊긴 것은 중단 처리, 살아 있는 실행이 있으면 반환
+        from core.models import JobRun
+        threshold = timezone.now() - datetime.timedelta(seconds=self.lease.seconds)
+        runs = JobRun.objects.filter(job=self.name, status='running')
+        runs.filter(Q(heartbeat_at__isnull=True) | Q(heartbeat_at__lt=threshold)).update(
+            status='abandoned', finished_at=timezone.now(), message="heartbeat 끊김 (프로세스 종료 추정)"
+        )
+        return runs.order_by('-started_at').first()
+
+    def _record_skipped(self, times, reason):
+        from core.models import JobRun
+        if not times:
+            return
+        now = timezone.now()
+        JobRun.objects.bulk_create([
+            JobRun(job=self.name, status='skipped', holder=self.lease.holder, scheduled_for=t,
+                   started_at=now, finished_at=now, message=reason)
+            for t in times
+        ])
+        log_with_time(f"{self.name} {len(times)}회 건너뜀 ({reason})")
+
+    def _heartbeat(self, run_pk, stop):
+        from core.models import JobRun
+        interval = max(self.lease.seconds / 3, 1)
+        try:
+            while not stop.wait(interval):
+                if not self.lease.acquire():
+                    log_with_time(f"{self.name} 실행 중 임대 갱신 실패 (다른 프로세스가 리더)")
+                JobRun.objects.filter(pk=run_pk).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    def run_job(self, name, func, scheduled_for):
+        from core.models import JobRun
+        now = timezone.now()
+        run = JobRun.objects.create(
+            job=name, holder=self.lease.holder, scheduled_for=scheduled_for, started_at=now, heartbeat_at=now
+        )
+        log_with_time(f"{name} 실행 #{run.pk} 시작" + (f" (예정 {scheduled_for:%H:%M})" if scheduled_for else ""))
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(run.pk, stop), daemon=True)
+        heartbeat.start()
+        status, message = 'succeeded', ''
+        try:
+            if func() is False:
+                status, message = 'failed', "작업이 실패를 반환"
+        except Exception as e:
+            status, message = 'failed', str(e)
+        finally:
+            stop.set()
+            heartbeat.join()
+        JobRun.objects.filter(pk=run.pk).update(status=status, finished_at=timezone.now(), message=message)
+        log_with_time(f"{name} 실행 #{run.pk} {'성공' if status == 'succeeded' else '실패'}" + (f": {message}" if message else ""))
+        return status
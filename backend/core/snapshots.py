@@ -0,0 +1,273 @@
+import datetime
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# 조회 API가 읽는 스냅샷 포인터 이름
+LIVE = 'live'
+
+# 일괄 저장 단위
+BATCH_SIZE = 2000
+
+# 새 스냅샷 공개 시 호출할 함수(웹 프로세스의 캐시 초기화 등)와 마지막 확인 상태
+_listeners = []
+_watch = {'checked': None, 'snapshot_id': None}
+_watch_lock = threading.Lock()
+
+
+def live_snapshot():
+    # 현재 공개된 스냅샷 (포인터 한 행 + 스냅샷 한 행 조회)
+    from core.models import SnapshotPointer
+    pointer = SnapshotPointer.objects.select_related('snapshot').filter(name=LIVE).first()
+    return pointer.snapshot if pointer else None
+
+
+def latest_ingested_snapshot():
+    # 선수 수집으로 공개된 가장 최근 스냅샷 (순위 갱신 스냅샷 제외, 수집 주기 판단용)
+    from core.models import Snapshot
+    return (
+        Snapshot.objects.filter(source='ingest', status__in=['live', 'retired'], published_at__isnull=False)
+        .order_by('-published_at').first()
+    )
+
+
+def live_snapshot_id():
+    from core.models import SnapshotPointer
+    return SnapshotPointer.objects.filter(name=LIVE).values_list('snapshot_id', flat=True).first()
+
+
+def live_managers():
+    # 현재 공개된 스냅샷의 매니저 (공개된 스냅샷이 없으면 빈 쿼리셋)
+    from core.models import Manager
+    snapshot_id = live_snapshot_id()
+    if snapshot_id is None:
+        return Manager.objects.none()
+    return Manager.objects.filter(snapshot_id=snapshot_id)
+
+
+def live_players():
+    from core.models import Player
+    snapshot_id = live_snapshot_id()
+    if snapshot_id is None:
+        return Player.objects.none()
+    return Player.objects.filter(snapshot_id=snapshot_id)
+
+
+def create_snapshot(managers=()):
+    # 새 스냅샷을 만들고 매니저 목록(dict)을 한 번에 저장, 공개 전까지 조회 API에는 보이지 않음
+    from core.models import Manager, Snapshot
+    objects = [Manager(**m) for m in managers]
+    with transaction.atomic():
+        snapshot = Snapshot.objects.create(manager_count=len(objects))
+        for obj in objects:
+            obj.snapshot = snapshot
+        Manager.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return snapshot
+
+
+def pending_snapshot():
+    # 공개된 스냅샷보다 새로 만들어졌지만 아직 공개되지 않은 스냅샷 (선수 수집이 끝나지 않은 크롤링 결과)
+    from core.models import Snapshot
+    qs = Snapshot.objects.filter(status__in=['building', 'failed'], manager_count__gt=0).order_by('-pk')
+    live_id = live_snapshot_id()
+    if live_id is not None:
+        qs = qs.filter(pk__gt=live_id)
+    return qs.first()
+
+
+def snapshot_for_ingest():
+    # 선수 수집 대상 스냅샷: 공개 대기 중인 스냅샷이 있으면 이어서 사용, 없으면 공개 스냅샷의 매니저로 새로 생성
+    snapshot = pending_snapshot()
+    if snapshot is not None:
+        if snapshot.status != 'building':
+            snapshot.status = 'building'
+            snapshot.save(update_fields=['status'])
+        return snapshot
+    fields = ('rank', 'nickname', 'club_value', 'team_color', 'formation', 'score')
+    return create_snapshot(live_managers().order_by('rank').values(*fields))
+
+
+def copy_snapshot(base_id, updates, source='rank_refresh', drop=()):
+    """
+    스냅샷 base_id의 매니저/선수 행을 새 스냅샷으로 복사 (공개된 스냅샷은 수정하지 않음)
+    - updates: {원본 매니저 pk: {필드: 값}}, 복사하면서 매니저 필드를 바꾸고 선수 행의 rank/team_color도 맞춤
+    - drop: 복사하지 않을 원본 매니저 pk (선수 행도 제외)
+    - 반환: (새 스냅샷, 선수 행 수), 공개는 호출자가 publish()로
+    """
+    from core.models import Manager, Player, Snapshot
+    fields = ('rank', 'nickname', 'club_value', 'team_color', 'formation', 'score')
+    rows = list(Manager.objects.filter(snapshot_id=base_id).exclude(pk__in=drop).order_by('pk').values('pk', *fields))
+    with transaction.atomic():
+        snapshot = Snapshot.objects.create(manager_count=len(rows), source=source)
+        managers = Manager.objects.bulk_create(
+            [Manager(snapshot=snapshot, **{**row, 'pk': None, **updates.get(row['pk'], {})}) for row in rows],
+            batch_size=BATCH_SIZE,
+        )
+        copied = {row['pk']: manager for row, manager in zip(rows, managers)}
+        players = (
+            Player.objects.filter(snapshot_id=base_id).exclude(manager_id__in=drop).order_by('pk')
+            .values_list('manager_id', 'nickname', 'position', 'player_name', 'season', 'grade')
+            .iterator(chunk_size=BATCH_SIZE)
+        )
+        batch = []
+        count = 0
+        for manager_id, nickname, position, player_name, season, grade in players:
+            manager = copied[manager_id]
+            batch.append(Player(
+                snapshot=snapshot, manager=manager, rank=manager.rank, nickname=nickname,
+                team_color=manager.team_color, position=position, player_name=player_name, season=season, grade=grade,
+            ))
+            if len(batch) >= BATCH_SIZE:
+                Player.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        Player.objects.bulk_create(batch)
+        count += len(batch)
+    return snapshot, count
+
+
+def mark_failed(snapshot):
+    snapshot.status = 'failed'
+    snapshot.save(update_fields=['status'])
+
+
+def publish(snapshot, player_count):
+    # 포인터 한 행만 바꿔 새 스냅샷을 공개하고 보관 기간이 지난 세대 정리
+    from core.models import Snapshot, SnapshotPointer
+    with transaction.atomic():
+        pointer, _ = SnapshotPointer.objects.select_for_update().get_or_create(name=LIVE)
+        previous_id = pointer.snapshot_id
+        snapshot.status = 'live'
+        snapshot.published_at = timezone.now()
+        snapshot.player_count = player_count
+        snapshot.save(update_fields=['status', 'published_at', 'player_count'])
+        if previous_id is not None and previous_id != snapshot.pk:
+            Snapshot.objects.filter(pk=previous_id).update(status='retired')
+        pointer.snapshot = snapshot
+        pointer.save(update_fields=['snapshot'])
+    _notify(snapshot.pk)
+    # 추이 조회용 집계 행은 원본 선수 행이 정리되기 전에 공개한 프로세스에서 한 번만 저장
+    # (순위 갱신 스냅샷은 스쿼드가 이전 수집 그대로라 같은 데이터의 시점이 중복되므로 제외)
+    if snapshot.source != 'rank_refresh':
+        from core.trends import record
+        record(snapshot)
+    # 포인터는 이미 바뀌었으므로 정리 실패(database is locked 등)가 수집 재시도로 이어지지 않게 여기서 처리
+    # (남은 스냅샷은 다음 공개나 `snapshots prune`에서 정리)
+    try:
+        prune_snapshots()
+    except Exception as e:
+        print(f"[DB] 스냅샷 #{snapshot.pk} 공개 후 정리 실패: {e}")
+    return previous_id
+
+
+def on_publish(callback):
+    # 공개 스냅샷이 바뀌면 callback(snapshot_id) 호출 (같은 프로세스의 publish 또는 poll_live_snapshot에서 감지)
+    _listeners.append(callback)
+    return callback
+
+
+def _notify(snapshot_id):
+    with _watch_lock:
+        if _watch['snapshot_id'] == snapshot_id:
+            return
+        _watch['snapshot_id'] = snapshot_id
+    for callback in list(_listeners):
+        try:
+            callback(snapshot_id)
+        except Exception as e:
+            print(f"[DB] 스냅샷 공개 알림 처리 실패: {e}")
+
+
+def poll_live_snapshot(interval=None):
+    """
+    다른 프로세스(수집 워커)가 공개한 스냅샷 감지
+    - 마지막 확인 후 interval초(SNAPSHOT_POLL_SECONDS)가 지났을 때만 포인터 한 행을 읽음
+    - 처음 확인한 스냅샷은 기준값으로만 기억하고, 이후 바뀌면 on_publish 리스너 호출
+    """
+    if interval is None:
+        interval = getattr(settings, 'SNAPSHOT_POLL_SECONDS', 5)
+    now = time.monotonic()
+    with _watch_lock:
+        first = _watch['checked'] is None
+        if not first and now - _watch['checked'] < interval:
+            return _watch['snapshot_id']
+        _watch['checked'] = now
+    snapshot_id = live_snapshot_id()
+    if first:
+        with _watch_lock:
+            _watch['snapshot_id'] = snapshot_id
+    elif snapshot_id is not None:
+        _notify(snapshot_id)
+    return snapshot_id
+
+
+class SnapshotLocal:
+    """
+    스냅샷마다 한 번 만드는 읽기 전용 데이터 (픽률 색인, 통계 큐브 등), 최신 스냅샷 것 하나만 보관
+    - 새 스냅샷 공개가 감지되면 백그라운드 스레드에서 미리 생성
+    - 아직 없으면 처음 요청한 스레드가 생성하고 같은 스냅샷을 요청한 다른 스레드는 대기
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self.current = (None, None)  # (스냅샷 id, 데이터), 한 번에 교체
+        self.lock = threading.Lock()
+        on_publish(self.warm)
+
+    def get(self, snapshot_id):
+        current_id, value = self.current
+        if value is not None and current_id == snapshot_id:
+            return value
+        with self.lock:
+            current_id, value = self.current
+            if value is None or current_id != snapshot_id:
+                value = self.build(snapshot_id)
+                self.current = (snapshot_id, value)
+            return value
+
+    def warm(self, snapshot_id):
+        def build():
+            try:
+                self.get(snapshot_id)
+            except Exception as e:
+                print(f"[DB] 스냅샷 #{snapshot_id} {self.name} 생성 실패: {e}")
+        threading.Thread(target=build, daemon=True).start()
+
+
+def prune_snapshots(retention_hours=None):
+    """
+    보관 기간이 지난 스냅샷을 스냅샷 id 기준으로 일괄 삭제
+    - 공개 스냅샷과 직전 공개 스냅샷(교체 순간 읽고 있던 요청용)은 항상 유지
+    - 공개/수집 시작 시각이 보관 기간 안이면 유지
+    """
+    from core.models import Manager, Player, Snapshot
+    if retention_hours is None:
+        retention_hours = getattr(settings, 'SNAPSHOT_RETENTION_HOURS', 24)
+    cutoff = timezone.now() - datetime.timedelta(hours=retention_hours)
+    live_id = live_snapshot_id()
+    keep = set()
+    if live_id is not None:
+        keep.add(live_id)
+        previous_id = (
+            Snapshot.objects.filter(status='retired', pk__lt=live_id)
+            .order_by('-pk').values_list('pk', flat=True).first()
+        )
+        if previous_id is not None:
+            keep.add(previous_id)
+    expired = [
+        pk for pk, started_at, published_at in Snapshot.objects.values_list('pk', 'started_at', 'published_at')
+        if pk not in keep and (published_at or started_at) < cutoff
+    ]
+    if not expired:
+        return []
+    # 행 단위로 모델을 읽지 않도록 snapshot_id 인덱스로 바로 삭제 (선수 → 매니저 → 스냅샷 순서)
+    placeholders = ', '.join(['%s'] * len(expired))
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in (Player, Manager):
+            cursor.execute(f"DELETE FROM {model._meta.db_table} WHERE snapshot_id IN ({placeholders})", expired)
+        Snapshot.objects.filter(pk__in=expired).delete()
+    return expired
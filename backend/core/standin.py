@@ -0,0 +1,365 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+
+# 랭킹 페이지당 매니저 수
+PAGE_SIZE = 20
+
+# 선수 포지션 메타(spposition.json과 같은 형식)
+POSITIONS = [
+    'GK', 'SW', 'RWB', 'RB', 'RCB', 'CB', 'LCB', 'LB', 'LWB', 'RDM', 'CDM', 'LDM', 'RM', 'RCM', 'CM',
+    'LCM', 'LM', 'RAM', 'CAM', 'LAM', 'RF', 'CF', 'LF', 'RW', 'RS', 'ST', 'LS', 'LW', 'SUB',
+]
+
+# 포메이션별 선발 11명 포지션
+FORMATIONS = {
+    '4-2-3-1': [0, 3, 4, 6, 7, 9, 11, 12, 18, 16, 25],
+    '4-3-3': [0, 3, 4, 6, 7, 13, 14, 15, 23, 25, 27],
+    '4-4-2': [0, 3, 4, 6, 7, 12, 13, 15, 16, 24, 26],
+    '3-4-3': [0, 4, 5, 6, 12, 13, 15, 16, 23, 25, 27],
+    '4-1-2-1-2': [0, 3, 4, 6, 7, 10, 13, 15, 18, 24, 26],
+}
+
+TEAM_COLORS = ['리버풀', '레알 마드리드', '맨체스터 시티', '바르셀로나', 'FC 바이에른 뮌헨', '아스널', '유벤투스', '첼시']
+
+# 매니저당 보관하는 최근 경기 수(/user/match limit 최대값)
+MATCHES_PER_MANAGER = 4
+
+# 매치 디테일의 교체 선수 수(실제 응답처럼 선발 11명 뒤에 SUB 포지션으로 포함)
+SUBSTITUTES = 7
+
+# 실제 매치 디테일과 같은 스탯 필드(응답 크기/해석 비용을 실제와 비슷하게 맞추기 위해 포함)
+PLAYER_STATUS_FIELDS = [
+    'shoot', 'effectiveShoot', 'assist', 'goal', 'dribble', 'intercept', 'defending', 'passTry', 'passSuccess',
+    'dribbleTry', 'dribbleSuccess', 'ballPossesionTry', 'ballPossesionSuccess', 'aerialTry', 'aerialSuccess',
+    'blockTry', 'block', 'tackleTry', 'tackle', 'yellowCards', 'redCards',
+]
+SHOOT_FIELDS = [
+    'shootTotal', 'effectiveShootTotal', 'shootOutScore', 'goalTotal', 'goalTotalDisplay', 'ownGoal', 'shootHeading',
+    'goalHeading', 'shootFreekick', 'goalFreekick', 'shootInPenalty', 'goalInPenalty', 'shootOutPenalty',
+    'goalOutPenalty', 'shootPenaltyKick', 'goalPenaltyKick',
+]
+PASS_FIELDS = [
+    'passTry', 'passSuccess', 'shortPassTry', 'shortPassSuccess', 'longPassTry', 'longPassSuccess', 'bouncingLobPassTry',
+    'bouncingLobPassSuccess', 'drivenGroundPassTry', 'drivenGroundPassSuccess', 'throughPassTry', 'throughPassSuccess',
+    'lobbedThroughPassTry', 'lobbedThroughPassSuccess',
+]
+DEFENCE_FIELDS = ['blockTry', 'blockSuccess', 'tackleTry', 'tackleSuccess']
+
+
+def format_club_value(value):
+    # 랭킹 페이지 구단 가치 표기: 1234567890000 -> '1조 2345억 6789만'
+    parts = []
+    for unit, size in (('경', 10**16), ('조', 10**12), ('억', 10**8), ('만', 10**4)):
+        if value >= size:
+            parts.append(f"{value // size:,}{unit}")
+            value %= size
+    return ' '.join(parts) or '0'
+
+
+def default_meta_dir():
+    return Path(settings.BASE_DIR).parent / 'frontend' / 'public' / 'fconline' / 'meta'
+
+
+class StandinData:
+    """
+    대체 서버가 응답할 데이터(시드 기반으로 항상 같은 결과 생성)
+    - 매니저: 순위, 닉네임, OUID, 최근 경기 목록
+    - 경기: 인접한 두 매니저가 같은 경기를 공유(실제처럼 한 매치 디테일에 양쪽 스쿼드)
+    - 메타데이터: META_DIR의 spid.json/seasonid.json(없으면 생성), spposition은 고정 표
+    """
+
+    def __init__(self, managers=10000, seed=1, meta_dir=None):
+        self.seed = seed
+        self.meta = self._load_meta(Path(meta_dir) if meta_dir else default_meta_dir())
+        self.spids = [item['id'] for item in self.meta['spid.json']] or [101000001]
+        rnd = random.Random(seed)
+        self.managers = []
+        self.by_nickname = {}
+        self.by_ouid = {}
+        for rank in range(1, managers + 1):
+            nickname = f"매니저{rank:05d}"
+            ouid = hashlib.md5(f"{seed}:{nickname}".encode()).hexdigest()
+            formation = rnd.choice(list(FORMATIONS))
+            manager = {
+                'rank': rank,
+                'nickname': nickname,
+                'ouid': ouid,
+                'club_value': rnd.randint(10**12, 5 * 10**13) // 10**4 * 10**4,
+                'team_color': rnd.choice(TEAM_COLORS),
+                'formation': formation,
+                'score': max(1000, 4000 - rank // 5),
+            }
+            self.managers.append(manager)
+            self.by_nickname[nickname] = manager
+            self.by_ouid[ouid] = manager
+        # 선수 스탯/슈팅 기록은 미리 만든 묶음에서 골라 씀 (요청마다 난수를 만들지 않도록)
+        self.player_stats = [
+            dict({field: rnd.randint(0, 12) for field in PLAYER_STATUS_FIELDS}, spRating=round(rnd.uniform(5, 10), 1))
+            for _ in range(64)
+        ]
+        self.team_stats = [self._team_stats(rnd) for _ in range(16)]
+        # 경기 i번째는 (2k, 2k+1)번 매니저가 함께 치른 경기
+        self.matches = {}
+        for idx, manager in enumerate(self.managers):
+            pair = idx ^ 1 if (idx ^ 1) < len(self.managers) else idx
+            low, high = min(idx, pair), max(idx, pair)
+            manager['matches'] = []
+            for n in range(MATCHES_PER_MANAGER):
+                match_id = f"{seed:02x}{n:02x}{low:08x}{high:08x}"
+                manager['matches'].append(match_id)
+                self.matches[match_id] = (low, high)
+
+    def _load_meta(self, meta_dir):
+        meta = {}
+        for name in ('spid.json', 'seasonid.json'):
+            try:
+                with open(meta_dir / name, 'r', encoding='utf-8') as f:
+                    meta[name] = json.load(f)
+            except (OSError, ValueError):
+                meta[name] = []
+        if not meta['seasonid.json']:
+            meta['seasonid.json'] = [{'seasonId': 101, 'className': 'ICON (ICON)', 'seasonImg': ''}]
+        if not meta['spid.json']:
+            meta['spid.json'] = [{'id': 101000000 + i, 'name': f"선수{i}"} for i in range(1, 1001)]
+        meta['spposition.json'] = [{'spposition': idx, 'desc': desc} for idx, desc in enumerate(POSITIONS)]
+        return meta
+
+    def _team_stats(self, rnd):
+        return {
+            'matchDetail': {
+                'seasonId': 0, 'matchResult': rnd.choice(['승', '무', '패']), 'matchEndType': 0, 'systemPause': 0,
+                'foul': rnd.randint(0, 5), 'injury': 0, 'redCards': 0, 'yellowCards': rnd.randint(0, 3),
+                'dribble': rnd.randint(0, 30), 'cornerKick': rnd.randint(0, 8), 'possession': rnd.randint(30, 70),
+                'OffsideCount': rnd.randint(0, 3), 'averageRating': round(rnd.uniform(5, 9), 4), 'controller': 'keyboard',
+            },
+            'shoot': {field: rnd.randint(0, 15) for field in SHOOT_FIELDS},
+            'pass': {field: rnd.randint(0, 300) for field in PASS_FIELDS},
+            'defence': {field: rnd.randint(0, 20) for field in DEFENCE_FIELDS},
+            'shootDetail': [
+                {
+                    'goalTime': rnd.randint(0, 6000), 'x': rnd.random(), 'y': rnd.random(), 'type': rnd.randint(1, 12),
+                    'result': rnd.randint(1, 3), 'spId': 101000001, 'spGrade': rnd.randint(1, 10),
+                    'spLevel': rnd.randint(1, 5), 'spIdType': False, 'assist': rnd.random() < 0.5,
+                    'assistSpId': 101000002, 'assistX': rnd.random(), 'assistY': rnd.random(),
+                    'hitPost': False, 'inPenalty': rnd.random() < 0.5,
+                }
+                for _ in range(rnd.randint(8, 20))
+            ],
+        }
+
+    def squad(self, manager, match_id):
+        # 경기/매니저별로 고정된 선발 11명 + 교체 선수(SUB), 선수마다 실제와 같은 스탯 블록 포함
+        rnd = random.Random(f"{match_id}:{manager['ouid']}")
+        positions = FORMATIONS[manager['formation']] + [len(POSITIONS) - 1] * SUBSTITUTES
+        return [
+            {
+                'spId': rnd.choice(self.spids),
+                'spPosition': position,
+                'spGrade': rnd.randint(1, 10),
+                'status': rnd.choice(self.player_stats),
+            }
+            for position in positions
+        ]
+
+    def match_detail(self, match_id):
+        pair = self.matches.get(match_id)
+        if pair is None:
+            return None
+        info = []
+        for idx in sorted(set(pair)):
+            manager = self.managers[idx]
+            team = self.team_stats[(idx + len(match_id)) % len(self.team_stats)]
+            info.append({
+                'ouid': manager['ouid'],
+                'nickname': manager['nickname'],
+                **team,
+                'player': self.squad(manager, match_id),
+            })
+        return {'matchId': match_id, 'matchDate': '2025-01-01T00:00:00', 'matchType': 52, 'matchInfo': info}
+
+    def rank_page(self, page):
+        start = (page - 1) * PAGE_SIZE
+        rows = []
+        for manager in self.managers[start:start + PAGE_SIZE]:
+            # 일부 행은 alt 없이 '조/억/만' 표기만 제공(파서의 단위 변환 경로 확인용)
+            price_alt = f' alt="{manager["club_value"]}"' if manager['rank'] % 3 else ''
+            rows.append(
+                '<div class="tr">'
+                f'<div class="td rank_no">{manager["rank"]}</div>'
+                f'<div class="td rank_coach"><span class="name profile_pointer">{manager["nickname"]}</span></div>'
+                f'<div class="td price"{price_alt}>{format_club_value(manager["club_value"])}</div>'
+                f'<div class="td rank_r_win_point">{manager["score"]}.00</div>'
+                f'<div class="td team_color">{manager["team_color"]} (11명)</div>'
+                f'<div class="td formation">{manager["formation"]}</div>'
+                '</div>'
+            )
+        return f'<div class="rank_list"><div class="tbody">{"".join(rows)}</div></div>'
+
+
+class LatencyModel:
+    # 응답 지연 분포: fixed(고정), uniform(0~2배), lognormal(중앙값 기준 꼬리가 긴 분포)
+    def __init__(self, median_ms=30, dist='lognormal', sigma=0.5):
+        self.median = median_ms / 1000
+        self.dist = dist
+        self.sigma = sigma
+
+    def sample(self, rnd):
+        if self.median <= 0:
+            return 0.0
+        if self.dist == 'fixed':
+            return self.median
+        if self.dist == 'uniform':
+            return rnd.uniform(0, 2 * self.median)
+        return rnd.lognormvariate(math.log(self.median), self.sigma)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Nexon Open API/홈페이지 대체 서버(로컬 벤치마크, 회귀 확인용)
+    - /fconline/v1/id, /fconline/v1/user/match, /fconline/v1/match-detail
+    - /datacenter/rank_inner (랭킹 HTML), /static/fconline/meta/*.json
+    - 응답 지연 분포, 429 비율, 5xx 비율, 키별 초당 요청 제한 주입
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, data, latency=None, throttle_rate=0.0, error_rate=0.0, key_rate=0):
+        super().__init__(address, StandinHandler)
+        self.data = data
+        self.latency = latency or LatencyModel()
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.key_rate = key_rate
+        self._lock = threading.Lock()
+        self._key_windows = {}
+        self.counts = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, endpoint, status):
+        with self._lock:
+            key = (endpoint, status)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def over_key_rate(self, api_key):
+        # 키별 1초 구간 요청 수 제한(실제 API의 키당 초당 제한 흉내)
+        if not self.key_rate or not api_key:
+            return False
+        now = int(time.time())
+        with self._lock:
+            window, used = self._key_windows.get(api_key, (now, 0))
+            if window != now:
+                window, used = now, 0
+            used += 1
+            self._key_windows[api_key] = (window, used)
+            return used > self.key_rate
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json; charset=utf-8', headers=None):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8') if isinstance(body, str) else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        extra = ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        # 헤더와 본문을 한 번에 써서 keep-alive 연결의 지연 ACK 대기 방지
+        head = (
+            f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{extra}"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode('latin-1')
+        self.wfile.write(head + body)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        path = parts.path
+        rnd = random.Random()
+        endpoint = path.rsplit('/', 1)[-1]
+
+        if path.startswith('/static/fconline/meta/'):
+            name = path.rsplit('/', 1)[-1]
+            if name not in server.data.meta:
+                server.count(endpoint, 404)
+                return self._send(404, {'error': {'name': 'OPENAPI00004', 'message': 'Not Found'}})
+            # 실제 정적 파일 서버처럼 ETag를 주고 If-None-Match가 같으면 304(본문 없음)
+            body = json.dumps(server.data.meta[name], ensure_ascii=False).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if self.headers.get('If-None-Match') == etag:
+                server.count(endpoint, 304)
+                return self._send(304, b'', headers={'ETag': etag})
+            server.count(endpoint, 200)
+            return self._send(200, body, headers={'ETag': etag})
+
+        time.sleep(server.latency.sample(rnd))
+        api_key = self.headers.get('x-nxopen-api-key', '')
+        if server.over_key_rate(api_key) or rnd.random() < server.throttle_rate:
+            server.count(endpoint, 429)
+            return self._send(429, {'error': {'name': 'OPENAPI00007', 'message': 'Too Many Requests'}})
+        if rnd.random() < server.error_rate:
+            server.count(endpoint, 500)
+            return self._send(500, {'error': {'name': 'OPENAPI00003', 'message': 'Internal Server Error'}})
+
+        data = server.data
+        if path == '/fconline/v1/id':
+            manager = data.by_nickname.get(query.get('nickname', ''))
+            if manager is None:
+                server.count(endpoint, 400)
+                return self._send(400, {'error': {'name': 'OPENAPI00004', 'message': 'Invalid nickname'}})
+            server.count(endpoint, 200)
+            return self._send(200, {'ouid': manager['ouid']})
+
+        if path == '/fconline/v1/user/match':
+            manager = data.by_ouid.get(query.get('ouid', ''))
+            offset = int(query.get('offset', 0) or 0)
+            limit = int(query.get('limit', 1) or 1)
+            matches = manager['matches'][offset:offset + limit] if manager else []
+            server.count(endpoint, 200)
+            return self._send(200, matches)
+
+        if path == '/fconline/v1/match-detail':
+            detail = data.match_detail(query.get('matchid', ''))
+            if detail is None:
+                server.count(endpoint, 400)
+                return self._send(400, {'error': {'name': 'OPENAPI00004', 'message': 'Invalid matchid'}})
+            server.count(endpoint, 200)
+            return self._send(200, detail)
+
+        if path == '/datacenter/rank_inner':
+            page = int(query.get('n4pageno', 1) or 1)
+            server.count(endpoint, 200)
+            return self._send(200, data.rank_page(page), 'text/html; charset=utf-8')
+
+        server.count(endpoint, 404)
+        return self._send(404, {'error': {'name': 'OPENAPI00004', 'message': 'Not Found'}})
+
+
+def start_standin(host='127.0.0.1', port=0, managers=10000, seed=1, meta_dir=None, **options):
+    # 백그라운드 스레드로 대체 서버 시작 (port=0이면 빈 포트 자동 배정)
+    server = StandinServer((host, port), StandinData(managers=managers, seed=seed, meta_dir=meta_dir), **options)
+    server.start()
+    return server
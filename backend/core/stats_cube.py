@@ -0,0 +1,227 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from core.snapshots import SnapshotLocal
+
+# 등수 구간 크기: rank_range가 (배수 - 1)까지는 누적 큐브만으로, 아니면 마지막 구간 매니저만 더해서 응답
+RANK_BUCKET = 100
+
+# 통계 항목 (Manager 필드)
+MEASURES = ('rank', 'score', 'club_value')
+
+# 포메이션별로 보관하는 상위 등수 닉네임 수
+TOP_USERS = 3
+
+EMPTY_STATS = {'avg': None, 'min': None, 'max': None, 'min_nickname': None, 'max_nickname': None}
+
+
+class Cell:
+    """
+    큐브 한 칸 (팀컬러 x 포메이션)의 집계
+    - 항목별 합계/최솟값/최댓값, 최솟값/최댓값 매니저 닉네임 (같은 값이면 먼저 저장된 매니저, 기존 .first()와 같음)
+    - 등수 순 앞의 매니저 TOP_USERS명 (포메이션 top_users)
+    """
+    __slots__ = ('count', 'sums', 'mins', 'maxs', 'users')
+
+    def __init__(self):
+        self.count = 0
+        self.sums = [0] * len(MEASURES)
+        self.mins = [None] * len(MEASURES)  # (값, 행 번호, 닉네임)
+        self.maxs = [None] * len(MEASURES)  # (값, -행 번호, 닉네임)
+        self.users = []  # (등수, 행 번호, 닉네임)
+
+    def copy(self):
+        cell = Cell()
+        cell.count = self.count
+        cell.sums = self.sums[:]
+        cell.mins = self.mins[:]
+        cell.maxs = self.maxs[:]
+        cell.users = self.users[:]
+        return cell
+
+    def add(self, pk, rank, nickname, values):
+        self.count += 1
+        for idx, value in enumerate(values):
+            self.sums[idx] += value
+            low = (value, pk, nickname)
+            if self.mins[idx] is None or low < self.mins[idx]:
+                self.mins[idx] = low
+            high = (value, -pk, nickname)
+            if self.maxs[idx] is None or high > self.maxs[idx]:
+                self.maxs[idx] = high
+        if len(self.users) < TOP_USERS or (rank, pk) < self.users[-1][:2]:
+            self.users.append((rank, pk, nickname))
+            self.users.sort()
+            del self.users[TOP_USERS:]
+
+    def merge(self, other):
+        self.count += other.count
+        for idx in range(len(MEASURES)):
+            self.sums[idx] += other.sums[idx]
+            if self.mins[idx] is None or (other.mins[idx] is not None and other.mins[idx] < self.mins[idx]):
+                self.mins[idx] = other.mins[idx]
+            if self.maxs[idx] is None or (other.maxs[idx] is not None and other.maxs[idx] > self.maxs[idx]):
+                self.maxs[idx] = other.maxs[idx]
+        if other.users:
+            self.users = sorted(self.users + other.users)[:TOP_USERS]
+        return self
+
+    def stats(self, measure):
+        if not self.count:
+            return dict(EMPTY_STATS)
+        idx = MEASURES.index(measure)
+        low, high = self.mins[idx], self.maxs[idx]
+        return {
+            'avg': round(self.sums[idx] / self.count, 1),
+            'min': low[0],
+            'max': high[0],
+            'min_nickname': low[2],
+            'max_nickname': high[2],
+        }
+
+    def rank_stats(self):
+        # 등수는 min이 최고, max가 최저
+        if not self.count:
+            return dict(EMPTY_STATS)
+        stats = self.stats('rank')
+        return {
+            'avg': stats['avg'],
+            'max': stats['min'],
+            'min': stats['max'],
+            'max_nickname': stats['min_nickname'],
+            'min_nickname': stats['max_nickname'],
+        }
+
+
+def merged(cells):
+    total = Cell()
+    for cell in cells:
+        total.merge(cell)
+    return total
+
+
+def ranked(counts):
+    # 개수 큰 순, 같으면 이름 역순 (기존 GROUP BY + ORDER BY count DESC 쿼리의 SQLite 결과 순서)
+    return sorted(counts, key=lambda item: (item[1], item[0]), reverse=True)
+
+
+def pick_rate_summary(by_formation):
+    # 포메이션별 Cell → 픽률 조회의 매니저 수, 포메이션 순위, 등수/점수/구단가치 통계
+    total = merged(by_formation.values())
+    formation_total = total.count if total.count else 1
+    formations = ranked((formation, cell.count) for formation, cell in by_formation.items())
+    return {
+        'manager_count': total.count,
+        'formation_rank': [
+            {
+                'rank': idx + 1,
+                'formation': formation,
+                'percentage': round(count * 100.0 / formation_total, 1),
+                'count': count,
+                'top_users': [nickname for _, _, nickname in by_formation[formation].users],
+            }
+            for idx, (formation, count) in enumerate(formations)
+        ],
+        'rank_stats': total.rank_stats(),
+        'score_stats': total.stats('score'),
+        'club_value_stats': total.stats('club_value'),
+    }
+
+
+class StatsCube:
+    """
+    스냅샷 하나의 매니저 통계 큐브 (등수 구간 x 팀컬러 x 포메이션)
+    - prefix[k]: 등수 k*RANK_BUCKET 미만 매니저의 (팀컬러, 포메이션)별 Cell (등수 축으로 누적)
+    - rank_range 조회는 누적 큐브 하나 + 마지막 구간에서 rank_range 이하인 매니저(최대 RANK_BUCKET명)
+    - 팀컬러/포메이션 축은 조회 시 합쳐서 사용 (칸 수는 팀컬러 x 포메이션 조합 수)
+    """
+
+    def __init__(self, snapshot_id):
+        from core.models import Manager
+        self.snapshot_id = snapshot_id
+        self.managers = list(
+            Manager.objects.filter(snapshot_id=snapshot_id).order_by('rank', 'pk')
+            .values_list('pk', 'rank', 'nickname', 'team_color', 'formation', *MEASURES[1:])
+        )
+        self.ranks = array('q', (manager[1] for manager in self.managers))
+
+        self.prefix = [{}]
+        running = {}
+        for manager in self.managers:
+            while manager[1] >= len(self.prefix) * RANK_BUCKET:
+                self.prefix.append({key: cell.copy() for key, cell in running.items()})
+            self._add(running, manager)
+        self.prefix.append(running)
+
+    @staticmethod
+    def _add(cells, manager):
+        pk, rank, nickname, team_color, formation, *values = manager
+        cell = cells.get((team_color, formation))
+        if cell is None:
+            cell = cells[(team_color, formation)] = Cell()
+        cell.add(pk, rank, nickname, (rank, *values))
+
+    def cells(self, rank_range):
+        # rank_range 이하 매니저의 (팀컬러, 포메이션)별 Cell (누적 큐브는 수정하지 않고 바뀌는 칸만 복사)
+        k = min(max((rank_range + 1) // RANK_BUCKET, 0), len(self.prefix) - 1)
+        cells = dict(self.prefix[k])
+        lo = bisect_left(self.ranks, k * RANK_BUCKET)
+        hi = bisect_right(self.ranks, rank_range)
+        copied = set()
+        for manager in self.managers[lo:hi]:
+            key = (manager[3], manager[4])
+            if key not in copied:
+                copied.add(key)
+                cells[key] = cells[key].copy() if key in cells else Cell()
+            self._add(cells, manager)
+        return cells
+
+    def pick_rate_stats(self, rank_range, team_color=''):
+        # 픽률 조회의 포메이션 순위와 등수/점수/구단가치 통계 (팀컬러 조건이 없으면 전체)
+        by_formation = {}
+        for (color, formation), cell in self.cells(rank_range).items():
+            if team_color and color != team_color:
+                continue
+            by_formation.setdefault(formation, Cell()).merge(cell)
+        return pick_rate_summary(by_formation)
+
+    def team_color_stats(self, rank_range, top_n):
+        # 팀컬러 순위 (빈 팀컬러 제외) 상위 top_n개와 팀컬러별 통계, 포메이션 순위 3위까지 (빈 포메이션 제외)
+        by_color = {}
+        manager_count = 0
+        for (color, formation), cell in self.cells(rank_range).items():
+            manager_count += cell.count
+            if color:
+                by_color.setdefault(color, {})[formation] = cell
+        total = manager_count if manager_count else 1
+        colors = ranked((color, sum(cell.count for cell in cells.values())) for color, cells in by_color.items())
+
+        result = []
+        for idx, (color, count) in enumerate(colors[:top_n]):
+            cells = by_color[color]
+            color_cell = merged(cells.values())
+            formations = ranked((formation, cell.count) for formation, cell in cells.items() if formation)
+            result.append({
+                'rank': idx + 1,
+                'team_color': color,
+                'count': count,
+                'percentage': round(count * 100.0 / total, 1),
+                'details': {
+                    'club_value': color_cell.stats('club_value'),
+                    'rank': color_cell.stats('rank'),
+                    'score': color_cell.stats('score'),
+                    'formation_rank': [
+                        {'rank': i + 1, 'formation': formation, 'count': formation_count}
+                        for i, (formation, formation_count) in enumerate(formations[:3])
+                    ],
+                },
+            })
+        return result
+
+
+_cubes = SnapshotLocal('통계 큐브', StatsCube)
+
+
+def get_cube(snapshot_id):
+    # 스냅샷의 통계 큐브 (공개 시 미리 생성, 없으면 이 요청에서 생성)
+    return _cubes.get(snapshot_id)
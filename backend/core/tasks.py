@@ -1,13 +1,10 @@
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import time
 import random
 from django.db import transaction
 import datetime
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -16,7 +13,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from django.utils import timezone
 import atexit
+import queue
 import threading
+from django.conf import settings
+from core.key_scheduler import KeyScheduler
+from core.http import get_client
+from core import meta
+from core.meta import clean_season_name
 
 # API 키 하드코딩
 API_KEYS = [
@@ -28,33 +31,8 @@ API_KEYS = [
     "live_bed3de42ec2c55504592a7dadf6463955a0e57f7e4d5eca6798106a7868efaa0efe8d04e6d233bd35cf2fabdeb93fb0d"
 ]
 
-META_SPID_URL = 'https://open.api.nexon.com/static/fconline/meta/spid.json'
-META_SEASON_URL = 'https://open.api.nexon.com/static/fconline/meta/seasonid.json'
-META_POSITION_URL = 'https://open.api.nexon.com/static/fconline/meta/spposition.json'
-
-# 메타데이터 캐싱
-META_SPID = None
-META_SEASON = None
-META_POSITION = None
-
-# 세션 풀 설정
-def create_session():
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=0.1,
-        status_forcelist=[429, 500, 502, 503, 504]
-    )
-    adapter = HTTPAdapter(
-        max_retries=retry_strategy,
-        pool_connections=100,
-        pool_maxsize=100
-    )
-    session.mount("https://", adapter)
-    return session
-
-# 전역 세션 풀
-SESSIONS = [create_session() for _ in range(len(API_KEYS))]
+# API 키별 토큰 버킷 스케줄러
+KEY_SCHEDULER = KeyScheduler(API_KEYS)
 
 def log_with_time(msg):
     now = datetime.datetime.now().strftime('[%Y년 %m월 %d일 %H시 %M분 %S초]')
@@ -70,391 +48,563 @@ def log_with_time(msg):
         print(f"{now} {msg}")
 
 def load_meta():
-    global META_SPID, META_SEASON, META_POSITION
-    max_retries = 3
-    retry_delay = 1
-
-    def fetch_with_retry(url, parser_func):
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                return parser_func(response.json())
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise Exception(f"메타데이터 로드 실패 ({url}): {str(e)}")
-                time.sleep(retry_delay)
-
+    # 선수/시즌/포지션 메타데이터 준비 (디스크 저장소에서 읽고, 없을 때만 다운로드)
     try:
-        if META_SPID is None:
-            META_SPID = fetch_with_retry(META_SPID_URL, lambda data: {str(item['id']): item['name'] for item in data})
-        if META_SEASON is None:
-            META_SEASON = fetch_with_retry(META_SEASON_URL, lambda data: {int(item['seasonId']): item['className'] for item in data})
-        if META_POSITION is None:
-            META_POSITION = fetch_with_retry(META_POSITION_URL, lambda data: {int(item['spposition']): item['desc'] for item in data})
+        meta.get_store().load_all()
     except Exception as e:
         log_with_time(f"[ERROR] 메타데이터 로드 실패: {str(e)}")
         raise
 
-def fetch_and_save_players_for_all_managers():
-    from core.models import Manager, Player, ManagerTemp, PlayerTemp
+# 남은 예산이 가장 많은 API 키 배정 (연결은 공용 HTTP 클라이언트가 관리)
+def next_api_key():
+    return KEY_SCHEDULER.acquire()
+
+def log_key_stats():
+    stats = KEY_SCHEDULER.stats()
+    summary = ", ".join(f"{s['key']} {s['requests']:,}/{s['throttled']:,}" for s in stats)
+    log_with_time(f"[API] 키별 요청/429 횟수: {summary}")
+
+def log_http_stats():
+    log_with_time(f"[API] 엔드포인트별 요청: {get_client().summary()}")
+
+# Nexon API 요청 간격은 키 스케줄러가 조절 (고정 sleep 없음)
+# - 429는 키 쿨다운, 타임아웃/연결 오류는 report(key, None)로 키의 토큰을 비워 재시도가 토큰을 기다림
+
+# OUID 조회 (재시도 대상이면 (None, None) 반환)
+def fetch_ouid(manager, retry_count=0):
+    api_key = None
+    try:
+        api_key = next_api_key()
+        url = f"https://open.api.nexon.com/fconline/v1/id?nickname={manager.nickname}"
+        headers = {"x-nxopen-api-key": api_key}
+        resp = get_client().get(url, headers=headers, timeout=15)
+        KEY_SCHEDULER.report(api_key, resp.status_code)
+        if resp.status_code == 200:
+            data = resp.json()
+            if data and data.get("ouid"):
+                return manager, data.get("ouid")
+            else:
+                log_with_time(f"[DEBUG] {manager.nickname} 응답 데이터 없음: {data}")
+                return manager, None
+        elif resp.status_code == 429:  # Rate limit
+            log_with_time(f"[DEBUG] {manager.nickname} Rate limit 발생")
+            return None, None
+        else:
+            log_with_time(f"[DEBUG] {manager.nickname} HTTP {resp.status_code} 에러: {resp.text}")
+            return manager, None
+    except requests.exceptions.Timeout:
+        log_with_time(f"[DEBUG] {manager.nickname} Timeout 발생")
+        KEY_SCHEDULER.report(api_key, None)
+        if retry_count < 2:
+            return None, None
+        return manager, None
+    except requests.exceptions.RequestException as e:
+        log_with_time(f"[DEBUG] {manager.nickname} RequestException: {str(e)}")
+        KEY_SCHEDULER.report(api_key, None)
+        if retry_count < 2:
+            return None, None
+        return manager, None
+    except Exception as e:
+        log_with_time(f"[DEBUG] {manager.nickname} 예상치 못한 오류: {str(e)}")
+        return manager, None
+
+# 매치 ID 조회 (retry_count 0/1/2 → limit 1/2/3)
+def fetch_match_id(manager, ouid, retry_count=0):
+    api_key = None
+    try:
+        api_key = next_api_key()
+
+        if retry_count == 0:
+            limit = 1
+            target_idx = 0
+        elif retry_count == 1:
+            limit = 2
+            target_idx = -1
+        else:
+            limit = 3
+            target_idx = -1
+
+        url = f"https://open.api.nexon.com/fconline/v1/user/match?ouid={ouid}&matchtype=52&offset=0&limit={limit}"
+        headers = {"x-nxopen-api-key": api_key}
+        resp = get_client().get(url, headers=headers, timeout=5)
+        KEY_SCHEDULER.report(api_key, resp.status_code)
+        if resp.status_code == 200:
+            data = resp.json()
+            if data and len(data) > abs(target_idx):
+                return manager, data[target_idx]
+            else:
+                return manager, None
+        elif resp.status_code == 429:
+            return None, None
+        else:
+            log_with_time(f"[DEBUG] {manager.nickname} 매치 ID HTTP {resp.status_code} 에러: {resp.text}")
+            return manager, None
+    except requests.exceptions.Timeout:
+        log_with_time(f"[DEBUG] {manager.nickname} 매치 ID Timeout 발생")
+        KEY_SCHEDULER.report(api_key, None)
+        if retry_count < 2:
+            return None, None
+        return manager, None
+    except requests.exceptions.RequestException as e:
+        log_with_time(f"[DEBUG] {manager.nickname} 매치 ID RequestException: {str(e)}")
+        KEY_SCHEDULER.report(api_key, None)
+        if retry_count < 2:
+            return None, None
+        return manager, None
+    except Exception as e:
+        log_with_time(f"[DEBUG] {manager.nickname} 매치 ID 예상치 못한 오류: {str(e)}")
+        return manager, None
+
+# 매치 디테일 조회 (실패 시 이전 경기로 대체)
+def fetch_match_detail_with_retry(args, metrics=None):
+    from core.match_detail import get_fetcher
+    manager, ouid, match_id = args
+    fetcher = get_fetcher()
+    max_match_detail_retry = 3
+    for match_detail_retry in range(max_match_detail_retry):
+        if match_detail_retry > 0 and metrics is not None:
+            metrics.retry_wave('match_detail', match_detail_retry)
+        try:
+            # 같은 경기는 한 번만 조회하고 양쪽 스쿼드를 공유(디스크 캐시 적중 시 API 호출 없음)
+            status_code, squads = fetcher.fetch(match_id)
+            if status_code != 200:
+                log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - {status_code}")
+                # 매치 ID 재조회
+                match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
+                if not match_id:
+                    return None
+                continue
+            player_list = squads.get(ouid)
+            if player_list is None:
+                log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - NO_MY_INFO")
+                match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
+                if not match_id:
+                    return None
+                continue
+            if len(player_list) < 11:
+                match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
+                if not match_id:
+                    return None
+                continue
+            squad = player_list[:11]
+            return (manager, squad)
+        except Exception as e:
+            log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - EXCEPTION: {str(e)}")
+            match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
+            if not match_id:
+                return None
+            continue
+
+def fetch_next_match_id(manager, ouid, retry_count):
+    # retry_count: 1(두 번째 경기), 2(세 번째 경기), 3(네 번째 경기)
+    api_key = next_api_key()
+    url = f"https://open.api.nexon.com/fconline/v1/user/match?ouid={ouid}&matchtype=52&offset=0&limit={retry_count+1}"
+    headers = {"x-nxopen-api-key": api_key}
+    try:
+        resp = get_client().get(url, headers=headers, timeout=5)  # 타임아웃 50% 감소
+        KEY_SCHEDULER.report(api_key, resp.status_code)
+        if resp.status_code == 200:
+            data = resp.json()
+            if data and len(data) > retry_count:
+                return data[retry_count]
+    except requests.exceptions.RequestException:
+        KEY_SCHEDULER.report(api_key, None)
+    except Exception:
+        pass
+    return None
+
+# 캐시된 OUID로 매치 조회가 실패하면 OUID를 다시 조회해 한 번 더 시도
+def revalidate_ouid_and_fetch_match_id(manager, old_ouid, ouid_cache):
+    ouid_cache.mark_stale(manager.nickname)
+    _, ouid = fetch_ouid(manager, 2)
+    if not ouid:
+        return None, None
+    ouid_cache.put(manager.nickname, ouid)
+    if ouid == old_ouid:
+        return ouid, None
+    _, match_id = fetch_match_id(manager, ouid, 0)
+    return ouid, match_id
+
+def collect_squads_threaded(managers, ouid_cache, match_state, run_state):
+    # 기존 방식: OUID → MATCH ID → MATCH DETAIL 3단계를 단계별 스레드풀로 순차 실행
+    total = len(managers)
+    log_interval = 200  # 로그는 200명마다 출력
+    processed_count = 0  # 처리된 매니저 수를 추적
+
+    # 1. OUID 조회 단계 (캐시에 없거나 만료된 닉네임만 조회)
+    log_with_time("[API] 1단계: OUID 조회 시작")
+    ouid_results = {}
+    pending_managers = []
+    for manager in managers:
+        ouid = ouid_cache.get(manager.nickname)
+        if ouid:
+            ouid_results[manager.pk] = ouid
+        else:
+            pending_managers.append(manager)
+    ouid_success_count = len(ouid_results)  # OUID 조회 성공한 누적 인원 수
+    log_with_time(f"[API] OUID 캐시 적중 {ouid_success_count:,}명, 조회 대상 {len(pending_managers):,}명")
+    failed_managers = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
+        futures = {executor.submit(fetch_ouid, manager): manager for manager in pending_managers}
+        for future in concurrent.futures.as_completed(futures):
+            manager = futures[future]
+            _, ouid = future.result()
+            if ouid:
+                ouid_results[manager.pk] = ouid
+                ouid_cache.put(manager.nickname, ouid)
+                run_state.record('ouid', manager.nickname, ouid)
+                ouid_success_count += 1
+            else:
+                failed_managers.append(manager)
+            processed_count += 1
+            if processed_count % log_interval == 0:
+                start_rank = processed_count - log_interval + 1
+                end_rank = processed_count
+                log_with_time(f"[API] {start_rank:,} ~ {end_rank:,}위 OUID 조회 완료({ouid_success_count:,}/{total:,})")
+
+    # 1차 재시도
+    if failed_managers:
+        run_state.metrics.retry_wave('ouid', 1, len(failed_managers))
+        log_with_time(f"[API] 1차 재시도 시작 (대상: {len(failed_managers)}명)")
+        first_retry_success = 0
+        second_retry_managers = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
+            futures = {executor.submit(fetch_ouid, manager, 1): manager for manager in failed_managers}
+            for future in concurrent.futures.as_completed(futures):
+                manager = futures[future]
+                _, ouid = future.result()
+                if ouid:
+                    ouid_results[manager.pk] = ouid
+                    ouid_cache.put(manager.nickname, ouid)
+                    run_state.record('ouid', manager.nickname, ouid)
+                    first_retry_success += 1
+                else:
+                    second_retry_managers.append(manager)
+
+        log_with_time(f"[API] OUID 1차 재시도 완료({first_retry_success}/{len(failed_managers)})")
+
+        # 2차 재시도
+        if second_retry_managers:
+            run_state.metrics.retry_wave('ouid', 2, len(second_retry_managers))
+            log_with_time(f"[API] 2차 재시도 시작 (대상: {len(second_retry_managers)}명)")
+            second_retry_success = 0
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
+                futures = {executor.submit(fetch_ouid, manager, 2): manager for manager in second_retry_managers}
+                for future in concurrent.futures.as_completed(futures):
+                    manager = futures[future]
+                    _, ouid = future.result()
+                    if ouid:
+                        ouid_results[manager.pk] = ouid
+                        ouid_cache.put(manager.nickname, ouid)
+                        run_state.record('ouid', manager.nickname, ouid)
+                        second_retry_success += 1
+
+            log_with_time(f"[API] OUID 2차 재시도 완료({second_retry_success}/{len(second_retry_managers)})")
+
+    log_with_time(f"[API] OUID 조회 완료 (성공: {len(ouid_results):,}/{total:,})")
+
+    # 2. MATCH ID 조회 단계
+    run_state.set_stage('match_id')
+    log_with_time("[API] 2단계: MATCH ID 조회 시작")
+    processed_count = 0
+    match_id_results = {}
+    failed_match_managers = []
+    total_ouid_success = len(ouid_results)  # OUID 조회 성공한 총 인원 수
+
+    # 이전 시도에서 이미 조회한 매치 ID는 재사용
+    managers_list = []
+    for manager in managers:
+        if manager.pk not in ouid_results:
+            continue
+        saved = run_state.match_ids.get(manager.nickname)
+        if saved and saved[0] == ouid_results[manager.pk]:
+            match_id_results[manager.pk] = saved[1]
+            if run_state.is_latest(saved):
+                # 최신 경기였던 MATCH ID는 증분 판단에 반영 (3단계에서 변동 없으면 이전 스쿼드 유지)
+                match_state.observe_latest(saved[0], saved[1])
+        else:
+            managers_list.append(manager)
+    match_id_success_count = len(match_id_results)
+    if match_id_success_count:
+        log_with_time(f"[API] 체크포인트 MATCH ID 재사용 {match_id_success_count:,}명")
+    batch_size = 2000  # 배치 사이즈 2배 증가
+    for i in range(0, len(managers_list), batch_size):
+        batch = managers_list[i:i+batch_size]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=300) as executor:  # 워커 수 2배 증가
+            futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk]): manager for manager in batch}
+            for future in concurrent.futures.as_completed(futures):
+                manager = futures[future]
+                _, match_id = future.result()
+                if match_id:
+                    match_id_results[manager.pk] = match_id
+                    match_state.observe_latest(ouid_results[manager.pk], match_id)
+                    run_state.record('match', manager.nickname, (ouid_results[manager.pk], match_id, True))
+                    match_id_success_count += 1
+                else:
+                    failed_match_managers.append(manager)
+                processed_count += 1
+                if processed_count % log_interval == 0:
+                    start_rank = processed_count - log_interval + 1
+                    end_rank = processed_count
+                    log_with_time(f"[API] {start_rank:,} ~ {end_rank:,}위 MATCH ID 조회 완료(성공: {match_id_success_count:,}/{total_ouid_success:,})")
+
+    # 매치 ID 1차 재시도
+    if failed_match_managers:
+        run_state.metrics.retry_wave('match_id', 1, len(failed_match_managers))
+        log_with_time(f"[API] MATCH ID 1차 재시도 시작 (대상: {len(failed_match_managers)}명)")
+        first_retry_success = 0
+        second_retry_managers = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=200) as executor:  # 워커 수 2배 증가
+            futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk], 1): manager for manager in failed_match_managers if manager.pk in ouid_results}
+            for future in concurrent.futures.as_completed(futures):
+                manager = futures[future]
+                _, match_id = future.result()
+                if match_id:
+                    match_id_results[manager.pk] = match_id
+                    run_state.record('match', manager.nickname, (ouid_results[manager.pk], match_id, False))
+                    first_retry_success += 1
+                else:
+                    second_retry_managers.append(manager)
+
+        log_with_time(f"[API] MATCH ID 1차 재시도 완료({first_retry_success}/{len(failed_match_managers)})")
+
+        # 2차 재시도
+        if second_retry_managers:
+            run_state.metrics.retry_wave('match_id', 2, len(second_retry_managers))
+            log_with_time(f"[API] MATCH ID 2차 재시도 시작 (대상: {len(second_retry_managers)}명)")
+            second_retry_success = 0
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=200) as executor:  # 워커 수 2배 증가
+                futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk], 2): manager for manager in second_retry_managers if manager.pk in ouid_results}
+                for future in concurrent.futures.as_completed(futures):
+                    manager = futures[future]
+                    _, match_id = future.result()
+                    if match_id:
+                        match_id_results[manager.pk] = match_id
+                        run_state.record('match', manager.nickname, (ouid_results[manager.pk], match_id, False))
+                        second_retry_success += 1
+
+            log_with_time(f"[API] MATCH ID 2차 재시도 완료({second_retry_success}/{len(second_retry_managers)})")
+
+    # 캐시된 OUID로 실패한 매니저는 OUID 재검증 후 한 번 더 조회
+    stale_managers = [
+        m for m in managers
+        if m.pk in ouid_results and m.pk not in match_id_results and ouid_cache.is_cached(m.nickname)
+    ]
+    if stale_managers:
+        run_state.metrics.retry_wave('match_id', 'revalidate', len(stale_managers))
+        log_with_time(f"[API] 캐시 OUID 재검증 시작 (대상: {len(stale_managers)}명)")
+        revalidated = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
+            futures = {
+                executor.submit(revalidate_ouid_and_fetch_match_id, m, ouid_results[m.pk], ouid_cache): m
+                for m in stale_managers
+            }
+            for future in concurrent.futures.as_completed(futures):
+                manager = futures[future]
+                ouid, match_id = future.result()
+                if ouid:
+                    ouid_results[manager.pk] = ouid
+                if match_id:
+                    match_id_results[manager.pk] = match_id
+                    match_state.observe_latest(ouid, match_id)
+                    run_state.record('match', manager.nickname, (ouid, match_id, True))
+                    revalidated += 1
+        log_with_time(f"[API] 캐시 OUID 재검증 완료({revalidated}/{len(stale_managers)})")
+
+    log_with_time(f"[API] MATCH ID 조회 완료 (성공: {len(match_id_results):,}/{total_ouid_success:,})")
+
+    # 3. MATCH DETAIL 조회 단계
+    run_state.set_stage('match_detail')
+    log_with_time("[API] 3단계: 매치 디테일 조회 및 선수 저장 시작")
+    processed_count = 0
+    match_detail_results = []
+    match_detail_success_count = 0
+    # 병렬 처리를 위한 조회 대상 리스트 생성 (최신 경기가 그대로면 이전 스쿼드 유지)
+    detail_targets = []
+    for manager in managers:
+        pk = manager.pk
+        if pk in ouid_results and pk in match_id_results:
+            squad = match_state.carry_over(manager, ouid_results[pk], match_id_results[pk])
+            if squad:
+                run_state.record('squad', manager.nickname, squad)
+                match_detail_results.append((manager, squad))
+            else:
+                detail_targets.append((manager, ouid_results[pk], match_id_results[pk]))
+    if match_detail_results:
+        log_with_time(f"[API] 최신 경기 변동 없음 {len(match_detail_results):,}명 → 이전 스쿼드 유지")
+    total_targets = len(detail_targets)
+    batch_size = 4000  # 배치 사이즈 2배 증가
+    for i in range(0, len(detail_targets), batch_size):
+        batch = detail_targets[i:i+batch_size]
+        with ThreadPoolExecutor(max_workers=80) as executor:  # 워커 수 2배 증가
+            futures = {executor.submit(fetch_match_detail_with_retry, args, run_state.metrics): args for args in batch}
+            for future in as_completed(futures):
+                result = future.result()
+                if result:
+                    match_state.record(result[0], futures[future][1], result[1])
+                    run_state.record('squad', result[0].nickname, result[1])
+                    match_detail_results.append(result)
+                    match_detail_success_count += 1
+                    processed_count += 1
+                    if processed_count % log_interval == 0:
+                        log_with_time(f"[API] {processed_count:,}명 MATCH DETAIL 조회 완료 ({match_detail_success_count:,}/{total_targets:,})")
+    log_with_time(f"[API] 매치 디테일 조회 완료 (성공: {match_detail_success_count:,}/{total_targets:,})")
+    return match_detail_results
+
+def collect_squads(managers, run_state, engine=None, incremental=None):
+    from django.conf import settings
+    from core.match_detail import get_fetcher
+    from core.match_state import MatchStateSession
+    from core.metrics import engine_collect_times
+    from core.ouid_cache import OuidCacheSession
+    # managers가 크롤링 스트림(ManagerStream)이면 매니저 목록을 미리 알 수 없으므로 파이프라인으로만 수집
+    streaming = hasattr(managers, 'produce')
+    engine = 'pipeline' if streaming else engine or getattr(settings, 'INGEST_ENGINE', 'pipeline')
+    KEY_SCHEDULER.reset_stats()
+    start_time = time.time()
+    if streaming:
+        resumed, pending = [], managers
+        ouid_cache = OuidCacheSession()
+    else:
+        # 이전 시도에서 스쿼드까지 받은 매니저는 그대로 사용, 나머지만 수집
+        resumed = [(m, run_state.squads[m.nickname]) for m in managers if m.nickname in run_state.squads]
+        pending = [m for m in managers if m.nickname not in run_state.squads]
+        if run_state.resumed:
+            log_with_time(
+                f"[API] 실행 {run_state.run.run_id} 이어서 진행 (OUID: {len(run_state.ouids):,}, "
+                f"MATCH ID: {len(run_state.match_ids):,}, 스쿼드: {len(resumed):,})"
+            )
+        ouid_cache = OuidCacheSession(m.nickname for m in pending)
+        for m in pending:
+            if m.nickname in run_state.ouids:
+                ouid_cache.put(m.nickname, run_state.ouids[m.nickname])
+    match_state = MatchStateSession(incremental)
+    fetcher = get_fetcher()
+    fetcher.start_run()
+    if engine == 'threaded':
+        run_state.set_stage('ouid')
+        results = collect_squads_threaded(pending, ouid_cache, match_state, run_state)
+    else:
+        from core.pipeline import collect_squads_pipeline
+        run_state.set_stage('pipeline')
+        results = collect_squads_pipeline(pending, ouid_cache=ouid_cache, match_state=match_state, run_state=run_state)
+    results = resumed + results
+    run_state.set_stage('save')
+    stored, invalidated = ouid_cache.flush()
+    log_with_time(f"[DB] OUID 캐시 반영 (저장: {stored:,}, 무효화: {invalidated:,})")
+    metrics = run_state.metrics
+    metrics.add_rows('ouid_cache', stored)
+    metrics.add_rows('manager_match_state', match_state.flush())
+    pending_count = managers.count if streaming else len(pending)
+    skipped = pending_count - match_state.counts['fetched'] - match_state.counts['carried']
+    log_with_time(
+        f"[API] {'증분' if match_state.incremental else '전체'} 갱신 결과 (새로 조회: {match_state.counts['fetched']:,}, "
+        f"이전 스쿼드 유지: {match_state.counts['carried']:,}, 건너뜀: {skipped:,})"
+    )
+    removed = fetcher.prune()
+    log_with_time(
+        f"[API] 매치 디테일 호출 {fetcher.stats['api']:,}회 (공유 경기 재사용: {fetcher.stats['memory']:,}, "
+        f"동시 요청 병합: {fetcher.stats['coalesced']:,}, 디스크 캐시: {fetcher.stats['disk']:,}, 캐시 정리: {removed:,})"
+    )
+    elapsed = time.time() - start_time
+    # 엔진 비교는 실행 기록(IngestRun.metrics)으로: 다른 엔진은 보통 다른 프로세스에서 실행됨
+    run_state.metrics.add_collect(engine, elapsed)
+    others = ", ".join(
+        f"{name}: {seconds:.1f}초 ({run_id})"
+        for name, (run_id, seconds) in engine_collect_times().items() if name != engine
+    )
+    log_with_time(f"[API] 수집 엔진 {engine} 소요 시간: {elapsed:.1f}초" + (f" (최근 완료 실행 {others})" if others else ""))
+    if streaming:
+        metrics.add_rows('manager', managers.count)
+    metrics.add_counter('managers', pending_count + len(resumed))
+    metrics.add_counter('resumed_squads', len(resumed))
+    metrics.add_counter('ouid_cache_hit', len(ouid_cache.cached) - len(ouid_cache.stale))
+    metrics.add_counter('ouid_invalidated', invalidated)
+    metrics.add_counter('squads_fetched', match_state.counts['fetched'])
+    metrics.add_counter('squads_carried', match_state.counts['carried'])
+    metrics.add_counter('squads_skipped', skipped)
+    for name, count in fetcher.stats.items():
+        metrics.add_counter(f"match_detail_{name}", count)
+    metrics.add_key_stats(KEY_SCHEDULER.stats())
+    log_key_stats()
+    log_http_stats()
+    return results
+
+def fetch_and_save_players_for_all_managers(engine=None, incremental=None, run_id=None, snapshot=None, stream=None):
+    from core.run_state import RunState
+    from core.snapshots import latest_ingested_snapshot, mark_failed, publish, snapshot_for_ingest
     now = timezone.now()
-    # 1. players 테이블 데이터 존재 여부 확인
-    player_count = Player.objects.count()
+    if stream is not None:
+        snapshot = stream.snapshot
+    # 1. 공개 스냅샷의 공개 시각 확인 (새로 크롤링한 스냅샷이나 특정 실행을 재개하는 경우는 생략)
+    # 순위 갱신으로 공개된 스냅샷은 스쿼드가 이전 수집 그대로이므로 마지막으로 수집해 공개한 스냅샷 기준
+    live = latest_ingested_snapshot()
     need_update = False
-    if player_count == 0:
+    if run_id or snapshot is not None or live is None or not live.player_count or live.published_at is None:
         need_update = True
     else:
-        # 가장 최신 row의 created_at 시(hour) 확인
-        latest = Player.objects.latest('created_at')
-        latest_hour = latest.created_at.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+        # 공개 시각의 시(hour) 확인
+        latest_hour = live.published_at.replace(minute=0, second=0, microsecond=0, tzinfo=None)
         now_hour = now.replace(minute=0, second=0, microsecond=0, tzinfo=None)
         if latest_hour != now_hour:
             need_update = True
     if not need_update:
-        log_with_time(f"[DB] Player 테이블이 최신(동일 시각) → 데이터 유지, 갱신 생략")
+        log_with_time(f"[DB] 마지막 수집 스냅샷 #{live.pk}이 최신(동일 시각) → 데이터 유지, 갱신 생략")
         return True
-    log_with_time(f"[DB] Player 테이블이 비었거나, created_at 시(hour)가 달라 데이터 갱신 시작")
-    # 2. 임시 테이블에 manager/players 데이터 수집 및 저장
-    # 기존 임시 테이블 비우기
-    ManagerTemp.objects.all().delete()
-    PlayerTemp.objects.all().delete()
-    # --- 이하 기존 크롤링/수집 로직(ouid/match_id/match_detail 등) 그대로 실행 ---
+    log_with_time(f"[DB] 공개 스냅샷이 없거나, 공개 시각의 시(hour)가 달라 데이터 갱신 시작")
+    # 2. 수집 결과를 저장할 스냅샷 (공개 전까지 조회 API는 기존 스냅샷을 계속 읽음)
+    snapshot = snapshot or snapshot_for_ingest()
     max_retries = 3
     retry_delay = 5
 
+    # 실행 단위 체크포인트: 재시도/재시작 시 이미 끝난 단계는 건너뜀
+    run_state = RunState.open(run_id)
+    log_with_time(f"[DB] 수집 실행 {run_state.run.run_id} 시작 (스냅샷 #{snapshot.pk})")
+
+    published = False
     for attempt in range(max_retries):
         try:
-            # 1. 크롤링 단계
-            log_with_time("[API] 1단계: OUID 조회 시작")
-            managers = Manager.objects.all().order_by('rank')
-            total = len(managers)
-            current_key_index = 0
-            batch_size = 1000  # 실제 배치 사이즈는 1,000명
-            log_interval = 200  # 로그는 200명마다 출력
-            processed_count = 0  # 처리된 매니저 수를 추적
-            ouid_success_count = 0  # OUID 조회 성공한 누적 인원 수
-
-            # OUID 조회를 위한 병렬 처리 함수
-            def fetch_ouid(manager, retry_count=0):
-                nonlocal current_key_index
-                try:
-                    api_key = API_KEYS[current_key_index]
-                    session = SESSIONS[current_key_index]
-                    current_key_index = (current_key_index + 1) % len(API_KEYS)
-                    url = f"https://open.api.nexon.com/fconline/v1/id?nickname={manager.nickname}"
-                    headers = {"x-nxopen-api-key": api_key}
-                    resp = session.get(url, headers=headers, timeout=15)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data and data.get("ouid"):
-                            return manager, data.get("ouid")
-                        else:
-                            log_with_time(f"[DEBUG] {manager.nickname} 응답 데이터 없음: {data}")
-                            return manager, None
-                    elif resp.status_code == 429:  # Rate limit
-                        log_with_time(f"[DEBUG] {manager.nickname} Rate limit 발생")
-                        time.sleep(2)
-                        return None, None
-                    else:
-                        log_with_time(f"[DEBUG] {manager.nickname} HTTP {resp.status_code} 에러: {resp.text}")
-                        return manager, None
-                except requests.exceptions.Timeout:
-                    log_with_time(f"[DEBUG] {manager.nickname} Timeout 발생")
-                    if retry_count < 2:
-                        return None, None
-                    return manager, None
-                except requests.exceptions.RequestException as e:
-                    log_with_time(f"[DEBUG] {manager.nickname} RequestException: {str(e)}")
-                    if retry_count < 2:
-                        return None, None
-                    return manager, None
-                except Exception as e:
-                    log_with_time(f"[DEBUG] {manager.nickname} 예상치 못한 오류: {str(e)}")
-                    return manager, None
-
-            # 매치 ID 조회를 위한 병렬 처리 함수
-            def fetch_match_id(manager, ouid, retry_count=0):
-                nonlocal current_key_index
-                try:
-                    time.sleep(random.uniform(0.01, 0.03))
-                    api_key = API_KEYS[current_key_index]
-                    session = SESSIONS[current_key_index]
-                    current_key_index = (current_key_index + 1) % len(API_KEYS)
-                    
-                    if retry_count == 0:
-                        limit = 1
-                        target_idx = 0
-                    elif retry_count == 1:
-                        limit = 2
-                        target_idx = -1
-                    else:
-                        limit = 3
-                        target_idx = -1
-                    
-                    url = f"https://open.api.nexon.com/fconline/v1/user/match?ouid={ouid}&matchtype=52&offset=0&limit={limit}"
-                    headers = {"x-nxopen-api-key": api_key}
-                    
-                    if retry_count > 0:
-                        time.sleep(0.1 * retry_count)
-                    
-                    resp = session.get(url, headers=headers, timeout=5)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data and len(data) > abs(target_idx):
-                            return manager, data[target_idx]
-                        else:
-                            return manager, None
-                    elif resp.status_code == 429:
-                        time.sleep(0.5)
-                        return None, None
-                    else:
-                        log_with_time(f"[DEBUG] {manager.nickname} 매치 ID HTTP {resp.status_code} 에러: {resp.text}")
-                        return manager, None
-                except requests.exceptions.Timeout:
-                    log_with_time(f"[DEBUG] {manager.nickname} 매치 ID Timeout 발생")
-                    if retry_count < 2:
-                        return None, None
-                    return manager, None
-                except requests.exceptions.RequestException as e:
-                    log_with_time(f"[DEBUG] {manager.nickname} 매치 ID RequestException: {str(e)}")
-                    if retry_count < 2:
-                        return None, None
-                    return manager, None
-                except Exception as e:
-                    log_with_time(f"[DEBUG] {manager.nickname} 매치 ID 예상치 못한 오류: {str(e)}")
-                    return manager, None
-
-            # OUID 조회 병렬 처리
-            ouid_results = {}
-            failed_managers = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
-                futures = {executor.submit(fetch_ouid, manager): manager for manager in managers}
-                for future in concurrent.futures.as_completed(futures):
-                    manager, ouid = future.result()
-                    if ouid:
-                        ouid_results[manager.pk] = ouid
-                        ouid_success_count += 1
-                    else:
-                        failed_managers.append(manager)
-                    processed_count += 1
-                    if processed_count % log_interval == 0:
-                        start_rank = processed_count - log_interval + 1
-                        end_rank = processed_count
-                        log_with_time(f"[API] {start_rank:,} ~ {end_rank:,}위 OUID 조회 완료({ouid_success_count:,}/{total:,})")
-
-            # 1차 재시도
-            if failed_managers:
-                log_with_time(f"[API] 1차 재시도 시작 (대상: {len(failed_managers)}명)")
-                first_retry_success = 0
-                second_retry_managers = []
-                
-                with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
-                    futures = {executor.submit(fetch_ouid, manager, 1): manager for manager in failed_managers}
-                    for future in concurrent.futures.as_completed(futures):
-                        manager, ouid = future.result()
-                        if ouid:
-                            ouid_results[manager.pk] = ouid
-                            first_retry_success += 1
-                        else:
-                            second_retry_managers.append(manager)
-                
-                log_with_time(f"[API] OUID 1차 재시도 완료({first_retry_success}/{len(failed_managers)})")
-
-                # 2차 재시도
-                if second_retry_managers:
-                    log_with_time(f"[API] 2차 재시도 시작 (대상: {len(second_retry_managers)}명)")
-                    second_retry_success = 0
-                    
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=80) as executor:
-                        futures = {executor.submit(fetch_ouid, manager, 2): manager for manager in second_retry_managers}
-                        for future in concurrent.futures.as_completed(futures):
-                            manager, ouid = future.result()
-                            if ouid:
-                                ouid_results[manager.pk] = ouid
-                                second_retry_success += 1
-                
-                    log_with_time(f"[API] OUID 2차 재시도 완료({second_retry_success}/{len(second_retry_managers)})")
-            
-            log_with_time(f"[API] OUID 조회 완료 (성공: {len(ouid_results):,}/{total:,})")
-
-            # 3. MATCH ID 조회 단계
-            log_with_time("[API] 2단계: MATCH ID 조회 시작")
-            processed_count = 0
-            match_id_success_count = 0
-            match_id_results = {}
-            failed_match_managers = []
-            total_ouid_success = len(ouid_results)  # OUID 조회 성공한 총 인원 수
-
-            managers_list = [manager for manager in managers if manager.pk in ouid_results]
-            batch_size = 2000  # 배치 사이즈 2배 증가
-            for i in range(0, len(managers_list), batch_size):
-                batch = managers_list[i:i+batch_size]
-                with concurrent.futures.ThreadPoolExecutor(max_workers=300) as executor:  # 워커 수 2배 증가
-                    futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk]): manager for manager in batch}
-                    for future in concurrent.futures.as_completed(futures):
-                        manager, match_id = future.result()
-                        if match_id:
-                            match_id_results[manager.pk] = match_id
-                            match_id_success_count += 1
-                        else:
-                            failed_match_managers.append(manager)
-                        processed_count += 1
-                        if processed_count % log_interval == 0:
-                            start_rank = processed_count - log_interval + 1
-                            end_rank = processed_count
-                            log_with_time(f"[API] {start_rank:,} ~ {end_rank:,}위 MATCH ID 조회 완료(성공: {match_id_success_count:,}/{total_ouid_success:,})")
-                time.sleep(0.5)  # 배치 간 대기 시간 50% 감소
-
-            # 매치 ID 1차 재시도
-            if failed_match_managers:
-                log_with_time(f"[API] MATCH ID 1차 재시도 시작 (대상: {len(failed_match_managers)}명)")
-                time.sleep(0.25)  # 재시도 전 대기 시간 50% 감소
-                first_retry_success = 0
-                second_retry_managers = []
-                
-                with concurrent.futures.ThreadPoolExecutor(max_workers=200) as executor:  # 워커 수 2배 증가
-                    futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk], 1): manager for manager in failed_match_managers if manager.pk in ouid_results}
-                    for future in concurrent.futures.as_completed(futures):
-                        manager, match_id = future.result()
-                        if match_id:
-                            match_id_results[manager.pk] = match_id
-                            first_retry_success += 1
-                        else:
-                            second_retry_managers.append(manager)
-                
-                log_with_time(f"[API] MATCH ID 1차 재시도 완료({first_retry_success}/{len(failed_match_managers)})")
-
-                # 2차 재시도
-                if second_retry_managers:
-                    log_with_time(f"[API] MATCH ID 2차 재시도 시작 (대상: {len(second_retry_managers)}명)")
-                    time.sleep(0.25)  # 재시도 전 대기 시간 50% 감소
-                    second_retry_success = 0
-                    
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=200) as executor:  # 워커 수 2배 증가
-                        futures = {executor.submit(fetch_match_id, manager, ouid_results[manager.pk], 2): manager for manager in second_retry_managers if manager.pk in ouid_results}
-                        for future in concurrent.futures.as_completed(futures):
-                            manager, match_id = future.result()
-                            if match_id:
-                                match_id_results[manager.pk] = match_id
-                                second_retry_success += 1
-                
-                    log_with_time(f"[API] MATCH ID 2차 재시도 완료({second_retry_success}/{len(second_retry_managers)})")
-            
-            log_with_time(f"[API] MATCH ID 조회 완료 (성공: {len(match_id_results):,}/{total_ouid_success:,})")
-
-            # 매치 ID 조회 완료 후 유효성 필터링
-            valid_match_id_results = {pk: mid for pk, mid in match_id_results.items() if mid and isinstance(mid, str) and len(mid) > 5}
-
-            # robust_match_detail에 넘길 manager 객체 리스트 생성 (pk 기준)
-            valid_managers = [m for m in managers if m.pk in valid_match_id_results and m.pk in ouid_results]
-
-            # 4. MATCH DETAIL 조회 단계
-            log_with_time("[API] 3단계: 매치 디테일 조회 및 선수 저장 시작")
-            processed_count = 0
-            match_detail_results = []
-            match_detail_success_count = 0
-            # 병렬 처리를 위한 조회 대상 리스트 생성
-            detail_targets = []
-            for manager in managers:
-                pk = manager.pk
-                if pk in ouid_results and pk in match_id_results:
-                    ouid = ouid_results[pk]
-                    match_id = match_id_results[pk]
-                    detail_targets.append((manager, ouid, match_id))
-            total_targets = len(detail_targets)
-            def fetch_match_detail_with_retry(args):
-                manager, ouid, match_id = args
-                nonlocal current_key_index
-                api_key = API_KEYS[current_key_index]
-                current_key_index = (current_key_index + 1) % len(API_KEYS)
-                max_match_detail_retry = 3
-                for match_detail_retry in range(max_match_detail_retry):
-                    try:
-                        url = f"https://open.api.nexon.com/fconline/v1/match-detail?matchid={match_id}"
-                        headers = {"x-nxopen-api-key": api_key}
-                        resp = requests.get(url, headers=headers, timeout=5)  # 타임아웃 50% 감소
-                        if resp.status_code != 200:
-                            log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - {resp.status_code}")
-                            # 매치 ID 재조회
-                            match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
-                            if not match_id:
-                                return None
-                            continue
-                        data = resp.json()
-                        match_info_list = data.get('matchInfo', [])
-                        my_info = None
-                        for info in match_info_list:
-                            if info.get('ouid') == ouid:
-                                my_info = info
-                                break
-                        if not my_info:
-                            log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - NO_MY_INFO")
-                            match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
-                            if not match_id:
-                                return None
-                            continue
-                        player_list = my_info.get('player', [])
-                        if not isinstance(player_list, list) or len(player_list) < 11:
-                            match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
-                            if not match_id:
-                                return None
-                            continue
-                        squad = player_list[:11]
-                        return (manager, squad)
-                    except Exception as e:
-                        log_with_time(f"[DEBUG] {manager.nickname} MATCH DETAIL 조회 실패 - EXCEPTION: {str(e)}")
-                        match_id = fetch_next_match_id(manager, ouid, match_detail_retry+1)
-                        if not match_id:
-                            return None
-                        continue
-            def fetch_next_match_id(manager, ouid, retry_count):
-                # retry_count: 1(두 번째 경기), 2(세 번째 경기), 3(네 번째 경기)
-                api_key = API_KEYS[current_key_index]
-                url = f"https://open.api.nexon.com/fconline/v1/user/match?ouid={ouid}&matchtype=52&offset=0&limit={retry_count+1}"
-                headers = {"x-nxopen-api-key": api_key}
-                try:
-                    resp = requests.get(url, headers=headers, timeout=5)  # 타임아웃 50% 감소
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data and len(data) > retry_count:
-                            return data[retry_count]
-                except Exception:
-                    pass
-                return None
-            log_interval = 200
-            batch_size = 4000  # 배치 사이즈 2배 증가
-            for i in range(0, len(detail_targets), batch_size):
-                batch = detail_targets[i:i+batch_size]
-                with ThreadPoolExecutor(max_workers=80) as executor:  # 워커 수 2배 증가
-                    futures = [executor.submit(fetch_match_detail_with_retry, args) for args in batch]
-                    for future in as_completed(futures):
-                        result = future.result()
-                        if result:
-                            match_detail_results.append(result)
-                            match_detail_success_count += 1
-                            processed_count += 1
-                            if processed_count % log_interval == 0:
-                                log_with_time(f"[API] {processed_count:,}명 MATCH DETAIL 조회 완료 ({match_detail_success_count:,}/{total_targets:,})")
-                time.sleep(0.25)  # 배치 간 대기 시간 50% 감소
-            log_with_time(f"[API] 매치 디테일 조회 완료 (성공: {match_detail_success_count:,}/{total_targets:,})")
+            if stream is not None and attempt == 0:
+                # 크롤링과 동시에 수집 (페이지 단위로 매니저 저장 → OUID 단계)
+                managers = stream
+            else:
+                if stream is not None:
+                    stream.complete()
+                managers = list(snapshot.managers.order_by('rank'))
+            match_detail_results = collect_squads(managers, run_state, engine, incremental)
 
             # 4. DB 저장 단계
-            success_count, error_count = save_players_to_db(match_detail_results)
-            
-            # 성공 기준 검증
+            success_count, error_count = save_players_to_db(match_detail_results, snapshot)
+            run_state.metrics.add_rows('player', success_count)
+
+            # 성공 기준 검증 후 스냅샷 공개
             if success_count > 0 and error_count == 0:
                 log_with_time(f"[API] 데이터 저장 완료 (성공: {success_count:,}, 실패: {error_count:,})")
+                previous_id = publish(snapshot, success_count)
+                published = True
+                log_with_time(f"[DB] 스냅샷 #{snapshot.pk} 공개 (이전: #{previous_id})")
+                run_state.finish('completed')
                 return True
             else:
                 raise Exception(f"데이터 저장 실패 (성공: {success_count:,}, 실패: {error_count:,})")
 
         except Exception as e:
+            if published:
+                # 공개 이후 단계의 실패: 공개 스냅샷에 다시 수집/저장하거나 failed로 바꾸지 않음
+                log_with_time(f"[ERROR] 스냅샷 #{snapshot.pk} 공개 후 처리 실패: {str(e)}")
+                return True
+            run_state.flush()
             if attempt < max_retries - 1:
                 log_with_time(f"[ERROR] 시도 {attempt + 1}/{max_retries} 실패: {str(e)}")
                 time.sleep(retry_delay)
             else:
                 log_with_time(f"[ERROR] 최종 실패: {str(e)}")
+                mark_failed(snapshot)
+                run_state.finish('failed', str(e))
                 return False
 
     return False
@@ -463,54 +613,33 @@ def get_ouid(nickname, api_key):
     url = 'https://open.api.nexon.com/fconline/v1/id'
     headers = {'x-nxopen-api-key': api_key}
     params = {'nickname': nickname}
-    for attempt in range(3):  # 최대 3번 재시도
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
-            resp.raise_for_status()
-            return resp.json()['ouid']
-        except Exception as e:
-            if attempt == 2:  # 마지막 시도였다면
-                raise e
-            time.sleep(1)  # 1초 대기 후 재시도
+    resp = get_client().get_ok(url, headers=headers, params=params)  # 실패 시 공용 정책으로 재시도
+    return resp.json()['ouid']
 
 def get_last_match_id(ouid, api_key):
     url = 'https://open.api.nexon.com/fconline/v1/user/match'
     headers = {'x-nxopen-api-key': api_key}
     params = {'ouid': ouid, 'matchtype': 52, 'offset': 0, 'limit': 1}
-    for attempt in range(3):  # 최대 3번 재시도
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
-            resp.raise_for_status()
-            return resp.json()[0]
-        except Exception as e:
-            if attempt == 2:  # 마지막 시도였다면
-                raise e
-            time.sleep(1)  # 1초 대기 후 재시도
+    resp = get_client().get_ok(url, headers=headers, params=params)  # 실패 시 공용 정책으로 재시도
+    return resp.json()[0]
 
 def get_match_players(match_id, api_key):
     url = 'https://open.api.nexon.com/fconline/v1/match-detail'
     headers = {'x-nxopen-api-key': api_key}
     params = {'matchid': match_id}
-    for attempt in range(3):  # 최대 3번 재시도
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            # 선발 11명만 추출
-            players = []
-            for info in data['matchInfo']:
-                for p in info.get('player', []):
-                    players.append({
-                        'position_id': p['spPosition'],
-                        'spid': p['spId'],
-                        'season_id': int(str(p['spId'])[:3]),
-                        'grade': p['spGrade'],
-                    })
-            return players
-        except Exception as e:
-            if attempt == 2:  # 마지막 시도였다면
-                raise e
-            time.sleep(1)  # 1초 대기 후 재시도 
+    resp = get_client().get_ok(url, headers=headers, params=params)  # 실패 시 공용 정책으로 재시도
+    data = resp.json()
+    # 선발 11명만 추출
+    players = []
+    for info in data['matchInfo']:
+        for p in info.get('player', []):
+            players.append({
+                'position_id': p['spPosition'],
+                'spid': p['spId'],
+                'season_id': int(str(p['spId'])[:3]),
+                'grade': p['spGrade'],
+            })
+    return players
 
 def get_and_save_match_players(manager, ouid, match_id, api_key):
     from core.models import Player
@@ -522,17 +651,16 @@ def get_and_save_match_players(manager, ouid, match_id, api_key):
     - api_key: 사용할 API KEY
     """
     # 메타데이터 체크
-    if META_POSITION is None or META_SPID is None or META_SEASON is None:
-        log_with_time(f"[ERROR] {manager.nickname} 메타데이터가 로드되지 않음: META_POSITION={META_POSITION}, META_SPID={META_SPID}, META_SEASON={META_SEASON}")
-        load_meta()  # 재시도
-        if META_POSITION is None or META_SPID is None or META_SEASON is None:
-            log_with_time(f"[ERROR] {manager.nickname} 메타데이터 재로드 실패")
-            return False
+    try:
+        spid_names, season_names, position_names = meta.spid_names(), meta.season_names(), meta.position_names()
+    except Exception as e:
+        log_with_time(f"[ERROR] {manager.nickname} 메타데이터 로드 실패: {str(e)}")
+        return False
 
     url = f"https://open.api.nexon.com/fconline/v1/match-detail?matchid={match_id}"
     headers = {"x-nxopen-api-key": api_key}
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = get_client().get(url, headers=headers)
         if resp.status_code != 200:
             log_with_time(f"[DEBUG] {manager.nickname} 매치 디테일 조회 실패: HTTP {resp.status_code}, {resp.text}")
             return False
@@ -570,15 +698,16 @@ def get_and_save_match_players(manager, ouid, match_id, api_key):
                     log_with_time(f"[DEBUG] {manager.nickname} season_id 파싱 오류: {str(e)}, spid={spid}, p={p}")
                     season_id = ""
                 try:
-                    season_raw = META_SEASON.get(season_id, str(season_id))
+                    season_raw = season_names.get(season_id, str(season_id))
                     season = clean_season_name(season_raw)
                     Player.objects.create(
+                        snapshot_id=manager.snapshot_id,
                         manager=manager,
                         rank=manager.rank,
                         nickname=manager.nickname,
                         team_color=manager.team_color,
-                        position=META_POSITION.get(sp_position, str(sp_position)),
-                        player_name=META_SPID.get(str(spid), str(spid)),
+                        position=position_names.get(sp_position, str(sp_position)),
+                        player_name=spid_names.get(str(spid), str(spid)),
                         season=season,
                         grade=sp_grade
                     )
@@ -591,12 +720,10 @@ def get_and_save_match_players(manager, ouid, match_id, api_key):
         log_with_time(f"[ERROR] {manager.nickname} 매치 디테일 선수 저장 중 예외: {str(e)}, match_id={match_id}, ouid={ouid}")
         return False 
 
-def clean_season_name(season_name):
-    return re.split(r'\s*\(', season_name)[0].strip()
-
 class WebDriverManager:
-    def __init__(self):
+    def __init__(self, driver_path=None):
         self.driver = None
+        self.driver_path = driver_path
         self.options = webdriver.ChromeOptions()
         self._setup_options()
 
@@ -621,7 +748,7 @@ class WebDriverManager:
 
     def create_driver(self):
         if self.driver is None:
-            service = Service(ChromeDriverManager().install())
+            service = Service(self.driver_path or ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=self.options)
             self.driver.set_page_load_timeout(5)
         return self.driver
@@ -635,100 +762,160 @@ class WebDriverManager:
             finally:
                 self.driver = None
 
-def fetch_rankings_parallel(manager, retry_count=0):
-    if manager is None:
-        log_with_time("[크롤링] 매니저 객체가 None입니다.")
-        return None, None
-        
-    driver_manager = WebDriverManager()
-    try:
-        time.sleep(random.uniform(0.05, 0.1))
-        driver = driver_manager.create_driver()
-        
+class WebDriverPool:
+    """
+    재사용하는 headless Chrome 드라이버 풀
+    - 최대 size개까지만 필요할 때 생성하고, 작업이 끝나면 반납해 다음 작업에서 재사용
+    - chromedriver 설치 확인(ChromeDriverManager)은 풀에서 한 번만 실행
+    - 오류가 난 드라이버는 종료하고 다음 요청 때 새로 생성
+    """
+
+    def __init__(self, size=None):
+        self.size = size or getattr(settings, 'RANK_REFRESH', {}).get('BROWSER_POOL_SIZE', 2)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._all = []
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                if self._driver_path is None:
+                    self._driver_path = ChromeDriverManager().install()
+                self._created += 1
+                driver_manager = WebDriverManager(self._driver_path)
+                self._all.append(driver_manager)
+                return driver_manager
+        return self._idle.get()
+
+    def release(self, driver_manager, broken=False):
+        if broken:
+            driver_manager.quit()
+        self._idle.put(driver_manager)
+
+    def close(self):
+        for driver_manager in self._all:
+            driver_manager.quit()
+
+def fetch_rankings_browser_page(pool, page):
+    # datacenter/rank 페이지를 풀의 드라이버로 열어 순위/닉네임/레벨 목록 반환 (최대 3회 재시도)
+    for retry_count in range(4):
+        driver_manager = pool.acquire()
+        broken = False
         try:
-            driver.get("https://fconline.nexon.com/datacenter/rank")
             time.sleep(random.uniform(0.05, 0.1))
+            driver = driver_manager.create_driver()
+            driver.get(get_client().url(f"https://fconline.nexon.com/datacenter/rank?n4pageno={page}"))
             WebDriverWait(driver, 3).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "rank_list"))
             )
-            rank_list = driver.find_elements(By.CLASS_NAME, "rank_list")
             rankings = []
-            for rank in rank_list:
+            for rank in driver.find_elements(By.CLASS_NAME, "rank_list"):
                 try:
                     rank_num = rank.find_element(By.CLASS_NAME, "rank_num").text.strip()
                     nickname = rank.find_element(By.CLASS_NAME, "nickname").text.strip()
                     level = rank.find_element(By.CLASS_NAME, "level").text.strip()
                     if all([rank_num, nickname, level]):
                         rankings.append({
-                            'rank': rank_num,
+                            'rank': int(rank_num.replace(',', '')),
                             'nickname': nickname,
-                            'level': level
+                            'level': int(level),
                         })
                 except:
                     continue
-            if rankings:
-                return manager, rankings
-            else:
+            if not rankings:
                 raise Exception("유효한 랭킹 데이터가 없습니다")
+            return rankings
         except Exception as e:
+            broken = True
             if retry_count < 3:
-                log_with_time(f"[크롤링] {manager.nickname} 재시도 {retry_count + 1}/3: {str(e)}")
+                log_with_time(f"[크롤링] 랭킹 {page}페이지 재시도 {retry_count + 1}/3: {str(e)}")
                 time.sleep(0.3)
-                return fetch_rankings_parallel(manager, retry_count + 1)
             else:
-                log_with_time(f"[크롤링] {manager.nickname} 최종 실패: {str(e)}")
-                return manager, None
-    except Exception as e:
-        log_with_time(f"[크롤링] 예상치 못한 오류 발생: {str(e)}")
-        return manager, None
+                log_with_time(f"[크롤링] 랭킹 {page}페이지 최종 실패: {str(e)}")
+        finally:
+            pool.release(driver_manager, broken)
+    return []
+
+def fetch_rankings_http(pages, max_workers=50):
+    # rank_inner 페이지(20명)를 HTTP로 받아 파싱 (crawl_managers와 같은 요청/파서)
+    from core.management.commands.crawl_managers import crawl_page_safe
+    rankings = []
+    failed_pages = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for managers, failed in executor.map(crawl_page_safe, range(1, pages + 1)):
+            rankings.extend(managers)
+            if failed:
+                failed_pages.append(failed)
+    if failed_pages:
+        log_with_time(f"[크롤링] 랭킹 페이지 실패: {sorted(failed_pages)}")
+    return rankings
+
+def fetch_rankings_browser(pages, pool_size=None):
+    pool = WebDriverPool(pool_size)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=pool.size) as executor:
+            results = executor.map(lambda page: fetch_rankings_browser_page(pool, page), range(1, pages + 1))
+            return [row for rows in results for row in rows]
     finally:
-        driver_manager.quit()
+        pool.close()
 
-def fetch_rankings_for_all_managers():
+def fetch_rankings_for_all_managers(source=None, pages=None):
+    """
+    공개 스냅샷 매니저의 순위 갱신
+    - http(기본): rank_inner 페이지 단위로 순위/점수/구단 가치/팀 컬러/포메이션을 받아 닉네임으로 매칭
+    - browser: datacenter/rank 페이지를 재사용 드라이버 풀로 열어 순위만 갱신(Manager에 레벨 컬럼은 없음)
+    - 공개된 스냅샷은 바꾸지 않음: 바뀐 매니저가 있으면 스쿼드(선수 행)를 그대로 옮긴 새 스냅샷에
+      순위와 선수 행의 순위/팀 컬러를 반영한 뒤 publish()로 교체 (색인/통계 큐브/응답 캐시는 새 스냅샷 id로 다시 생성)
+    - 조회한 순위 목록에 없는 매니저 중 그 순위를 다른 매니저가 차지한 경우는 새 스냅샷에서 제외 (같은 순위 중복 방지)
+    """
     from core.models import Manager
+    from core.snapshots import copy_snapshot, live_snapshot_id, publish
+    conf = getattr(settings, 'RANK_REFRESH', {})
+    source = source or conf.get('SOURCE', 'http')
     start_time = time.time()
-    managers = Manager.objects.all().order_by('rank')
-    total = len(managers)
-    processed_count = 0
-    success_count = 0
-    log_interval = 100
-    batch_size = 1000  # 배치 크기 유지
-    for i in range(0, total, batch_size):
-        batch = managers[i:i+batch_size]
-        with concurrent.futures.ThreadPoolExecutor(max_workers=32) as executor:
-            futures = {executor.submit(fetch_rankings_parallel, manager): manager for manager in batch}
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result()
-                    if result is None:
-                        processed_count += 1
-                        continue
-                    
-                    manager, rankings = result
-                    if manager is None or rankings is None:
-                        processed_count += 1
-                        continue
-                    
-                    processed_count += 1
-                    if rankings:
-                        success_count += 1
-                        for rank_data in rankings:
-                            try:
-                                rank_num = int(rank_data['rank'].replace(',', ''))
-                                manager.rank = rank_num
-                                manager.level = int(rank_data['level'])
-                                manager.save()
-                                break
-                            except:
-                                continue
-                    if processed_count % log_interval == 0:
-                        log_with_time(f"[크롤링] {processed_count:,}/{total:,} 처리 완료 (성공: {success_count:,})")
-                except Exception as e:
-                    processed_count += 1
-                    continue
-        time.sleep(0.5)
+    if source == 'browser':
+        pages = pages or conf.get('BROWSER_PAGES', 1)
+        rankings = fetch_rankings_browser(pages)
+        fields = ['rank']
+    else:
+        pages = pages or conf.get('PAGES', 500)
+        rankings = fetch_rankings_http(pages)
+        fields = ['rank', 'club_value', 'team_color', 'formation', 'score']
+    latest = {row['nickname']: row for row in rankings}
+    log_with_time(f"[크롤링] 랭킹 {pages}페이지 조회 완료 ({len(latest):,}명, {source})")
+
+    base_id = live_snapshot_id()
+    managers = list(Manager.objects.filter(snapshot_id=base_id)) if base_id is not None else []
+    fetched_ranks = {row['rank'] for row in rankings}
+    changed = {}
+    stale = []
+    matched = 0
+    for manager in managers:
+        row = latest.get(manager.nickname)
+        if row is None:
+            # 순위 목록에 없는 매니저(순위권 밖, 닉네임 변경): 그 순위를 다른 매니저가 차지했으면 제외, 조회하지 못한 순위면 유지
+            if manager.rank in fetched_ranks:
+                stale.append(manager.pk)
+            continue
+        matched += 1
+        if any(getattr(manager, field) != row[field] for field in fields):
+            changed[manager.pk] = {field: row[field] for field in fields}
+    if changed or stale:
+        snapshot, player_count = copy_snapshot(base_id, changed, drop=stale)
+        publish(snapshot, player_count)
+        log_with_time(f"[DB] 순위 갱신 스냅샷 #{snapshot.pk} 공개 (이전: #{base_id}, 선수 {player_count:,}명)")
     end_time = time.time()
-    log_with_time(f"[크롤링] 전체 처리 완료 (성공: {success_count:,}/{total:,}), 소요 시간: {end_time - start_time:.2f}초") 
+    log_with_time(
+        f"[크롤링] 전체 처리 완료 (매칭: {matched:,}/{len(managers):,}, 변경: {len(changed):,}, 제외: {len(stale):,}), "
+        f"소요 시간: {end_time - start_time:.2f}초"
+    )
+    return len(changed)
 
 def validate_player_data(player_data):
     required_fields = ['spId', 'spPosition', 'spGrade']
@@ -737,69 +924,53 @@ def validate_player_data(player_data):
             return False, f"필수 필드 누락: {field}"
     return True, None
 
-def process_player_data(player_data, manager):
+def process_player_data(player_data, manager, resolve=None):
     try:
         is_valid, error_msg = validate_player_data(player_data)
         if not is_valid:
             return None, error_msg
 
-        spid = str(player_data['spId'])
-        season_id = int(spid[:3])
-        season_raw = META_SEASON.get(season_id, str(season_id))
-        season = clean_season_name(season_raw)
+        resolve = resolve or meta.player_resolver()
+        player_name, season, position = resolve(player_data['spId'], player_data['spPosition'])
 
         return {
             'manager': manager,
             'rank': manager.rank,
             'nickname': manager.nickname,
             'team_color': manager.team_color,
-            'position': META_POSITION.get(player_data['spPosition'], str(player_data['spPosition'])),
-            'player_name': META_SPID.get(spid, spid),
+            'position': position,
+            'player_name': player_name,
             'season': season,
             'grade': player_data['spGrade']
         }, None
     except Exception as e:
         return None, str(e)
 
-def save_players_to_db(match_detail_results):
-    from core.models import PlayerTemp, Player
+def save_players_to_db(match_detail_results, snapshot):
+    from core.models import Player
+    from core.snapshots import BATCH_SIZE
     success_count = 0
     error_count = 0
-    
+    # 스케줄러 외 경로(crawl_managers 명령 등)에서도 메타데이터가 준비되도록 로드
+    load_meta()
+    resolve = meta.player_resolver()
+
+    objects = []
+    for manager, squad in match_detail_results:
+        for player_data in squad:
+            processed_data, error = process_player_data(player_data, manager, resolve)
+            if processed_data:
+                objects.append(Player(snapshot=snapshot, **processed_data))
+                success_count += 1
+            else:
+                error_count += 1
+                log_with_time(f"[ERROR] 선수 데이터 처리 실패: {error}")
+
+    # 공개 전 스냅샷에만 쓰므로 조회 API와 충돌 없음 (재시도 시 이전 시도 분은 교체)
     with transaction.atomic():
-        # 기존 임시 테이블 비우기
-        PlayerTemp.objects.all().delete()
-        
-        # PlayerTemp에 데이터 저장
-        temp_objects = []
-        for manager, squad in match_detail_results:
-            for player_data in squad:
-                processed_data, error = process_player_data(player_data, manager)
-                if processed_data:
-                    temp_objects.append(PlayerTemp(**processed_data))
-                    success_count += 1
-                else:
-                    error_count += 1
-                    log_with_time(f"[ERROR] 선수 데이터 처리 실패: {error}")
-        
-        # 벌크 생성
-        PlayerTemp.objects.bulk_create(temp_objects)
-        
-        # Player 테이블 업데이트
-        Player.objects.all().delete()
-        Player.objects.bulk_create([
-            Player(
-                manager=temp.manager,
-                rank=temp.rank,
-                nickname=temp.nickname,
-                team_color=temp.team_color,
-                position=temp.position,
-                player_name=temp.player_name,
-                season=temp.season,
-                grade=temp.grade
-            ) for temp in PlayerTemp.objects.all()
-        ])
-    
+        Player.objects.filter(snapshot=snapshot).delete()
+        Player.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
     return success_count, error_count
 
 def cleanup_threads():
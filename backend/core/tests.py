@@ -1,3 +1,641 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import random
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import http, match_detail, pick_index, response_cache, snapshots, stats_cube, tasks, trends
+from core.key_scheduler import KeyScheduler
+from core.management.commands.bench_pick_rate import legacy_pick_rate
+from core.management.commands.bench_stats_cube import legacy_pick_rate_stats, legacy_team_color_stats
+from core.metrics import RECENT_RUNS, engine_collect_times
+from core.models import (
+    IngestRun, JobRun, Manager, ManagerMatchState, PickRollup, Player, SchedulerLease, Snapshot, TeamColorRollup,
+    TrendPoint,
+)
+from core.pick_batch import MAX_TOP_N, evaluate, normalize_spec
+from core.run_state import RunState, prune_runs
+from core.scheduler import CronSchedule, LeaderLease, Scheduler
+from core.standin import FORMATIONS, POSITIONS, TEAM_COLORS, LatencyModel, start_standin
+
+# 응답 캐시 테스트용 공유 캐시 (파일 캐시 대신 프로세스 메모리)
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-responses'},
+}
+
+
+def reset_snapshot_state():
+    # 스냅샷 id별로 보관하는 프로세스 전역 상태 초기화 (테스트 DB는 같은 id를 다시 쓸 수 있음)
+    pick_index._indexes.current = (None, None)
+    stats_cube._cubes.current = (None, None)
+    response_cache._lru = None
+    snapshots._watch.update(checked=None, snapshot_id=None)
+
+
+def make_snapshot(count=60, seed=7, publish=True):
+    """
+    테스트용 스냅샷: 등수 순서대로 매니저와 선발 11명 선수 행 생성
+    - 선수는 포지션마다 작은 후보 목록에서 골라 여러 매니저가 같은 선수를 쓰도록 함
+    - 점수/구단 가치는 매니저마다 달라 최솟값/최댓값 매니저가 하나로 정해짐
+    """
+    rnd = random.Random(seed)
+    club_values = rnd.sample(range(10**12, 5 * 10**12, 10**8), count)
+    managers = [
+        {
+            'rank': rank,
+            'nickname': f"매니저{rank:05d}",
+            'club_value': club_values[rank - 1],
+            'team_color': rnd.choice(TEAM_COLORS[:4]),
+            'formation': rnd.choice(list(FORMATIONS)[:3]),
+            'score': 4000 - rank * 3,
+        }
+        for rank in range(1, count + 1)
+    ]
+    snapshot = snapshots.create_snapshot(managers)
+    players = []
+    for manager in snapshot.managers.order_by('rank'):
+        for position in FORMATIONS[manager.formation]:
+            name = POSITIONS[position]
+            players.append(Player(
+                snapshot=snapshot, manager=manager, rank=manager.rank, nickname=manager.nickname,
+                team_color=manager.team_color, position=name,
+                player_name=f"{name} 선수{rnd.randint(1, 4)}", season=str(rnd.choice([101, 214, 300])),
+                grade=rnd.randint(1, 5),
+            ))
+    Player.objects.bulk_create(players)
+    if publish:
+        with mock.patch.object(snapshots, '_listeners', []), mock.patch('core.trends.record'):
+            snapshots.publish(snapshot, len(players))
+        snapshot.refresh_from_db()
+    return snapshot
+
+
+class CronScheduleTests(SimpleTestCase):
+    def test_list_with_step_item(self):
+        # 간격은 붙은 항목에만 적용 (앞의 5는 값 하나)
+        self.assertEqual(CronSchedule('5,10/20 * * * *').minutes, {5, 10, 30, 50})
+        self.assertEqual(CronSchedule('5/20 * * * *').minutes, {5, 25, 45})
+        self.assertEqual(CronSchedule('*/15 * * * *').minutes, {0, 15, 30, 45})
+        self.assertEqual(CronSchedule('0 9-17/4 * * *').hours, {9, 13, 17})
+
+    def test_weekday_seven_is_sunday(self):
+        self.assertEqual(CronSchedule('0 0 * * 7').weekdays, {0})
+
+    def test_invalid_expressions(self):
+        for expr in ('* * * *', '60 * * * *', '*/0 * * * *', '10-5 * * * *'):
+            with self.subTest(expr=expr), self.assertRaises(ValueError):
+                CronSchedule(expr)
+
+    def test_next_after_and_between(self):
+        schedule = CronSchedule('5,10/20 * * * *')
+        start = datetime.datetime(2025, 1, 1, 9, 50)
+        self.assertEqual(schedule.next_after(start), datetime.datetime(2025, 1, 1, 10, 5))
+        self.assertEqual(
+            schedule.between(start, datetime.datetime(2025, 1, 1, 10, 30)),
+            [datetime.datetime(2025, 1, 1, 10, minute) for minute in (5, 10, 30)],
+        )
+
+    def test_day_or_weekday(self):
+        # 일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행 (2025-01-01은 수요일)
+        schedule = CronSchedule('0 0 15 * 1')
+        self.assertEqual(schedule.next_after(datetime.datetime(2025, 1, 1)), datetime.datetime(2025, 1, 6))
+
+
+class SchedulerRunOnceTests(TestCase):
+    def setUp(self):
+        self.job = mock.Mock(return_value=True)
+        self.scheduler = Scheduler('crawl', self.job, cron='10 * * * *')
+
+    def test_runs_and_releases_lease(self):
+        self.assertEqual(self.scheduler.run_once(), 'succeeded')
+        self.job.assert_called_once()
+        self.assertEqual(JobRun.objects.get().job, 'crawl')
+        self.assertEqual(SchedulerLease.objects.get(name='crawl').holder, '')
+
+    def test_refuses_while_another_worker_leads(self):
+        self.assertTrue(LeaderLease('crawl', 120, holder='other:1').acquire())
+        self.assertIsNone(self.scheduler.run_once())
+        self.job.assert_not_called()
+        self.assertEqual(SchedulerLease.objects.get(name='crawl').holder, 'other:1')
+
+    def test_refuses_while_a_run_is_alive(self):
+        # 임대는 비었지만 이전 리더의 실행이 heartbeat를 보내는 중
+        now = timezone.now()
+        JobRun.objects.create(job='crawl', holder='other:1', started_at=now, heartbeat_at=now)
+        self.assertIsNone(self.scheduler.run_once())
+        self.job.assert_not_called()
+
+
+class KeySchedulerTests(SimpleTestCase):
+    def test_prefers_key_with_most_tokens(self):
+        scheduler = KeyScheduler(['a', 'b'], rate=0.001, burst=3)
+        self.assertEqual(scheduler.acquire(), 'a')
+        self.assertEqual(scheduler.acquire(), 'b')
+        self.assertEqual(scheduler.acquire(), 'a')
+        self.assertEqual([stat['requests'] for stat in scheduler.stats()], [2, 1])
+
+    def test_throttled_key_is_parked(self):
+        scheduler = KeyScheduler(['a', 'b'], rate=1000, burst=5, cooldown=60)
+        scheduler.report('a', 429)
+        self.assertEqual({scheduler.acquire() for _ in range(4)}, {'b'})
+        self.assertEqual([stat['parked'] for stat in scheduler.stats()], [True, False])
+        self.assertEqual(scheduler.stats()[0]['throttled'], 1)
+
+    def test_transport_failure_drains_key(self):
+        # 응답 없는 실패는 429로 세지 않고 해당 키의 토큰만 비워 재시도가 다른 키나 다음 토큰을 기다림
+        scheduler = KeyScheduler(['a', 'b'], rate=0.001, burst=3)
+        scheduler.report('a', None)
+        self.assertEqual({scheduler.acquire() for _ in range(3)}, {'b'})
+        self.assertEqual(scheduler.try_acquire()[0], None)
+        self.assertEqual([stat['throttled'] for stat in scheduler.stats()], [0, 0])
+
+    def test_network_errors_are_reported(self):
+        # OUID/다음 경기 조회의 타임아웃/연결 오류도 키 스케줄러에 응답 없음(None)으로 보고
+        errors = (tasks.requests.exceptions.Timeout(), tasks.requests.exceptions.ConnectionError())
+        for error in errors:
+            with self.subTest(error=type(error).__name__), \
+                    mock.patch.object(tasks, 'next_api_key', return_value='a'), \
+                    mock.patch.object(tasks, 'get_client') as get_client, \
+                    mock.patch.object(tasks.KEY_SCHEDULER, 'report') as report:
+                get_client.return_value.get.side_effect = error
+                self.assertEqual(tasks.fetch_ouid(Manager(nickname='a'), 0), (None, None))
+                self.assertIsNone(tasks.fetch_next_match_id(Manager(nickname='a'), 'ouid', 1))
+                self.assertEqual(report.call_args_list, [mock.call('a', None)] * 2)
+
+    def test_match_id_retry_does_not_sleep(self):
+        with mock.patch.object(tasks, 'next_api_key', return_value='a'), \
+                mock.patch.object(tasks, 'get_client') as get_client, \
+                mock.patch.object(tasks.KEY_SCHEDULER, 'report') as report, \
+                mock.patch.object(tasks.time, 'sleep') as sleep:
+            get_client.return_value.get.side_effect = tasks.requests.exceptions.Timeout()
+            self.assertEqual(tasks.fetch_match_id(Manager(nickname='a'), 'ouid', 1), (None, None))
+        sleep.assert_not_called()
+        report.assert_called_once_with('a', None)
+
+    def test_exhausted_keys_report_wait_time(self):
+        scheduler = KeyScheduler(['a'], rate=1, burst=1)
+        self.assertEqual(scheduler.try_acquire()[0], 'a')
+        key, wait = scheduler.try_acquire()
+        self.assertIsNone(key)
+        self.assertGreater(wait, 0)
+
+
+class ResolveOuidTests(SimpleTestCase):
+    def resolve(self, result):
+        from core.pipeline import IngestPipeline
+        pipeline = IngestPipeline()
+        pipeline.executor = ThreadPoolExecutor(max_workers=2)
+        manager = Manager(rank=1, nickname='매니저00001')
+        try:
+            with mock.patch.object(tasks, 'fetch_ouid', return_value=result) as fetch_ouid, \
+                    mock.patch('core.pipeline.asyncio.sleep') as sleep:
+                resolved = asyncio.run(pipeline._resolve_ouid(manager))
+        finally:
+            pipeline.executor.shutdown()
+        return resolved, fetch_ouid, sleep
+
+    def test_non_retryable_failure_stops(self):
+        # (매니저, None): 없는 닉네임 등 → 재시도 없이 종료
+        resolved, fetch_ouid, sleep = self.resolve((Manager(nickname='매니저00001'), None))
+        self.assertIsNone(resolved)
+        self.assertEqual(fetch_ouid.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_retryable_failure_retries(self):
+        # (None, None): 429/타임아웃 → 최대 3회, 간격은 키 스케줄러가 조절하므로 고정 대기 없음
+        resolved, fetch_ouid, sleep = self.resolve((None, None))
+        self.assertIsNone(resolved)
+        self.assertEqual([c.args[1] for c in fetch_ouid.call_args_list], [0, 1, 2])
+        sleep.assert_not_called()
+
+
+@override_settings(INGEST_RESUME_WINDOW_MINUTES=60, INGEST_RUN_RETENTION_DAYS=14)
+class PruneRunsTests(TestCase):
+    def add_run(self, run_id, status, hours_ago, finished=True):
+        at = timezone.now() - datetime.timedelta(hours=hours_ago)
+        run = IngestRun.objects.create(run_id=run_id, status=status, finished_at=at if finished else None)
+        IngestRun.objects.filter(pk=run.pk).update(started_at=at)
+        run.checkpoints.create(kind='ouid', nickname='a', value='ouid-a')
+        return run
+
+    def test_prunes_expired_checkpoints_and_old_runs(self):
+        recent_failed = self.add_run('recent-failed', 'failed', 0.5)
+        old_failed = self.add_run('old-failed', 'failed', 3)
+        running = self.add_run('running', 'running', 24 * 30, finished=False)
+        self.add_run('ancient', 'completed', 24 * 30)
+        self.assertEqual(prune_runs(), (1, 1))
+        self.assertEqual(set(IngestRun.objects.values_list('run_id', flat=True)),
+                         {'recent-failed', 'old-failed', 'running'})
+        self.assertTrue(recent_failed.checkpoints.exists())
+        self.assertFalse(old_failed.checkpoints.exists())
+        self.assertTrue(running.checkpoints.exists())
+
+    def test_new_run_prunes(self):
+        self.add_run('old-failed', 'failed', 3)
+        run_state = RunState.open()
+        self.assertNotEqual(run_state.run.run_id, 'old-failed')
+        self.assertFalse(IngestRun.objects.get(run_id='old-failed').checkpoints.exists())
+
+
+class EngineCollectTimesTests(TestCase):
+    def add_run(self, run_id, minutes_ago, engine, seconds):
+        IngestRun.objects.create(
+            run_id=run_id, status='completed', metrics={'engine': engine, 'collect_seconds': seconds},
+            finished_at=timezone.now() - datetime.timedelta(minutes=minutes_ago),
+        )
+
+    def test_latest_run_per_engine(self):
+        self.add_run('old-pipeline', 30, 'pipeline', 9.0)
+        self.add_run('threaded', 20, 'threaded', 5.0)
+        self.add_run('pipeline', 10, 'pipeline', 3.0)
+        self.assertEqual(engine_collect_times(), {'pipeline': ('pipeline', 3.0), 'threaded': ('threaded', 5.0)})
+
+    def test_only_recent_runs_are_read(self):
+        self.add_run('threaded', 60 * 24, 'threaded', 5.0)
+        for i in range(RECENT_RUNS):
+            self.add_run(f"pipeline-{i}", i, 'pipeline', 3.0)
+        self.assertEqual(set(engine_collect_times()), {'pipeline'})
+
+
+@override_settings(MATCH_DETAIL_DECODE={'MODE': 'inline'}, INGEST_RESUME_WINDOW_MINUTES=0)
+class IngestEngineTests(TransactionTestCase):
+    """대체 서버(core.standin)를 상대로 두 수집 엔진과 재개/증분 갱신 확인"""
+
+    MANAGERS = 30
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix='test_match_detail_')
+        self.server = start_standin(managers=self.MANAGERS, seed=3, latency=LatencyModel(median_ms=1, dist='fixed'))
+        self.previous_client = http._client
+        self.client_ = http.use_standin(self.server.url)
+        self.previous_fetcher = match_detail._fetcher
+        match_detail._fetcher = match_detail.MatchDetailFetcher(cache_dir=self.cache_dir)
+        self.snapshot = snapshots.create_snapshot(
+            {key: manager[key] for key in ('rank', 'nickname', 'club_value', 'team_color', 'formation', 'score')}
+            for manager in self.server.data.managers
+        )
+        self.managers = list(self.snapshot.managers.order_by('rank'))
+
+    def tearDown(self):
+        # 연결 유지 중인 대체 서버 핸들러 스레드가 남지 않도록 세션부터 닫음
+        self.client_.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        http._client = self.previous_client
+        match_detail._fetcher = self.previous_fetcher
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def new_run(self, name):
+        return RunState(IngestRun.objects.create(run_id=name))
+
+    def collect(self, run_state, engine, incremental):
+        results = tasks.collect_squads(self.managers, run_state, engine, incremental)
+        return {manager.nickname: squad for manager, squad in results}
+
+    def test_engines_return_same_squads(self):
+        pipeline = self.collect(self.new_run('pipeline'), 'pipeline', False)
+        match_detail._fetcher.start_run()
+        shutil.rmtree(self.cache_dir)
+        threaded = self.collect(self.new_run('threaded'), 'threaded', False)
+        self.assertEqual(len(pipeline), self.MANAGERS)
+        self.assertEqual(pipeline, threaded)
+        # 인접한 두 매니저가 한 경기를 공유하므로 매치 디테일 호출은 절반
+        self.assertEqual(match_detail._fetcher.stats['api'], self.MANAGERS // 2)
+
+    def test_engine_and_collect_time_recorded_on_run(self):
+        for engine in ('pipeline', 'threaded'):
+            run_state = self.new_run(engine)
+            self.collect(run_state, engine, False)
+            run_state.finish('completed')
+            metrics = IngestRun.objects.get(run_id=engine).metrics
+            self.assertEqual(metrics['engine'], engine)
+            self.assertGreater(metrics['collect_seconds'], 0)
+        self.assertEqual(set(engine_collect_times()), {'pipeline', 'threaded'})
+
+    def test_incremental_run_carries_unchanged_squads(self):
+        first = self.collect(self.new_run('first'), 'pipeline', True)
+        self.assertEqual(ManagerMatchState.objects.count(), self.MANAGERS)
+        for engine in ('pipeline', 'threaded'):
+            with self.subTest(engine=engine):
+                run_state = self.new_run(f"again-{engine}")
+                self.assertEqual(self.collect(run_state, engine, True), first)
+                self.assertEqual(run_state.metrics.counters['squads_carried'], self.MANAGERS)
+                self.assertEqual(match_detail._fetcher.stats['api'], 0)
+
+    def test_resumed_match_ids_still_carry_over(self):
+        # 체크포인트에서 이어받은 MATCH ID도 최신 경기 여부를 기억해 이전 스쿼드를 이어받아야 함
+        for engine in ('pipeline', 'threaded'):
+            with self.subTest(engine=engine):
+                run_state = self.new_run(f"resume-{engine}")
+                first = self.collect(run_state, engine, True)
+                run_state.run.checkpoints.filter(kind='squad').delete()
+                self.assertTrue(all(
+                    RunState.is_latest(value) for value in
+                    run_state.run.checkpoints.filter(kind='match').values_list('value', flat=True)
+                ))
+                resumed = RunState.open(run_state.run.run_id)
+                self.assertEqual(len(resumed.match_ids), self.MANAGERS)
+                self.assertEqual(self.collect(resumed, engine, True), first)
+                self.assertEqual(resumed.metrics.counters['squads_carried'], self.MANAGERS)
+                self.assertEqual(resumed.metrics.counters['squads_fetched'], 0)
+                self.assertEqual(match_detail._fetcher.stats['api'], 0)
+
+
+class SnapshotPublishTests(TestCase):
+    def setUp(self):
+        reset_snapshot_state()
+        listeners = mock.patch.object(snapshots, '_listeners', [])
+        listeners.start()
+        self.addCleanup(listeners.stop)
+
+    def test_publish_swaps_pointer_and_retires_previous(self):
+        first = make_snapshot(count=10)
+        second = make_snapshot(count=10, seed=8)
+        self.assertEqual(snapshots.live_snapshot_id(), second.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'retired')
+        self.assertEqual(second.status, 'live')
+
+    def test_prune_failure_does_not_fail_publish(self):
+        first = make_snapshot(count=10)
+        second = snapshots.create_snapshot([{'rank': 1, 'nickname': 'a', 'club_value': 1, 'team_color': '',
+                                             'formation': '', 'score': 1}])
+        with mock.patch.object(snapshots, 'prune_snapshots', side_effect=OperationalError('database is locked')):
+            previous_id = snapshots.publish(second, 0)
+        self.assertEqual(previous_id, first.pk)
+        self.assertEqual(snapshots.live_snapshot_id(), second.pk)
+
+    @override_settings(SNAPSHOT_RETENTION_HOURS=1)
+    def test_prune_keeps_live_and_previous(self):
+        old = [make_snapshot(count=5, seed=seed) for seed in range(4)]
+        Snapshot.objects.update(started_at=timezone.now() - datetime.timedelta(hours=5),
+                                published_at=timezone.now() - datetime.timedelta(hours=5))
+        removed = snapshots.prune_snapshots()
+        self.assertEqual(sorted(removed), [snapshot.pk for snapshot in old[:2]])
+        self.assertEqual(set(Snapshot.objects.values_list('pk', flat=True)), {old[2].pk, old[3].pk})
+        self.assertFalse(Player.objects.filter(snapshot_id__in=removed).exists())
+        self.assertFalse(Manager.objects.filter(snapshot_id__in=removed).exists())
+
+    def test_failure_after_publish_is_not_retried(self):
+        # 공개 이후 단계(실행 기록 저장 등)가 실패해도 공개한 스냅샷을 다시 수집하거나 failed로 바꾸지 않음
+        snapshot = make_snapshot(count=5, publish=False)
+        finish = mock.patch.object(RunState, 'finish', side_effect=[OperationalError('database is locked'), None])
+        with mock.patch.object(tasks, 'collect_squads', return_value=[]) as collect_squads, \
+                mock.patch.object(tasks, 'save_players_to_db', return_value=(55, 0)), \
+                mock.patch.object(tasks.time, 'sleep') as sleep, finish:
+            self.assertTrue(tasks.fetch_and_save_players_for_all_managers(snapshot=snapshot))
+        self.assertEqual(collect_squads.call_count, 1)
+        sleep.assert_not_called()
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.status, 'live')
+        self.assertEqual(snapshots.live_snapshot_id(), snapshot.pk)
+
+    def test_rank_refresh_publishes_new_snapshot(self):
+        base = make_snapshot(count=20)
+        base_ranks = dict(base.managers.values_list('nickname', 'rank'))
+        base_players = list(Player.objects.filter(snapshot=base).order_by('pk').values_list('rank', 'team_color'))
+        rankings = [
+            {'nickname': nickname, 'rank': 21 - rank, 'club_value': 1, 'team_color': '첼시', 'formation': '4-4-2',
+             'score': 1000 + rank}
+            for nickname, rank in base_ranks.items()
+        ]
+        with mock.patch.object(tasks, 'fetch_rankings_http', return_value=rankings):
+            self.assertEqual(tasks.fetch_rankings_for_all_managers(pages=1), 20)
+
+        # 공개돼 있던 스냅샷은 그대로
+        self.assertEqual(dict(base.managers.values_list('nickname', 'rank')), base_ranks)
+        self.assertEqual(list(Player.objects.filter(snapshot=base).order_by('pk').values_list('rank', 'team_color')),
+                         base_players)
+        refreshed = Snapshot.objects.get(pk=snapshots.live_snapshot_id())
+        self.assertNotEqual(refreshed.pk, base.pk)
+        self.assertEqual(refreshed.source, 'rank_refresh')
+        self.assertEqual(refreshed.player_count, len(base_players))
+        self.assertEqual(snapshots.latest_ingested_snapshot().pk, base.pk)
+        top = refreshed.managers.get(rank=1)
+        self.assertEqual(top.nickname, '매니저00020')
+        self.assertEqual(set(top.players.values_list('rank', 'team_color')), {(1, '첼시')})
+        # 색인은 새 스냅샷 id로 만들어져 바뀐 순위를 반영
+        self.assertEqual(pick_index.get_index(refreshed.pk).view('').manager_count(1), 1)
+        self.assertEqual(pick_index.get_index(refreshed.pk).view('첼시').manager_count(20), 20)
+
+
+    def test_rank_refresh_drops_displaced_managers(self):
+        # 1~5위만 조회: 2위였던 매니저00002는 목록에 없고 그 순위를 매니저00006이 차지 → 제외
+        # 6위 이하(조회하지 않은 순위)는 이전 순위 유지
+        base = make_snapshot(count=10)
+        rankings = [
+            {'nickname': f"매니저{rank:05d}", 'rank': new_rank, 'club_value': 1, 'team_color': '첼시',
+             'formation': '4-4-2', 'score': 1}
+            for rank, new_rank in ((1, 1), (6, 2), (3, 3), (4, 4), (5, 5))
+        ]
+        with mock.patch.object(tasks, 'fetch_rankings_http', return_value=rankings), \
+                mock.patch('core.trends.record') as record:
+            tasks.fetch_rankings_for_all_managers(pages=1)
+        record.assert_not_called()
+        refreshed = Snapshot.objects.get(pk=snapshots.live_snapshot_id())
+        self.assertNotEqual(refreshed.pk, base.pk)
+        ranks = dict(refreshed.managers.values_list('nickname', 'rank'))
+        self.assertNotIn('매니저00002', ranks)
+        self.assertEqual(sorted(ranks.values()), [1, 2, 3, 4, 5, 7, 8, 9, 10])
+        self.assertEqual(refreshed.manager_count, 9)
+        self.assertEqual(refreshed.player_count, refreshed.players.count())
+        self.assertFalse(refreshed.players.filter(nickname='매니저00002').exists())
+
+
+class CrawlOnceTests(TestCase):
+    def setUp(self):
+        reset_snapshot_state()
+        listeners = mock.patch.object(snapshots, '_listeners', [])
+        listeners.start()
+        self.addCleanup(listeners.stop)
+
+    def test_failed_ingest_is_retried_even_with_live_data(self):
+        # 이미 공개된 스냅샷이 있어도 이번 시도에서 새로 공개하지 못하면 실패
+        from core.apps import crawl_once
+        make_snapshot(count=5)
+        with mock.patch('core.apps.call_command') as call_command, mock.patch('core.apps.time.sleep') as sleep:
+            self.assertFalse(crawl_once())
+        self.assertEqual(call_command.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_new_snapshot_counts_as_success(self):
+        from core.apps import crawl_once
+        make_snapshot(count=5)
+        with mock.patch('core.apps.call_command', side_effect=lambda name: make_snapshot(count=5, seed=8)), \
+                mock.patch('core.apps.time.sleep') as sleep:
+            self.assertTrue(crawl_once())
+        sleep.assert_not_called()
+
+    def test_crawl_managers_raises_when_ingest_fails(self):
+        from django.core.management import CommandError, call_command
+        page = [{'rank': 1, 'nickname': 'a', 'club_value': 1, 'team_color': '', 'formation': '', 'score': 1}]
+        with mock.patch('core.management.commands.crawl_managers.crawl_page_safe', return_value=(page, None)), \
+                mock.patch('core.ouid_cache.warm_ouid_cache'), \
+                mock.patch.object(tasks, 'fetch_and_save_players_for_all_managers', return_value=False), \
+                self.assertRaises(CommandError):
+            call_command('crawl_managers')
+
+
+class AnalyticsTests(TestCase):
+    """픽률 색인/통계 큐브/일괄 조회는 기존 ORM 집계와 같은 결과"""
+
+    RANK_RANGES = (1, 7, 25, 60, 100)
+
+    def setUp(self):
+        reset_snapshot_state()
+        self.snapshot = make_snapshot()
+
+    def test_pick_index_matches_legacy(self):
+        index = pick_index.PickRateIndex(self.snapshot.pk)
+        for team_color in [''] + TEAM_COLORS[:4]:
+            view = index.view(team_color)
+            for rank_range in self.RANK_RANGES:
+                for top_n in (3, 10):
+                    with self.subTest(team_color=team_color, rank_range=rank_range, top_n=top_n):
+                        manager_count = view.manager_count(rank_range)
+                        self.assertEqual(
+                            (manager_count, view.pick_rate(rank_range, top_n, manager_count)),
+                            legacy_pick_rate(self.snapshot.pk, rank_range, team_color, top_n),
+                        )
+
+    def test_stats_cube_matches_legacy(self):
+        cube = stats_cube.StatsCube(self.snapshot.pk)
+        for rank_range in self.RANK_RANGES:
+            with self.subTest(rank_range=rank_range):
+                self.assertEqual(cube.team_color_stats(rank_range, 10),
+                                 legacy_team_color_stats(self.snapshot.pk, rank_range, 10))
+                for team_color in [''] + TEAM_COLORS[:4]:
+                    self.assertEqual(cube.pick_rate_stats(rank_range, team_color),
+                                     legacy_pick_rate_stats(self.snapshot.pk, rank_range, team_color))
+
+    def test_batch_spec_validation(self):
+        for raw in ({'rank_min': 0}, {'rank_min': 10, 'rank_max': 5}, {'top_n': 'x'}, {'team_colors': [1]}, []):
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                normalize_spec(raw)
+        self.assertEqual(normalize_spec({'top_n': 1000})['top_n'], MAX_TOP_N)
+        self.assertEqual(normalize_spec({'top_n': -3})['top_n'], 1)
+        self.assertEqual(normalize_spec({'rank_range': 50, 'team_color': '리버풀'}),
+                         {'rank_min': 1, 'rank_max': 50, 'team_colors': ['리버풀'], 'formations': [], 'top_n': 3})
+
+    def test_batch_view_rejects_invalid_spec(self):
+        response = self.client.post('/api/pick-rate/batch/', {'specs': [{}, {'rank_min': 9, 'rank_max': 3}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['error'].startswith('specs[1]:'))
+
+    def test_batch_scan_matches_index(self):
+        # 모든 포메이션을 조건으로 주면 색인 대신 순회 경로로 계산되지만 결과는 같아야 함
+        formations = sorted(set(self.snapshot.managers.values_list('formation', flat=True)))
+        specs = []
+        for rank_max in (7, 25, 60):
+            for team_color in ('', TEAM_COLORS[0]):
+                specs.append(normalize_spec({'rank_max': rank_max, 'team_color': team_color, 'top_n': 5}))
+                specs.append(normalize_spec({'rank_max': rank_max, 'team_color': team_color, 'top_n': 5,
+                                             'formations': formations}))
+        results = evaluate(self.snapshot, specs)
+        for fast, scan in zip(results[::2], results[1::2]):
+            with self.subTest(spec=scan['spec']):
+                fast.pop('spec'), scan.pop('spec')
+                self.assertEqual(fast, scan)
+
+    def test_batch_rank_window(self):
+        spec = normalize_spec({'rank_min': 11, 'rank_max': 20})
+        result, = evaluate(self.snapshot, [spec])
+        self.assertEqual(result['manager_count'], 10)
+        self.assertEqual(result['rank_stats']['max'], 11)
+        self.assertEqual(result['rank_stats']['min'], 20)
+
+
+@override_settings(CACHES=TEST_CACHES, SNAPSHOT_POLL_SECONDS=3600)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        reset_snapshot_state()
+        from django.core.cache import caches
+        caches['responses'].clear()
+        listeners = mock.patch.object(snapshots, '_listeners', [])
+        listeners.start()
+        self.addCleanup(listeners.stop)
+        self.first = make_snapshot(count=20, seed=1)
+
+    def get(self, path, **headers):
+        return self.client.get(path, HTTP_ACCEPT='application/json', **headers)
+
+    def test_etag_and_not_modified(self):
+        response = self.get('/api/pick-rate/?rank_range=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['manager_count'], 10)
+        etag = response['ETag']
+        self.assertEqual(self.get('/api/pick-rate/?rank_range=10', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertIn(f"pick-rate:{self.first.pk}:", ''.join(response_cache.get_lru().items))
+
+    def test_new_snapshot_is_served_under_its_own_key(self):
+        # 폴링 간격 안에 포인터가 바뀌어도 키와 뷰가 읽는 스냅샷은 모두 새 스냅샷
+        first = self.get('/api/pick-rate/?rank_range=100')
+        self.assertEqual(first.json()['manager_count'], 20)
+        second = make_snapshot(count=30, seed=2)
+        response = self.get('/api/pick-rate/?rank_range=100', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['manager_count'], 30)
+        self.assertIn(f"pick-rate:{second.pk}:rank_range=100", ''.join(response_cache.get_lru().items))
+        second.refresh_from_db()
+        self.assertEqual(self.get('/api/base-date/').json()['base_date'],
+                         second.published_at.strftime('%y년 %m월 %d일 %H시 %M분 %S초 데이터'))
+
+    def test_team_color_stats_cached_per_snapshot(self):
+        before = self.get('/api/team-color-stats/?rank_range=100').json()['results']
+        make_snapshot(count=30, seed=2)
+        after = self.get('/api/team-color-stats/?rank_range=100').json()['results']
+        self.assertEqual(sum(item['count'] for item in before), 20)
+        self.assertEqual(sum(item['count'] for item in after), 30)
+
+
+class TrendTests(TestCase):
+    def setUp(self):
+        reset_snapshot_state()
+
+    def test_record_counts_each_manager_once(self):
+        snapshot = make_snapshot(count=30)
+        point, _, players = trends.record_snapshot(snapshot)
+        self.assertEqual(players, 330)
+        self.assertIsNone(trends.record_snapshot(snapshot))
+        # 전체 시즌/강화단계 행은 해당 선수를 한 번 이상 쓴 매니저 수
+        player_name = Player.objects.filter(snapshot=snapshot, position='GK').values_list('player_name', flat=True)[0]
+        expected = Player.objects.filter(snapshot=snapshot, position='GK', player_name=player_name) \
+            .values('manager_id').distinct().count()
+        rollup = PickRollup.objects.get(point=point, position='GK', player_name=player_name, season='', grade=0,
+                                        rank_bucket=100)
+        self.assertEqual(rollup.user_count, expected)
+        self.assertEqual(TeamColorRollup.objects.get(point=point, team_color='', rank_bucket=100).manager_count, 30)
+
+        series = trends.player_trend('GK', player_name, 100, days=7)
+        self.assertEqual(series[-1]['user_count'], expected)
+        self.assertEqual(series[-1]['usage_rate'], round(expected * 100.0 / 30, 1))
+
+    @override_settings(PICK_TREND={'RANK_BUCKETS': [100], 'HOURLY_DAYS': 2, 'DAILY_DAYS': 90})
+    def test_downsample_merges_hourly_points(self):
+        now = timezone.now()
+        day = trends.day_start(now - datetime.timedelta(days=5))
+        for hour, count in ((3, 20), (9, 30)):
+            snapshot = make_snapshot(count=count, seed=hour)
+            Snapshot.objects.filter(pk=snapshot.pk).update(published_at=day + datetime.timedelta(hours=hour))
+            snapshot.refresh_from_db()
+            trends.record_snapshot(snapshot)
+        merged, expired = trends.downsample(now)
+        self.assertEqual((merged, expired), (2, 0))
+        point = TrendPoint.objects.get()
+        self.assertEqual((point.period, point.at, point.samples), ('day', day, 2))
+        self.assertEqual(TeamColorRollup.objects.get(point=point, team_color='').manager_count, 50)
+        series = trends.team_color_trend('', 100, days=7)
+        self.assertEqual([(item['period'], item['manager_count']) for item in series], [('day', 25.0)])
+        # 보관 기간이 지나면 삭제
+        trends.downsample(now + datetime.timedelta(days=100))
+        self.assertFalse(TrendPoint.objects.exists())
+        self.assertFalse(PickRollup.objects.exists())
 
-# Create your tests here.
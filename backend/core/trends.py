@@ -0,0 +1,245 @@
+import datetime
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.snapshots import BATCH_SIZE
+
+# 추이 조회 기간 기본값(일)
+DEFAULT_DAYS = 7
+
+# 시즌/강화단계 조건 없이 묶은 집계 행의 값
+ALL_SEASONS = ''
+ALL_GRADES = 0
+
+
+def get_config():
+    conf = getattr(settings, 'PICK_TREND', {})
+    return {
+        'RANK_BUCKETS': sorted(conf.get('RANK_BUCKETS', [100, 500, 1000, 5000, 10000])),
+        'HOURLY_DAYS': conf.get('HOURLY_DAYS', 2),
+        'DAILY_DAYS': conf.get('DAILY_DAYS', 90),
+    }
+
+
+def rank_bucket(rank, bounds):
+    # 등수가 속한 구간의 상한 (마지막 상한보다 낮은 순위면 None)
+    idx = bisect_left(bounds, rank)
+    return bounds[idx] if idx < len(bounds) else None
+
+
+def snap_rank_range(rank_range, bounds=None):
+    # 조회 rank_range를 구간 상한 중 하나로 맞춤 (rank_range 이하의 가장 큰 상한, 없으면 첫 상한)
+    bounds = bounds or get_config()['RANK_BUCKETS']
+    eligible = [bound for bound in bounds if bound <= rank_range]
+    return eligible[-1] if eligible else bounds[0]
+
+
+def day_start(value):
+    return datetime.datetime.combine(value.date(), datetime.time.min)
+
+
+def record_snapshot(snapshot):
+    """
+    공개된 스냅샷 하나를 시간 단위 추이 시점으로 저장 (이미 저장된 스냅샷이면 건너뜀)
+    - 포지션 그룹/선수 조합/등수 구간별 사용 매니저 수 (매니저당 한 번, 픽률 조회와 같은 기준)
+    - 시즌/강화단계를 묶은 사용 매니저 수도 함께 저장 (season='' 또는 grade=0 행, 여러 시즌을 쓴 매니저도 한 번)
+    - 팀컬러/등수 구간별 매니저 수와 전체 매니저 수(team_color='')
+    """
+    from core.models import PickRollup, TeamColorRollup, TrendPoint
+    from core.pick_index import PlayerRows
+    if TrendPoint.objects.filter(period='hour', at=snapshot.published_at).exists():
+        return None
+
+    bounds = get_config()['RANK_BUCKETS']
+    rows = PlayerRows(snapshot.pk)
+    picks = Counter()
+    colors = Counter()
+    for idx, manager in enumerate(rows.managers):
+        bucket = rank_bucket(manager[1], bounds)
+        if bucket is None:
+            continue
+        colors['', bucket] += 1
+        if manager[3]:
+            colors[manager[3], bucket] += 1
+        keys = set()
+        for row in range(rows.row_start[idx], rows.row_start[idx + 1]):
+            group = rows.groups[rows.row_group[row]]
+            player_name, season, grade = rows.keys[rows.row_key[row]]
+            keys.update((
+                (group, player_name, season, grade),
+                (group, player_name, season, ALL_GRADES),
+                (group, player_name, ALL_SEASONS, grade),
+                (group, player_name, ALL_SEASONS, ALL_GRADES),
+            ))
+        for key in keys:
+            picks[key + (bucket,)] += 1
+
+    # 집계는 트랜잭션 밖에서 끝내고 저장만 한 번에 (쓰기 잠금 시간 최소화)
+    with transaction.atomic():
+        point = TrendPoint.objects.create(period='hour', at=snapshot.published_at, snapshot_id=snapshot.pk)
+        PickRollup.objects.bulk_create(
+            [
+                PickRollup(point=point, position=position, player_name=player_name, season=season, grade=grade,
+                           rank_bucket=bucket, user_count=count)
+                for (position, player_name, season, grade, bucket), count in picks.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        TeamColorRollup.objects.bulk_create(
+            [
+                TeamColorRollup(point=point, team_color=team_color, rank_bucket=bucket, manager_count=count)
+                for (team_color, bucket), count in colors.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return point, len(picks), len(rows.row_pk)
+
+
+def downsample(now=None):
+    """
+    HOURLY_DAYS보다 오래된 날짜의 시간 단위 시점을 날짜별 일 단위 시점 하나로 합침
+    - 집계 값은 합계로 보관하고 samples에 합친 스냅샷 수를 더함 (조회 시 평균/비율 계산)
+    - 같은 날짜의 일 단위 시점이 이미 있으면 그 값까지 다시 합침
+    - DAILY_DAYS보다 오래된 일 단위 시점은 삭제
+    """
+    from core.models import PickRollup, TeamColorRollup, TrendPoint
+    config = get_config()
+    now = now or timezone.now()
+    cutoff = day_start(now - datetime.timedelta(days=config['HOURLY_DAYS']))
+
+    by_day = {}
+    for point in TrendPoint.objects.filter(period='hour', at__lt=cutoff).order_by('at'):
+        by_day.setdefault(day_start(point.at), []).append(point)
+
+    merged = 0
+    for day, points in by_day.items():
+        with transaction.atomic():
+            day_point, _ = TrendPoint.objects.get_or_create(period='day', at=day, defaults={'samples': 0})
+            ids = [point.pk for point in points] + [day_point.pk]
+            picks = list(
+                PickRollup.objects.filter(point_id__in=ids)
+                .values_list('position', 'player_name', 'season', 'grade', 'rank_bucket')
+                .annotate(total=Sum('user_count'))
+            )
+            colors = list(
+                TeamColorRollup.objects.filter(point_id__in=ids)
+                .values_list('team_color', 'rank_bucket')
+                .annotate(total=Sum('manager_count'))
+            )
+            PickRollup.objects.filter(point=day_point).delete()
+            TeamColorRollup.objects.filter(point=day_point).delete()
+            PickRollup.objects.bulk_create(
+                [
+                    PickRollup(point=day_point, position=position, player_name=player_name, season=season,
+                               grade=grade, rank_bucket=bucket, user_count=total)
+                    for position, player_name, season, grade, bucket, total in picks
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            TeamColorRollup.objects.bulk_create(
+                [
+                    TeamColorRollup(point=day_point, team_color=team_color, rank_bucket=bucket, manager_count=total)
+                    for team_color, bucket, total in colors
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            day_point.samples += sum(point.samples for point in points)
+            day_point.save(update_fields=['samples'])
+            TrendPoint.objects.filter(pk__in=[point.pk for point in points]).delete()
+        merged += len(points)
+
+    expired, _ = TrendPoint.objects.filter(
+        period='day', at__lt=day_start(now - datetime.timedelta(days=config['DAILY_DAYS']))
+    ).delete()
+    return merged, expired
+
+
+def record(snapshot):
+    # 스냅샷 공개 직후 호출: 시간 단위 시점 저장 + 오래된 시점 일 단위로 합치기 (실패해도 공개에는 영향 없음)
+    started = time.monotonic()
+    try:
+        saved = record_snapshot(snapshot)
+        merged, _ = downsample()
+    except Exception as e:
+        print(f"[추이] 스냅샷 #{snapshot.pk} 집계 저장 실패: {e}")
+        return
+    if saved is not None:
+        _, rollups, players = saved
+        print(
+            f"[추이] 스냅샷 #{snapshot.pk} 집계 {rollups:,}행 저장 (선수 행 {players:,}), "
+            f"일 단위로 합친 시점 {merged}개 ({time.monotonic() - started:.1f}s)"
+        )
+
+
+def _average(total, samples):
+    # 시간 단위 시점은 값 그대로, 일 단위 시점은 스냅샷당 평균
+    return total if samples == 1 else round(total / samples, 1)
+
+
+def _points(days):
+    from core.models import TrendPoint
+    # 시작 날짜의 일 단위 시점(0시)도 포함되도록 날짜 단위로 자름
+    since = day_start(timezone.now() - datetime.timedelta(days=days))
+    return list(TrendPoint.objects.filter(at__gte=since).order_by('at'))
+
+
+def _totals(queryset, field):
+    return dict(queryset.values_list('point_id').annotate(total=Sum(field)))
+
+
+def player_trend(position, player_name, rank_range, days=DEFAULT_DAYS, season=None, grade=None):
+    """
+    선수의 포지션 그룹 사용률 시계열 (rank_range 이하 등수 구간 합계, 시점마다 한 항목)
+    - season/grade를 지정하지 않으면 해당 선수의 모든 시즌/강화단계 중 하나 이상을 쓴 매니저 수
+    """
+    from core.models import PickRollup, TeamColorRollup
+    points = _points(days)
+    ids = [point.pk for point in points]
+    picks = PickRollup.objects.filter(point_id__in=ids, position=position, player_name=player_name,
+                                      rank_bucket__lte=rank_range,
+                                      season=ALL_SEASONS if season is None else season,
+                                      grade=ALL_GRADES if grade is None else grade)
+    users = _totals(picks, 'user_count')
+    managers = _totals(
+        TeamColorRollup.objects.filter(point_id__in=ids, team_color='', rank_bucket__lte=rank_range), 'manager_count'
+    )
+    series = []
+    for point in points:
+        user_count, manager_count = users.get(point.pk, 0), managers.get(point.pk, 0)
+        series.append({
+            'at': point.at.strftime('%Y-%m-%d %H:%M'),
+            'period': point.period,
+            'samples': point.samples,
+            'user_count': _average(user_count, point.samples),
+            'manager_count': _average(manager_count, point.samples),
+            'usage_rate': round(user_count * 100.0 / manager_count, 1) if manager_count else 0.0,
+        })
+    return series
+
+
+def team_color_trend(team_color, rank_range, days=DEFAULT_DAYS):
+    # 팀컬러 매니저 수/비율 시계열 (rank_range 이하 등수 구간 합계)
+    from core.models import TeamColorRollup
+    points = _points(days)
+    ids = [point.pk for point in points]
+    rollups = TeamColorRollup.objects.filter(point_id__in=ids, rank_bucket__lte=rank_range)
+    counts = _totals(rollups.filter(team_color=team_color), 'manager_count')
+    managers = _totals(rollups.filter(team_color=''), 'manager_count')
+    series = []
+    for point in points:
+        count, manager_count = counts.get(point.pk, 0), managers.get(point.pk, 0)
+        series.append({
+            'at': point.at.strftime('%Y-%m-%d %H:%M'),
+            'period': point.period,
+            'samples': point.samples,
+            'count': _average(count, point.samples),
+            'manager_count': _average(manager_count, point.samples),
+            'percentage': round(count * 100.0 / manager_count, 1) if manager_count else 0.0,
+        })
+    return series
@@ -12,9 +12,13 @@ urlpatterns = [
     # ... existing urls ...
     path('api/player/', views.player_list, name='player_list'),
     path('api/pick-rate/', views.get_pick_rate, name='pick-rate'),
+    path('api/pick-rate/batch/', views.get_pick_rate_batch, name='pick-rate-batch'),
+    path('api/pick-rate/trend/', views.get_pick_rate_trend, name='pick-rate-trend'),
     path('api/base-date/', views.get_base_date, name='base-date'),
+    path('api/players/search/', views.search_players, name='players-search'),
     path('api/team-color-stats/', views.get_team_color_stats, name='team-color-stats'),
     path('api/log-visitor/', views.log_visitor, name='log-visitor'),
     path('api/today-visitor-count/', views.today_visitor_count, name='today-visitor-count'),
+    path('api/admin/ingest-metrics/', views.ingest_metrics, name='ingest-metrics'),
     path('api/', include(router.urls)),
 ]
\ No newline at end of file
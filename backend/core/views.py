@@ -1,45 +1,33 @@
 from django.shortcuts import render
 import json
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_GET
-from core.models import Player
-import requests
-from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from django.db.models import Count, F, Value, CharField
 from django.db.models.functions import Concat
-from .models import Manager, Player, Notice, Update, Resource, VisitorLog, Review
+from .models import Notice, Update, Resource, VisitorLog, Review, Snapshot
+from .snapshots import live_players, live_snapshot_id
+from .pick_index import get_index as get_pick_index
+from .stats_cube import get_cube as get_stats_cube
+from .response_cache import request_snapshot_id, snapshot_cached
 from collections import defaultdict
 from rest_framework.renderers import JSONRenderer
 from rest_framework import viewsets
 from .serializers import NoticeSerializer, UpdateSerializer, ResourceSerializer, ReviewSerializer
 from rest_framework.permissions import IsAdminUser
 from django.utils import timezone
-
-META_SPID_URL = 'https://open.api.nexon.com/static/fconline/meta/spid.json'
-META_SEASON_URL = 'https://open.api.nexon.com/static/fconline/meta/seasonid.json'
-META_POSITION_URL = 'https://open.api.nexon.com/static/fconline/meta/spposition.json'
-
-META_SPID = None
-META_SEASON = None
-META_POSITION = None
-
-# 서버 시작 시 메타데이터 캐싱
-if META_SPID is None:
-    META_SPID = {str(item['id']): item['name'] for item in requests.get(META_SPID_URL).json()}
-if META_SEASON is None:
-    META_SEASON = {int(item['seasonId']): item['className'] for item in requests.get(META_SEASON_URL).json()}
-if META_POSITION is None:
-    META_POSITION = {int(item['spposition']): item['desc'] for item in requests.get(META_POSITION_URL).json()}
+from core import meta
 
 @require_GET
 def player_list(request):
     match_id = request.GET.get('match_id')
-    qs = Player.objects.all().select_related('manager')
+    qs = live_players().select_related('manager')
     if match_id:
         qs = qs.filter(match_id=match_id)
     qs = qs.order_by('manager__rank', 'position_id')
 
+    spid_names, season_names, position_names = meta.spid_names(), meta.season_names(), meta.position_names()
     result = []
     for p in qs:
         spid_str = str(p.spid)
@@ -49,14 +37,26 @@ def player_list(request):
             '순위': p.manager.rank,
             '닉네임': p.manager.nickname,
             '팀컬러': p.manager.team_color,
-            '포지션': META_POSITION.get(position_id, position_id),
-            '선수 이름': META_SPID.get(spid_str, spid_str),
-            '시즌': META_SEASON.get(season_id, season_id),
+            '포지션': position_names.get(position_id, position_id),
+            '선수 이름': spid_names.get(spid_str, spid_str),
+            '시즌': season_names.get(season_id, season_id),
             '강화단계': p.grade,
             '등록시간': p.created_at.strftime('%Y-%m-%d %H:%M:%S'),
         })
     return JsonResponse(result, safe=False)
 
+def pick_rate_params(query):
+    # 응답 캐시 키용 조회 조건 (뷰와 같은 기본값/변환, 숫자가 아니면 None)
+    try:
+        return {
+            'rank_range': int(query.get('rank_range', 100)),
+            'team_color': query.get('team_color', ''),
+            'top_n': int(query.get('top_n', 3)),
+        }
+    except ValueError:
+        return None
+
+@snapshot_cached('pick-rate', pick_rate_params)
 @api_view(['GET'])
 def get_pick_rate(request):
     try:
@@ -64,169 +64,45 @@ def get_pick_rate(request):
         team_color = request.GET.get('team_color', '')
         top_n = int(request.GET.get('top_n', 3))
 
-        # 1. 매니저 필터링
+        # 1. 매니저 필터링 (스냅샷별 색인/통계 큐브)
         try:
-            manager_filter = {'rank__lte': rank_range}
-            if team_color:
-                manager_filter['team_color'] = team_color
-            filtered_managers = Manager.objects.filter(**manager_filter)
+            snapshot_id = request_snapshot_id(request)
+            index = get_pick_index(snapshot_id).view(team_color) if snapshot_id is not None else None
         except Exception as e:
             return Response({"error": f"[1] Manager 필터링 오류: {str(e)}"}, status=400)
 
-        if not filtered_managers.exists():
-            return Response({"error": "[1] 조건에 일치하는 매니저가 없습니다."}, status=404)
-
         # 1-1. 조회 인원(매니저 수)
         try:
-            manager_count = filtered_managers.count()
+            manager_count = index.manager_count(rank_range) if index is not None else 0
         except Exception as e:
             return Response({"error": f"[1-1] 매니저 수 계산 오류: {str(e)}"}, status=400)
 
-        # 1-2. 포메이션 집계
-        try:
-            formation_stats = (
-                filtered_managers.values('formation')
-                .annotate(count=Count('id'))
-                .order_by('-count')
-            )
-            formation_total = manager_count if manager_count else 1
-            formation_rank = [
-                {
-                    'rank': idx + 1,
-                    'formation': f['formation'],
-                    'percentage': round(f['count'] * 100.0 / formation_total, 1),
-                    'count': f['count'],
-                    'top_users': list(
-                        filtered_managers.filter(formation=f['formation'])
-                        .values_list('nickname', flat=True)
-                        .order_by('rank')[:3]
-                    )
-                }
-                for idx, f in enumerate(formation_stats)
-            ]
-        except Exception as e:
-            return Response({"error": f"[1-2] 포메이션 집계 오류: {str(e)}"}, status=400)
+        if not manager_count:
+            return Response({"error": "[1] 조건에 일치하는 매니저가 없습니다."}, status=404)
 
-        # 1-3. 평균/최저/최고 등수(점수), 구단가치
+        # 1-2. 포메이션 집계, 1-3. 평균/최저/최고 등수(점수), 구단가치 (통계 큐브를 rank_range/팀컬러로 합산)
         try:
-            rank_list = list(filtered_managers.values_list('rank', flat=True))
-            score_list = list(filtered_managers.values_list('score', flat=True))
-            club_value_list = list(filtered_managers.values_list('club_value', flat=True))
-            
-            def safe_stats(lst, managers, field, is_rank=False):
-                if not lst:
-                    return {'avg': None, 'min': None, 'max': None, 'min_nickname': None, 'max_nickname': None}
-                try:
-                    min_value = min(lst)
-                    max_value = max(lst)
-                    min_manager = managers.filter(**{field: min_value}).first()
-                    max_manager = managers.filter(**{field: max_value}).first()
-                    if is_rank:
-                        # 등수는 min이 최고, max가 최저
-                        return {
-                            'avg': round(sum(lst) / len(lst), 1),
-                            'max': min_value,
-                            'min': max_value,
-                            'max_nickname': min_manager.nickname if min_manager else None,
-                            'min_nickname': max_manager.nickname if max_manager else None
-                        }
-                    else:
-                        return {
-                            'avg': round(sum(lst) / len(lst), 1),
-                            'min': min_value,
-                            'max': max_value,
-                            'min_nickname': min_manager.nickname if min_manager else None,
-                            'max_nickname': max_manager.nickname if max_manager else None
-                        }
-                except Exception as e:
-                    return {'avg': None, 'min': None, 'max': None, 'min_nickname': None, 'max_nickname': None}
-            
-            rank_stats = safe_stats(rank_list, filtered_managers, 'rank', is_rank=True)
-            score_stats = safe_stats(score_list, filtered_managers, 'score')
-            club_value_stats = safe_stats(club_value_list, filtered_managers, 'club_value')
+            stats = get_stats_cube(snapshot_id).pick_rate_stats(rank_range, team_color)
+            formation_rank = stats['formation_rank']
+            rank_stats = stats['rank_stats']
+            score_stats = stats['score_stats']
+            club_value_stats = stats['club_value_stats']
         except Exception as e:
-            return Response({"error": f"[1-3] 통계 계산 오류: {str(e)}"}, status=400)
+            return Response({"error": f"[1-2] 포메이션/통계 집계 오류: {str(e)}"}, status=400)
 
         # 2. 기준 데이터 계산
         try:
-            base_date = Player.objects.latest('created_at').created_at
+            live = Snapshot.objects.get(pk=snapshot_id)
+            base_date = live.published_at
             total_count = manager_count
-            total_managers = Manager.objects.count()
+            total_managers = live.manager_count
             percentage = round((total_count / total_managers) * 100, 1)
         except Exception as e:
             return Response({"error": f"[2] 기준 데이터 계산 오류: {str(e)}"}, status=400)
 
-        # 3. 포지션별 선수 집계
+        # 3. 포지션별 선수 집계 (스냅샷별 등수 누적 색인에서 이진 탐색 + 상위 N개)
         try:
-            position_groups = {
-                'ST': ['LS', 'ST', 'RS'],
-                'CF': ['LF', 'CF', 'RF'],
-                'LW': ['LW'],
-                'RW': ['RW'],
-                'CAM': ['CAM'],
-                'RAM': ['RAM'],
-                'LAM': ['LAM'],
-                'RM': ['RM'],
-                'LM': ['LM'],
-                'CM': ['LCM', 'CM', 'RCM'],
-                'CDM': ['LDM', 'CDM', 'RDM'],
-                'CB': ['LCB', 'CB', 'SW', 'RCB'],
-                'LB': ['LWB', 'LB'],
-                'RB': ['RWB', 'RB'],
-                'GK': ['GK']
-            }
-
-            result = {}
-            for position, sub_positions in position_groups.items():
-                try:
-                    # 매니저별로 중복 없이 선수/시즌/강화단계 조합 추출
-                    unique_players = (
-                        Player.objects.filter(
-                            manager__in=filtered_managers,
-                            position__in=sub_positions
-                        )
-                        .values('manager_id', 'player_name', 'season', 'grade')
-                        .distinct()
-                    )
-                    # 선수별로 집계
-                    player_counter = {}
-                    for up in unique_players:
-                        key = (up['player_name'], up['season'], up['grade'])
-                        if key not in player_counter:
-                            player_counter[key] = set()
-                        player_counter[key].add(up['manager_id'])
-                    # 집계 결과 정렬 및 top_n 적용
-                    player_list = [
-                        {
-                            'player_name': k[0],
-                            'season': k[1],
-                            'grade': k[2],
-                            'user_count': len(v)
-                        }
-                        for k, v in player_counter.items()
-                    ]
-                    player_list.sort(key=lambda x: (-x['user_count'], -int(x['season'] if str(x['season']).isdigit() else 0), -x['grade']))
-                    player_list = player_list[:top_n]
-                    # 사용률 계산 및 top_users 추출
-                    position_total = manager_count if manager_count else 1
-                    for p in player_list:
-                        p['usage_rate'] = round(p['user_count'] * 100.0 / position_total, 1)
-                        top_nicknames = list(
-                            Player.objects.filter(
-                                manager__in=filtered_managers,
-                                position__in=sub_positions,
-                                player_name=p['player_name'],
-                                season=p['season'],
-                                grade=p['grade']
-                            ).values_list('manager__nickname', flat=True).distinct()[:3]
-                        )
-                        p['top_users'] = top_nicknames
-                        p['remaining_users'] = p['user_count'] - len(top_nicknames)
-                    if player_list:
-                        result[position] = player_list
-                except Exception as e:
-                    print(f"포지션 {position} 처리 중 오류 발생: {str(e)}")
-                    continue
+            result = index.pick_rate(rank_range, top_n, manager_count)
         except Exception as e:
             return Response({"error": f"[3] 포지션별 선수 집계 오류: {str(e)}"}, status=400)
 
@@ -245,81 +121,138 @@ def get_pick_rate(request):
     except Exception as e:
         return Response({"error": f"[0] 전체 예외: {str(e)}"}, status=400)
 
+@api_view(['POST'])
+@renderer_classes([JSONRenderer])
+def get_pick_rate_batch(request):
+    """
+    픽률 일괄 조회: {"specs": [{rank_min, rank_max, team_colors, formations, top_n}, ...]}
+    - 조건마다 get_pick_rate와 같은 형태의 결과(+ 정규화된 spec), 일치하는 매니저가 없으면 error
+    """
+    from core.pick_batch import MAX_SPECS, evaluate, normalize_spec
+    raw_specs = request.data.get('specs') if isinstance(request.data, dict) else request.data
+    if not isinstance(raw_specs, list) or not raw_specs:
+        return Response({"error": "specs는 조회 조건 목록이어야 합니다."}, status=400)
+    if len(raw_specs) > MAX_SPECS:
+        return Response({"error": f"조회 조건은 최대 {MAX_SPECS}개까지 가능합니다."}, status=400)
+    specs = []
+    for idx, raw in enumerate(raw_specs):
+        try:
+            specs.append(normalize_spec(raw))
+        except ValueError as e:
+            return Response({"error": f"specs[{idx}]: {str(e)}"}, status=400)
+
+    snapshot_id = live_snapshot_id()
+    if snapshot_id is None:
+        return Response({"error": "공개된 데이터가 없습니다."}, status=404)
+    try:
+        results = evaluate(Snapshot.objects.get(pk=snapshot_id), specs)
+    except Exception as e:
+        return Response({"error": f"일괄 집계 오류: {str(e)}"}, status=400)
+    return Response({'results': results})
+
+def pick_rate_trend_params(query):
+    # 추이 조회 조건 (rank_range는 등수 구간 상한으로 맞춤, 숫자가 아니면 None)
+    from core.trends import DEFAULT_DAYS, get_config, snap_rank_range
+    try:
+        params = {
+            'position': query.get('position', ''),
+            'player_name': query.get('player_name', ''),
+            'team_color': query.get('team_color', ''),
+            'rank_range': snap_rank_range(int(query.get('rank_range', 100))),
+            'days': max(1, min(int(query.get('days', DEFAULT_DAYS)), get_config()['DAILY_DAYS'])),
+        }
+        if query.get('season'):
+            params['season'] = query['season']
+        if query.get('grade'):
+            params['grade'] = int(query['grade'])
+    except ValueError:
+        return None
+    return params
+
+# 집계 행은 공개 직후에 저장되므로 스냅샷 버전별 응답 캐시는 쓰지 않음 (조회는 시점 수 x 구간 수 행만 읽음)
+@api_view(['GET'])
+@renderer_classes([JSONRenderer])
+def get_pick_rate_trend(request):
+    """
+    픽률/팀컬러 추이 (스냅샷 공개 시 저장한 집계 행만 사용, 원본 선수 행은 읽지 않음)
+    - 선수: position(포지션 그룹) + player_name, 선택 season/grade → 시점별 사용 매니저 수/사용률
+    - 팀컬러: team_color → 시점별 매니저 수/비율
+    - 최근 HOURLY_DAYS일은 스냅샷별, 그 이전은 일 단위(스냅샷 평균) 시점
+    """
+    from core import trends
+    from core.pick_index import POSITION_GROUPS
+    params = pick_rate_trend_params(request.GET)
+    if params is None:
+        return Response({"error": "rank_range, days, grade는 숫자여야 합니다."}, status=400)
+    rank_range, days = params['rank_range'], params['days']
+    if params['player_name']:
+        if params['position'] not in POSITION_GROUPS:
+            return Response({"error": f"position은 {', '.join(POSITION_GROUPS)} 중 하나여야 합니다."}, status=400)
+        series = trends.player_trend(
+            params['position'], params['player_name'], rank_range, days,
+            season=params.get('season'), grade=params.get('grade'),
+        )
+        return Response({
+            'position': params['position'],
+            'player_name': params['player_name'],
+            'season': params.get('season'),
+            'grade': params.get('grade'),
+            'rank_range': rank_range,
+            'days': days,
+            'series': series,
+        })
+    if params['team_color']:
+        series = trends.team_color_trend(params['team_color'], rank_range, days)
+        return Response({'team_color': params['team_color'], 'rank_range': rank_range, 'days': days, 'series': series})
+    return Response({"error": "player_name(+ position) 또는 team_color를 지정해야 합니다."}, status=400)
+
+@snapshot_cached('base-date', lambda query: {})
 @api_view(['GET'])
 @renderer_classes([JSONRenderer])
 def get_base_date(request):
     try:
-        latest = Player.objects.order_by('-created_at').first()
-        if latest:
-            formatted = latest.created_at.strftime('%y년 %m월 %d일 %H시 %M분 %S초 데이터')
+        live = Snapshot.objects.filter(pk=request_snapshot_id(request)).first()
+        if live and live.published_at:
+            formatted = live.published_at.strftime('%y년 %m월 %d일 %H시 %M분 %S초 데이터')
             return Response({'base_date': formatted})
         else:
             return Response({'base_date': '-'}, status=200)
     except Exception:
         return Response({'base_date': '-'}, status=200)
 
+@api_view(['GET'])
+@renderer_classes([JSONRenderer])
+def search_players(request):
+    # 선수 이름 자동완성 (이름 시작/부분 일치/초성), 선수(pid)별 시즌 카드 목록 포함
+    from core.player_search import DEFAULT_LIMIT, search_players as search
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"error": "limit은 숫자여야 합니다."}, status=400)
+    if not query:
+        return Response({'query': query, 'results': []})
+    try:
+        results = search(query, limit)
+    except Exception as e:
+        return Response({"error": f"선수 검색 오류: {str(e)}"}, status=503)
+    return Response({'query': query, 'results': results})
+
+def team_color_stats_params(query):
+    try:
+        return {'rank_range': int(query.get('rank_range', 100)), 'top_n': int(query.get('top_n', 10))}
+    except ValueError:
+        return None
+
+@snapshot_cached('team-color-stats', team_color_stats_params)
 @api_view(['GET'])
 @renderer_classes([JSONRenderer])
 def get_team_color_stats(request):
     try:
         rank_range = int(request.GET.get('rank_range', 100))
         top_n = int(request.GET.get('top_n', 10))
-        managers = Manager.objects.filter(rank__lte=rank_range)
-        total = managers.count() if managers.exists() else 1
-        color_stats = (
-            managers.values('team_color')
-            .exclude(team_color='')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        result = []
-        for idx, color in enumerate(color_stats[:top_n]):
-            color_managers = managers.filter(team_color=color['team_color'])
-            count = color['count']
-            percent = round(count * 100.0 / total, 1)
-            # 구단가치, 랭킹, 점수 통계 및 닉네임
-            def stat(field):
-                values = list(color_managers.values_list(field, flat=True))
-                if not values:
-                    return {'avg': None, 'min': None, 'max': None, 'min_nickname': None, 'max_nickname': None}
-                min_value = min(values)
-                max_value = max(values)
-                min_manager = color_managers.filter(**{field: min_value}).first()
-                max_manager = color_managers.filter(**{field: max_value}).first()
-                return {
-                    'avg': round(sum(values) / len(values), 1),
-                    'min': min_value,
-                    'max': max_value,
-                    'min_nickname': min_manager.nickname if min_manager else None,
-                    'max_nickname': max_manager.nickname if min_manager else None
-                }
-            # 포메이션 순위 3위까지
-            formation_stats = (
-                color_managers.values('formation')
-                .exclude(formation='')
-                .annotate(count=Count('id'))
-                .order_by('-count')[:3]
-            )
-            formation_rank = [
-                {
-                    'rank': i + 1,
-                    'formation': f['formation'],
-                    'count': f['count']
-                }
-                for i, f in enumerate(formation_stats)
-            ]
-            result.append({
-                'rank': idx + 1,
-                'team_color': color['team_color'],
-                'count': count,
-                'percentage': percent,
-                'details': {
-                    'club_value': stat('club_value'),
-                    'rank': stat('rank'),
-                    'score': stat('score'),
-                    'formation_rank': formation_rank,
-                }
-            })
+        snapshot_id = request_snapshot_id(request)
+        result = get_stats_cube(snapshot_id).team_color_stats(rank_range, top_n) if snapshot_id is not None else []
         return Response({'results': result})
     except Exception as e:
         return Response({'error': str(e)}, status=400)
@@ -411,3 +344,10 @@ def today_visitor_count(request):
     today = timezone.now().date()
     count = VisitorLog.objects.filter(created_at__date=today).values('ip').distinct().count()
     return Response({'today_visitor_count': count})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def ingest_metrics(request):
+    # 수집 실행 지표 (Prometheus 텍스트 형식, 관리자 전용)
+    from core.metrics import render_prometheus
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.SnapshotVersionMiddleware',
 ]
 
 ROOT_URLCONF = 'fc_support.urls'
@@ -80,7 +82,11 @@ WSGI_APPLICATION = 'fc_support.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('FC_SUPPORT_DB') or BASE_DIR / 'db.sqlite3',  # 벤치마크 등은 별도 DB 파일 지정
+        # WAL 모드: 수집 중 쓰기 트랜잭션이 있어도 조회 요청은 공개된 스냅샷을 막힘 없이 읽음
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
     }
 }
 
@@ -178,3 +184,144 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
 }
+
+# 선수 데이터 수집 엔진 설정
+# - 'pipeline': asyncio 스트리밍 파이프라인(단계 동시 진행)
+# - 'threaded': 기존 단계별 스레드풀 방식
+INGEST_ENGINE = 'pipeline'
+INGEST_PIPELINE = {
+    'OUID_WORKERS': 80,
+    'MATCH_WORKERS': 300,
+    'DETAIL_WORKERS': 80,
+    'QUEUE_SIZE': 1000,
+}
+
+# Nexon HTTP 클라이언트(API/랭킹 페이지/메타데이터 요청 공통)
+# - POOL_SIZE: keep-alive 연결 수(동시 워커 수에 맞춤), TIMEOUT: (연결, 응답) 제한 시간(초)
+# - RETRIES/BACKOFF: 연결 오류·5xx 재시도 횟수와 간격(429는 재시도하지 않고 키 스케줄러가 처리)
+# - ATTEMPTS/ATTEMPT_DELAY: 메타데이터·랭킹 페이지처럼 성공 응답이 필요한 요청의 시도 횟수와 간격(초)
+# - STANDIN_URL: 지정하면 모든 Nexon 요청을 로컬 대체 서버로 보냄(환경변수 NEXON_STANDIN_URL)
+NEXON_HTTP = {
+    'POOL_SIZE': INGEST_PIPELINE['OUID_WORKERS'] + INGEST_PIPELINE['MATCH_WORKERS'] + INGEST_PIPELINE['DETAIL_WORKERS'],
+    'TIMEOUT': (3.05, 10),
+    'RETRIES': 3,
+    'BACKOFF': 0.1,
+    'ATTEMPTS': 3,
+    'ATTEMPT_DELAY': 1.0,
+    'STANDIN_URL': os.environ.get('NEXON_STANDIN_URL', ''),
+}
+
+# API 키 스케줄러(키별 토큰 버킷)
+# - RATE: 키당 초당 요청 수, BURST: 순간 최대 요청 수, COOLDOWN: 429 발생 시 키 제외 시간(초)
+API_KEY_SCHEDULER = {
+    'RATE': 100,
+    'BURST': 100,
+    'COOLDOWN': 2.0,
+}
+
+# 닉네임 → OUID 캐시 유효 시간(시간)
+OUID_CACHE_TTL_HOURS = 24
+
+# 매치 디테일 디스크 캐시(최근 경기 스쿼드 보관, 최대 개수 초과 시 오래된 것부터 삭제)
+MATCH_DETAIL_CACHE = {
+    'DIR': BASE_DIR / 'cache' / 'match_detail',
+    'MAX_ENTRIES': 40000,
+}
+
+# 매치 디테일 응답 해석(JSON 디코딩 + 선발 11명 추출, orjson이 설치되어 있으면 사용)
+# - MODE: 'process'(프로세스 풀에 원본 바이트를 넘기고 작은 튜플만 받음), 'inline'(I/O 스레드에서 바로 해석),
+#         'auto'(CPU가 2개 이상이면 process, 하나면 inline)
+# - WORKERS: 프로세스 풀 크기(기본: CPU 수 - 1, 최대 4)
+MATCH_DETAIL_DECODE = {
+    'MODE': 'auto',
+    'WORKERS': None,
+}
+
+# 선수/시즌/포지션 메타데이터 저장소(버전별 원본을 디스크에 보관, 시작 시 네트워크 없이 로드)
+# - REFRESH_SECONDS: 조건부 요청(ETag/Last-Modified)으로 변경을 확인하는 간격, 0이면 백그라운드 갱신 안 함
+# - KEEP_VERSIONS: 테이블별로 남겨 둘 이전 버전 수(현재 버전 포함)
+META_STORE = {
+    'DIR': BASE_DIR / 'cache' / 'meta',
+    'REFRESH_SECONDS': 6 * 3600,
+    'KEEP_VERSIONS': 3,
+}
+
+# 증분 갱신: 최신 경기가 바뀐 매니저만 매치 디테일 조회(나머지는 이전 스쿼드 유지)
+INGEST_INCREMENTAL = True
+MATCH_STATE_RETENTION_DAYS = 7
+
+# 랭킹 페이지 파서: 'lxml'(기본, 미설치 시 bs4로 대체) 또는 'bs4'(BeautifulSoup html.parser)
+RANK_PARSER = 'lxml'
+
+# 크롤링 스케줄러 (python manage.py run_worker 프로세스에서 실행)
+# - IN_WEB: True면 runserver 프로세스에서도 스케줄러 스레드 실행(개발용), 운영에서는 웹 서버가 요청만 처리하도록 False
+# - CRON: 실행 시각(분 시 일 월 요일, 기본 매시 10분)
+# - OVERLAP: 이전 실행이 다음 예정 시각까지 끝나지 않으면 'skip'(건너뜀으로 기록) 또는 'queue'(끝난 뒤 한 번 이어서 실행)
+# - LEASE_SECONDS: 리더 임대 유효 시간(초), 이 시간 동안 갱신이 없으면 다른 프로세스가 리더를 가져감
+# - POLL_SECONDS: 예정 시각/임대 확인 간격(초)
+CRAWL_SCHEDULER = {
+    'IN_WEB': False,
+    'CRON': '10 * * * *',
+    'OVERLAP': 'skip',
+    'LEASE_SECONDS': 120,
+    'POLL_SECONDS': 30,
+}
+
+# 웹 프로세스가 수집 워커의 새 스냅샷 공개를 확인하는 간격(초, 포인터 한 행 조회)
+SNAPSHOT_POLL_SECONDS = 5
+
+# 매니저 순위 갱신(fetch_rankings_for_all_managers, refresh_ranks 명령)
+# - SOURCE: 'http'(rank_inner 페이지를 HTTP로 조회, 기본) 또는 'browser'(headless Chrome으로 datacenter/rank 조회)
+# - PAGES: http에서 조회할 rank_inner 페이지 수(페이지당 20명)
+# - BROWSER_PAGES/BROWSER_POOL_SIZE: browser에서 조회할 페이지 수와 재사용할 Chrome 드라이버 수
+RANK_REFRESH = {
+    'SOURCE': 'http',
+    'PAGES': 500,
+    'BROWSER_PAGES': 1,
+    'BROWSER_POOL_SIZE': 2,
+}
+
+# 중단된 수집 실행을 자동으로 이어받는 시간 범위(분)
+INGEST_RESUME_WINDOW_MINUTES = 60
+
+# 수집 실행 기록 보관 기간(일, 종료 시각 기준), 재개 가능 시간이 지난 실패 실행의 체크포인트는 새 실행 시작 시 삭제
+INGEST_RUN_RETENTION_DAYS = 14
+
+# 매니저/선수 스냅샷 보관 시간(시간 단위, 공개 스냅샷과 직전 스냅샷은 항상 유지)
+SNAPSHOT_RETENTION_HOURS = 24
+
+# 조회 API 응답 캐시 (스냅샷 버전 + 엔드포인트 + 정규화된 조회 조건을 키로 사용, ETag/304 응답)
+# - 프로세스별 LRU(LRU_SIZE개) 뒤에 프로세스 간 공유 파일 캐시(CACHES['responses'])
+# - WARM: 새 스냅샷 공개 시 미리 만들어 둘 조회 조건(프론트 PickRate/TeamColor 화면의 주요 입력값),
+#         TEAM_COLORS: 픽률을 미리 만들 팀컬러 수(해당 스냅샷에서 매니저가 많은 순, 전체 조회는 항상 포함)
+RESPONSE_CACHE = {
+    'ALIAS': 'responses',
+    'LRU_SIZE': 512,
+    'WARM': {
+        'pick-rate': {'rank_range': [100, 500, 1000, 5000, 10000], 'top_n': [3, 5, 10]},
+        'team-color-stats': {'rank_range': [100, 500, 1000, 5000, 10000], 'top_n': [5, 10]},
+        'base-date': {},
+    },
+    'TEAM_COLORS': 10,
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'responses',
+        'TIMEOUT': 6 * 3600,  # 키에 스냅샷 id가 들어가므로 지난 스냅샷 항목은 만료로 정리
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# 픽률/팀컬러 추이 (스냅샷 공개 시 등수 구간별 집계 행 저장, /api/pick-rate/trend/)
+# - RANK_BUCKETS: 등수 구간 상한 (추이 조회의 rank_range는 이 값 중 하나로 맞춤, 마지막 값보다 낮은 순위는 제외)
+# - HOURLY_DAYS: 스냅샷별(시간 단위) 시점을 유지하는 기간(일), 지나면 날짜별로 합쳐 일 단위 시점으로 저장
+# - DAILY_DAYS: 일 단위 시점 보관 기간(일)
+PICK_TREND = {
+    'RANK_BUCKETS': [100, 500, 1000, 5000, 10000],
+    'HOURLY_DAYS': 2,
+    'DAILY_DAYS': 90,
+}
@@ -12,5 +12,8 @@ python manage.py collectstatic --noinput
 # 데이터베이스 마이그레이션
 python manage.py migrate
 
-# Gunicorn으로 서버 실행
+# 수집 워커 실행 (크롤링/스냅샷 공개 담당, 웹 서버와 별도 프로세스)
+python manage.py run_worker >> worker.log 2>&1 &
+
+# Gunicorn으로 서버 실행 (조회 요청만 처리)
 gunicorn fc_support.wsgi:application --bind 0.0.0.0:8000 --workers 4 --threads 2 
\ No newline at end of file
@@ -1,11 +1,15 @@
-import React, { useState, useEffect, useMemo } from "react";
+import React, { useState, useEffect } from "react";
 import { TextField, Autocomplete, Box, Typography, Button, Rating, Dialog, DialogTitle, DialogContent, DialogActions } from "@mui/material";
-import { fetchPlayerMeta, fetchSeasonMeta, getSeasonMetaMap } from "../utils/seasonMeta";
+import { fetchSeasonMeta, getSeasonMetaMap } from "../utils/seasonMeta";
 import { teamColors } from "../constants/teamColors";
 import { useTheme } from "../contexts/ThemeContext";
 
-const fetchPlayers = async () => {
-  return await fetchPlayerMeta();
+// 서버 선수 이름 검색 (이름/부분/초성 일치, 선수별 시즌 카드 포함)
+const searchPlayers = async (query) => {
+  const res = await fetch(`/api/players/search/?q=${encodeURIComponent(query)}&limit=20`);
+  if (!res.ok) return [];
+  const data = await res.json();
+  return (data.results || []).map((item) => ({ ...item, id: item.spid }));
 };
 
 const API_URL = "/api/reviews/";
@@ -16,7 +20,7 @@ const Review = () => {
   const { isDarkMode } = useTheme();
   const [inputValue, setInputValue] = useState("");
   const [selected, setSelected] = useState(undefined);
-  const [allPlayers, setAllPlayers] = useState([]);
+  const [playerOptions, setPlayerOptions] = useState([]);
   const [seasonMeta, setSeasonMeta] = useState([]);
   const [seasonMap, setSeasonMap] = useState({});
   const [selectedSeason, setSelectedSeason] = useState(null);
@@ -52,10 +56,24 @@ const Review = () => {
     position: 'relative',
   };
 
-  // 선수 데이터 최초 1회만 fetch
+  // 입력이 멈추면 서버에서 선수 검색 (늦게 도착한 이전 검색 결과는 무시)
   useEffect(() => {
-    fetchPlayers().then((data) => setAllPlayers(data));
-  }, []);
+    const query = inputValue.trim();
+    if (!query || (selected && selected.name === inputValue)) {
+      setPlayerOptions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchPlayers(query)
+        .then((results) => { if (!cancelled) setPlayerOptions(results); })
+        .catch(() => { if (!cancelled) setPlayerOptions([]); });
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [inputValue, selected]);
 
   // 시즌 메타데이터 fetch
   useEffect(() => {
@@ -65,41 +83,19 @@ const Review = () => {
     });
   }, []);
 
-  // 실시간 검색 옵션 (2글자 이상, pid별 1개)
-  const filteredOptions = useMemo(() => {
-    if (inputValue.length < 2 || allPlayers.length === 0) return [];
-    const filtered = allPlayers.filter((item) => item.name.includes(inputValue));
-    const pidMap = {};
-    filtered.forEach((item) => {
-      const pid = String(item.id).slice(3);
-      if (!pidMap[pid]) pidMap[pid] = item;
-    });
-    return Object.values(pidMap);
-  }, [inputValue, allPlayers]);
-
-  // 엔터 입력 시 항상 allPlayers에서 inputValue 기준으로 후보 추출
+  // 엔터 입력 시 현재 검색 결과에서 이름이 정확히 같거나 하나뿐인 선수 선택
   const handleKeyDown = (e) => {
-    if (e.key === "Enter" && inputValue.length > 1) {
-      setTimeout(() => {
-        const filtered = allPlayers.filter((item) => item.name.includes(inputValue));
-        const pidMap = {};
-        filtered.forEach((item) => {
-          const pid = String(item.id).slice(3);
-          if (!pidMap[pid]) pidMap[pid] = item;
-        });
-        const candidates = Object.values(pidMap);
-        const exactMatches = candidates.filter((item) => item.name === inputValue);
-        if (exactMatches.length === 1) {
-          setSelected(exactMatches[0]);
-          setInputValue(exactMatches[0].name);
-          return;
-        }
-        if (candidates.length === 1) {
-          setSelected(candidates[0]);
-          setInputValue(candidates[0].name);
-          return;
-        }
-      }, 0);
+    if (e.key === "Enter" && inputValue.length > 0) {
+      const exactMatches = playerOptions.filter((item) => item.name === inputValue);
+      if (exactMatches.length === 1) {
+        setSelected(exactMatches[0]);
+        setInputValue(exactMatches[0].name);
+        return;
+      }
+      if (playerOptions.length === 1) {
+        setSelected(playerOptions[0]);
+        setInputValue(playerOptions[0].name);
+      }
     }
   };
 
@@ -300,7 +296,8 @@ const Review = () => {
       </Box>
       <Autocomplete
         freeSolo
-        options={filteredOptions}
+        options={playerOptions}
+        filterOptions={(options) => options}
         getOptionLabel={(option) => option.name || ""}
         inputValue={inputValue}
         onInputChange={(_, value) => setInputValue(value)}
@@ -386,13 +383,7 @@ const Review = () => {
           </Typography>
           {/* 시즌 버튼들만 */}
           {(() => {
-            const pid = String(selected.id).slice(3);
-            const allSeasons = allPlayers.filter(
-              (p) => String(p.id).slice(3) === pid
-            );
-            const seasonIds = Array.from(
-              new Set(allSeasons.map((p) => String(p.id).slice(0, 3)))
-            );
+            const seasonIds = (selected.seasons || []).map((s) => String(s.season_id));
             return (
               <Box sx={{ display: 'flex', flexWrap: 'wrap', gap: 0.3, justifyContent: 'center', mt: 0.5 }}>
                 {seasonIds.map((sid) => {
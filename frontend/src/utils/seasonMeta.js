@@ -15,9 +15,3 @@ export const getSeasonMetaMap = (seasonMetaArr) => {
   }
   return map;
 };
-
-export const fetchPlayerMeta = async () => {
-  // 넥슨 공식 API에서 선수 메타데이터 직접 불러오기
-  const res = await axios.get("https://open.api.nexon.com/static/fconline/meta/spid.json");
-  return res.data;
-};